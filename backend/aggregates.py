@@ -0,0 +1,118 @@
+"""
+Per-player rollups (PlayerAggregate) kept in step with PlayerMatchStats.
+
+New stats rows are folded into the running sums in the same transaction that
+inserts them, so summaries are a single-row read whatever the history length.
+`manage.py rebuild_aggregates` recomputes everything from scratch.
+"""
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import PlayerAggregate
+
+# Aggregate field -> PlayerMatchStats field it sums
+SUM_FIELDS = {
+    'kills': 'kills',
+    'deaths': 'deaths',
+    'assists': 'assists',
+    'total_damage_dealt_to_champions': 'total_damage_dealt_to_champions',
+    'gold_earned': 'gold_earned',
+    'total_minions_killed': 'total_minions_killed',
+    'vision_score': 'vision_score',
+}
+
+
+def _bucket_keys(stats):
+    """The (scope, key) buckets a PlayerMatchStats row counts towards"""
+    return (
+        (PlayerAggregate.SCOPE_ALL, ''),
+        (PlayerAggregate.SCOPE_CHAMPION, stats.champion_name),
+        (PlayerAggregate.SCOPE_GAME_MODE, stats.match.game_mode),
+    )
+
+
+def update_aggregates(player, new_stats):
+    """
+    Add newly inserted PlayerMatchStats rows to the player's rollups
+
+    Must run inside the transaction that inserted `new_stats`, with each row
+    counted exactly once.
+    """
+    update_player_aggregates({player.pk: new_stats})
+
+
+def update_player_aggregates(stats_by_player):
+    """
+    update_aggregates for several players at once
+
+    Reads every affected rollup in one query and writes them back with one
+    bulk insert and one bulk update, whatever the number of players.
+
+    Args:
+        stats_by_player: Dict of player PUUID -> newly inserted PlayerMatchStats
+    """
+    deltas = {}
+    for player_id, new_stats in stats_by_player.items():
+        for stats in new_stats:
+            for scope, key in _bucket_keys(stats):
+                delta = deltas.setdefault((player_id, scope, key), dict.fromkeys(('matches', 'wins', *SUM_FIELDS), 0))
+                delta['matches'] += 1
+                delta['wins'] += int(stats.win)
+                for field, source in SUM_FIELDS.items():
+                    delta[field] += getattr(stats, source)
+    if not deltas:
+        return
+
+    player_ids = list({player_id for player_id, _, _ in deltas})
+    existing = {
+        (aggregate.player_id, aggregate.scope, aggregate.key): aggregate
+        for aggregate in PlayerAggregate.objects.filter(player_id__in=player_ids)
+    }
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for (player_id, scope, key), delta in deltas.items():
+        aggregate = existing.get((player_id, scope, key))
+        if aggregate is None:
+            to_create.append(PlayerAggregate(player_id=player_id, scope=scope, key=key, **delta))
+            continue
+        for field, value in delta.items():
+            setattr(aggregate, field, getattr(aggregate, field) + value)
+        aggregate.updated_at = now
+        to_update.append(aggregate)
+
+    PlayerAggregate.objects.bulk_create(to_create, batch_size=1000)
+    PlayerAggregate.objects.bulk_update(to_update, ['matches', 'wins', *SUM_FIELDS, 'updated_at'], batch_size=1000)
+
+
+def build_aggregate_rows(stats_queryset, aggregate_model=PlayerAggregate):
+    """
+    Compute rollups for every player in `stats_queryset` with SQL aggregation
+
+    Takes the models as arguments so migrations can pass historical models.
+
+    Returns:
+        list: Unsaved aggregate_model instances
+    """
+    annotations = {
+        'matches': Count('id'),
+        'wins': Count('id', filter=Q(win=True)),
+        **{field: Sum(source) for field, source in SUM_FIELDS.items()},
+    }
+    rows = []
+    for scope, group_field in (
+        (PlayerAggregate.SCOPE_ALL, None),
+        (PlayerAggregate.SCOPE_CHAMPION, 'champion_name'),
+        (PlayerAggregate.SCOPE_GAME_MODE, 'match__game_mode'),
+    ):
+        group_by = ['player_id'] + ([group_field] if group_field else [])
+        for row in stats_queryset.order_by().values(*group_by).annotate(**annotations):
+            rows.append(aggregate_model(
+                player_id=row['player_id'],
+                scope=scope,
+                key=row[group_field] if group_field else '',
+                matches=row['matches'],
+                wins=row['wins'],
+                **{field: row[field] or 0 for field in SUM_FIELDS},
+            ))
+    return rows
@@ -5,3 +5,11 @@ class BackendConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend'
     verbose_name = 'GameTrack Backend'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .metrics import instrument_connection
+
+        # Count every request's queries for Server-Timing and /api/metrics
+        connection_created.connect(instrument_connection, dispatch_uid='backend.metrics')
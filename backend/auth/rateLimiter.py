@@ -0,0 +1,185 @@
+import re
+import threading
+import time
+from collections import deque
+
+
+def parse_rate_limits(value):
+    """
+    Parse a Riot rate-limit string such as "20:1,100:120"
+
+    Args:
+        value: Comma separated "count:seconds" pairs (the format Riot uses
+               in X-App-Rate-Limit and X-App-Rate-Limit-Count headers)
+
+    Returns:
+        dict: Window length in seconds -> count
+    """
+    limits = {}
+    if not value:
+        return limits
+    for pair in value.split(','):
+        try:
+            count, window = pair.strip().split(':')
+            limits[int(window)] = int(count)
+        except ValueError:
+            continue
+    return limits
+
+
+class _WindowLog:
+    """Timestamps of the requests sent inside one rate-limit window"""
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.sent = deque()
+
+    def prune(self, now):
+        while self.sent and self.sent[0] <= now - self.window:
+            self.sent.popleft()
+
+    def wait_time(self, now):
+        """Seconds until one more request fits in this window"""
+        self.prune(now)
+        if len(self.sent) < self.limit:
+            return 0
+        return self.sent[len(self.sent) - self.limit] + self.window - now
+
+    def sync(self, count, now):
+        """Catch up with the count the server reports for this window"""
+        self.prune(now)
+        missing = count - len(self.sent)
+        for _ in range(missing):
+            self.sent.append(now)
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that enforces several rate-limit windows at once.
+
+    Each window keeps a log of send times, so a request is only released when
+    it fits in every window (e.g. 20/1s and 100/120s). A token bucket refilled
+    at count/window would allow up to twice the count inside one window, which
+    is exactly what triggers Riot's 429s, so the log is used instead.
+    Method limits are tracked the same way, per method key, once the server
+    has reported them through X-Method-Rate-Limit.
+
+    The windows live in this process only. When several processes send
+    requests with the same key, `share` is the fraction of every limit this
+    one may use (counts reported by Riot are scaled by it too), so that
+    together they stay within the limits. A limiter with a `parent` also
+    waits on the parent and passes 429s and headers on to it; that is how a
+    client can be held to part of a limiter it shares with other clients.
+    """
+
+    def __init__(self, limits, share=1.0, parent=None):
+        self._lock = threading.Lock()
+        self.share = share
+        self.parent = parent
+        self._app = {window: _WindowLog(self._scaled(count), window) for window, count in limits.items()}
+        self._methods = {}
+        self._paused_until = 0
+
+    def _scaled(self, count):
+        """This process's part of a limit of `count` requests"""
+        return max(1, int(count * self.share))
+
+    def _logs_for(self, method):
+        return list(self._app.values()) + list(self._methods.get(method, {}).values())
+
+    def acquire(self, method=None):
+        """Block until a request for `method` may be sent, then record it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                logs = self._logs_for(method)
+                wait = max([self._paused_until - now] + [log.wait_time(now) for log in logs])
+                if wait <= 0:
+                    for log in logs:
+                        log.sent.append(now)
+                    break
+            time.sleep(wait)
+        if self.parent is not None:
+            self.parent.acquire(method)
+
+    def pause(self, seconds):
+        """Hold back every request for `seconds` (used after a 429)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        if self.parent is not None:
+            self.parent.pause(seconds)
+
+    def update_from_headers(self, headers, method=None):
+        """
+        Sync the local windows with Riot's rate-limit response headers
+
+        Args:
+            headers: Response headers (X-App-Rate-Limit[-Count] and
+                     X-Method-Rate-Limit[-Count] are read when present)
+            method: Method key the request was sent for
+        """
+        if self.parent is not None:
+            self.parent.update_from_headers(headers, method)
+        with self._lock:
+            now = time.monotonic()
+
+            for window, count in parse_rate_limits(headers.get('X-App-Rate-Limit')).items():
+                if window in self._app:
+                    self._app[window].limit = self._scaled(count)
+                else:
+                    self._app[window] = _WindowLog(self._scaled(count), window)
+            for window, count in parse_rate_limits(headers.get('X-App-Rate-Limit-Count')).items():
+                if window in self._app:
+                    self._app[window].sync(int(count * self.share), now)
+
+            if method is None:
+                return
+            method_logs = self._methods.setdefault(method, {})
+            for window, count in parse_rate_limits(headers.get('X-Method-Rate-Limit')).items():
+                if window in method_logs:
+                    method_logs[window].limit = self._scaled(count)
+                else:
+                    method_logs[window] = _WindowLog(self._scaled(count), window)
+            for window, count in parse_rate_limits(headers.get('X-Method-Rate-Limit-Count')).items():
+                if window in method_logs:
+                    method_logs[window].sync(int(count * self.share), now)
+
+
+# Riot method limits apply per endpoint, not per concrete URL
+RIOT_METHODS = [
+    ('account-by-riot-id', re.compile(r'^/riot/account/v1/accounts/by-riot-id/')),
+    ('match-ids-by-puuid', re.compile(r'^/lol/match/v5/matches/by-puuid/[^/]+/ids$')),
+    ('match-by-id', re.compile(r'^/lol/match/v5/matches/[^/]+$')),
+    ('summoner-by-name', re.compile(r'^/lol/summoner/v4/summoners/by-name/')),
+]
+
+# Key of every endpoint not in RIOT_METHODS; the raw path would give the
+# request metrics one label per PUUID or match ID
+OTHER_METHOD = 'other'
+
+
+def method_key(endpoint):
+    """Map an endpoint path to the Riot method its method limit is counted against"""
+    for name, pattern in RIOT_METHODS:
+        if pattern.match(endpoint):
+            return name
+    return OTHER_METHOD
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_url, limits, share=1.0):
+    """
+    Return the process-wide limiter for a routing host
+
+    Riot counts app limits per routing value, so every client that talks to
+    the same base_url shares one limiter. `share` only applies when the
+    limiter is created.
+    """
+    with _limiters_lock:
+        if base_url not in _limiters:
+            _limiters[base_url] = RateLimiter(limits, share=share)
+        return _limiters[base_url]
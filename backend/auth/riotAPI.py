@@ -1,25 +1,125 @@
+import json
 import requests
+import threading
 import time
+from asgiref.sync import sync_to_async
+from decouple import config
+from requests.adapters import HTTPAdapter
+from backend.auth.rateLimiter import RateLimiter, get_rate_limiter, method_key, parse_rate_limits
+from backend.metrics import record_riot_call, record_riot_coalesced
+
+# Default Riot development key limits, overridden by X-App-Rate-Limit once the server answers
+RIOT_RATE_LIMITS = parse_rate_limits(config('RIOT_RATE_LIMITS', default='20:1,100:120'))
+
+# Processes sending Riot requests with this key: every web server worker plus
+# every `manage.py run_sync_worker`. Limiters only see their own process, so
+# each one keeps to 1/RIOT_RATE_PROCESSES of the limits.
+RIOT_RATE_PROCESSES = config('RIOT_RATE_PROCESSES', default=2, cast=int)
+RIOT_RATE_SHARE = 1 / max(1, RIOT_RATE_PROCESSES)
+
+# Connection pool and timeout settings shared by every client session
+RIOT_POOL_SIZE = config('RIOT_POOL_SIZE', default=20, cast=int)
+RIOT_CONNECT_TIMEOUT = config('RIOT_CONNECT_TIMEOUT', default=3.05, cast=float)
+RIOT_READ_TIMEOUT = config('RIOT_READ_TIMEOUT', default=10, cast=float)
+
+# Send every Riot request to this host instead of the routing hosts (e.g. benchmarks.stub_server)
+RIOT_API_BASE_URL = config('RIOT_API_BASE_URL', default='')
+
+
+def build_session(pool_size=RIOT_POOL_SIZE):
+    """Create a keep-alive session whose pool holds up to `pool_size` connections per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    return session
+
+
+class _Flight:
+    """A GET in progress that identical concurrent calls wait on instead of repeating"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
 
 class RiotAPIClient:
-    def __init__(self, api_key, base_url="https://<region>.api.riotgames.com"):
+    def __init__(self, api_key, base_url="https://<region>.api.riotgames.com", rate_limiter=None,
+                 session=None, timeout=(RIOT_CONNECT_TIMEOUT, RIOT_READ_TIMEOUT)):
         self.api_key = api_key #Change to OAuth token if I add sign on flow
         self.base_url = base_url
-    
+        self.rate_limiter = rate_limiter or get_rate_limiter(base_url, RIOT_RATE_LIMITS, share=RIOT_RATE_SHARE)
+        self.session = session or build_session()
+        self.timeout = timeout
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+        self.coalesced = 0
+
     def call_api(self, endpoint, params=None, headers=None, method="GET"):
+        """
+        Send a request and return the decoded JSON, or None on failure
+
+        Identical GETs (same endpoint, params and headers) made while one is
+        already in flight, from other threads or from async views running
+        through AsyncRiotAPIClient, wait for that request and share its
+        result instead of spending rate limit on a duplicate. The shared
+        response object must be treated as read-only.
+        """
+        if method != "GET":
+            return self._send(endpoint, params, headers, method)
+
+        key = json.dumps([endpoint, params or {}, headers or {}], sort_keys=True, default=str)
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            record_riot_coalesced(method_key(endpoint))
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._send(endpoint, params, headers, method)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _send(self, endpoint, params, headers, method):
         url = f"{self.base_url}{endpoint}"
         default_headers = {"X-Riot-Token": self.api_key}
         if headers:
             default_headers.update(headers)
+        riot_method = method_key(endpoint)
         # print("Request URL:", url)
         # print("Headers:", default_headers)
         for attempt in range(3):
-            response = requests.request(method, url, params=params, headers=default_headers)
-            print("Status code:", response.status_code)
+            self.rate_limiter.acquire(riot_method)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, params=params, headers=default_headers, timeout=self.timeout)
+            except requests.RequestException:
+                record_riot_call(riot_method, 'error', time.perf_counter() - started, retry=attempt > 0)
+                raise
+            record_riot_call(riot_method, response.status_code, time.perf_counter() - started, retry=attempt > 0)
+            self.rate_limiter.update_from_headers(response.headers, riot_method)
             # print("Response:", response.text)
             if response.status_code == 429:
                 retry_after = int(response.headers.get('Retry-After', 1))
-                time.sleep(retry_after)
+                # Hold back every thread sharing the limiter, not just this one
+                self.rate_limiter.pause(retry_after)
                 continue
             elif response.status_code == 200:
                 return response.json()
@@ -27,3 +127,64 @@ class RiotAPIClient:
                 break
         return None
 
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_riot_client(api_key, base_url="https://americas.api.riotgames.com"):
+    """
+    Return the process-wide client for a routing host
+
+    Views and get_stats functions share this client so every request reuses
+    the same pooled keep-alive connections instead of opening a new TCP+TLS
+    connection per call. RIOT_API_BASE_URL, when set, replaces the routing host.
+    """
+    base_url = RIOT_API_BASE_URL or base_url
+    with _clients_lock:
+        key = (api_key, base_url)
+        if key not in _clients:
+            _clients[key] = RiotAPIClient(api_key=api_key, base_url=base_url)
+        return _clients[key]
+
+
+def refresh_share(reserved, share=RIOT_RATE_SHARE):
+    """Fraction of the Riot rate limits scheduled refreshes get in a process with `share` of them"""
+    return share * max(0.0, 1.0 - reserved)
+
+
+def get_refresh_client(client, reserved):
+    """
+    Client for scheduled syncs that leaves part of the rate limit free
+
+    It shares the session and limiter of `client`, and also waits on a
+    limiter of its own at (1 - reserved) of this process's share, so
+    scheduled refreshes never use the `reserved` headroom that interactive
+    requests through `client` rely on.
+    """
+    limiter = RateLimiter(
+        RIOT_RATE_LIMITS, share=refresh_share(reserved, client.rate_limiter.share), parent=client.rate_limiter
+    )
+    return RiotAPIClient(
+        api_key=client.api_key, base_url=client.base_url, rate_limiter=limiter,
+        session=client.session, timeout=client.timeout
+    )
+
+
+class AsyncRiotAPIClient:
+    """
+    Awaitable front for RiotAPIClient, for use in async views
+
+    Each call runs the pooled blocking client in asgiref's thread executor
+    (thread_sensitive=False), so the event loop keeps serving other requests
+    while this one waits on Riot, and the session pool, rate limiter and
+    in-flight request coalescing stay shared with the sync code paths.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    async def call_api(self, endpoint, params=None, headers=None, method="GET"):
+        return await sync_to_async(self.client.call_api, thread_sensitive=False)(
+            endpoint, params=params, headers=headers, method=method
+        )
@@ -1,7 +1,7 @@
 import requests
 import time
 from keys import RIOT_API_KEY
-from backend.auth.riotAPI import RiotAPIClient
+from backend.auth.riotAPI import get_riot_client
 
 def verify_summoner_name():
     verifiedSummonerName = False
@@ -17,7 +17,7 @@ def verify_summoner_name():
             summoner_name = summoner_name.strip()
             verifiedSummonerName = True
 
-    api = RiotAPIClient(api_key=RIOT_API_KEY, base_url="https://na1.api.riotgames.com")
+    api = get_riot_client(RIOT_API_KEY, base_url="https://na1.api.riotgames.com")
     response = api.call_api(f"/lol/summoner/v4/summoners/by-name/{summoner_name}")
     print(response)
     
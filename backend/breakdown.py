@@ -0,0 +1,95 @@
+"""
+Per-champion and per-role performance breakdowns computed in the database.
+
+Each breakdown is one GROUP BY over the player's PlayerMatchStats rows
+(values().annotate()), so the database returns one row of sums per champion
+or team position and only those few rows are turned into rates here. The
+columns it reads, BREAKDOWN_FIELDS, are the tail of two covering indexes on
+PlayerMatchStats, so the query never touches the table itself.
+
+Per-minute rates are totals over total time played (sum of damage / sum of
+minutes), so a long game weighs more than a short one, and KDA is
+(kills + assists) / deaths over the totals, as in the summary block.
+"""
+from django.db.models import Count, Q, Sum
+
+from .ingest import calculate_kda
+
+# PlayerMatchStats columns the breakdown aggregates (kept in the covering indexes)
+BREAKDOWN_FIELDS = (
+    'win', 'kills', 'deaths', 'assists', 'total_damage_dealt_to_champions',
+    'gold_earned', 'total_minions_killed', 'game_duration',
+)
+
+# Breakdown name -> PlayerMatchStats field it groups by
+GROUPINGS = {
+    'champions': 'champion_name',
+    'positions': 'team_position',
+}
+
+
+def breakdown_annotations():
+    return {
+        'matches': Count('pk'),
+        'wins': Count('pk', filter=Q(win=True)),
+        'kills': Sum('kills'),
+        'deaths': Sum('deaths'),
+        'assists': Sum('assists'),
+        'damage': Sum('total_damage_dealt_to_champions'),
+        'gold': Sum('gold_earned'),
+        'cs': Sum('total_minions_killed'),
+        'seconds': Sum('game_duration'),
+    }
+
+
+def breakdown_row(field, value, totals):
+    """Rates for one group (field = value) from its summed totals"""
+    matches = totals['matches']
+    kills = totals['kills'] or 0
+    deaths = totals['deaths'] or 0
+    assists = totals['assists'] or 0
+    minutes = (totals['seconds'] or 0) / 60
+    return {
+        field: value,
+        'matches': matches,
+        'wins': totals['wins'],
+        'losses': matches - totals['wins'],
+        'win_rate': round(totals['wins'] / matches * 100, 1),
+        'kda': calculate_kda(kills, deaths, assists),
+        'avg_kills': round(kills / matches, 1),
+        'avg_deaths': round(deaths / matches, 1),
+        'avg_assists': round(assists / matches, 1),
+        'damage_per_minute': round((totals['damage'] or 0) / minutes, 1) if minutes else None,
+        'gold_per_minute': round((totals['gold'] or 0) / minutes, 1) if minutes else None,
+        'cs_per_minute': round((totals['cs'] or 0) / minutes, 2) if minutes else None,
+    }
+
+
+def breakdown_queryset(queryset, field):
+    """One row of totals per value of `field`, most played first"""
+    return (
+        queryset.order_by()
+        .values(field)
+        .annotate(**breakdown_annotations())
+        .order_by('-matches', field)
+    )
+
+
+def breakdown(queryset, field):
+    """
+    Group a PlayerMatchStats queryset by `field` in the database
+
+    Returns:
+        list: breakdown_row dicts, most played first
+    """
+    return [breakdown_row(field, row[field], row) for row in breakdown_queryset(queryset, field)]
+
+
+def player_breakdowns(queryset):
+    """
+    Champion and position breakdowns of a player's (optionally filtered) stats
+
+    Returns:
+        dict: 'champions' and 'positions' lists of breakdown_row dicts
+    """
+    return {name: breakdown(queryset, field) for name, field in GROUPINGS.items()}
@@ -0,0 +1,342 @@
+"""
+Columnar store of every numeric participant stat for analytics scans.
+
+PlayerMatchStats keeps about 20 of the 144 participant fields and none of
+the 129 `challenges` metrics. This store keeps all of them, one row per
+participant, so a question like "average challenges.damagePerMinute by
+champion" reads two columns instead of reopening every match payload:
+
+    <COLUMN_STORE_DIR>/chunk-000000/meta.json
+                                    kills.f64
+                                    challenges.damagePerMinute.f64
+                                    champion_name.i32 + champion_name.dict.json
+                                    ...
+
+Rows are written in chunks of up to CHUNK_ROWS. Numeric fields (booleans as
+0/1) are raw float64 buffers with NaN where a participant lacks the field,
+and the identifying strings in KEY_COLUMNS are dictionary-encoded as int32
+codes plus a per-chunk value list, the same layout Arrow uses for its
+dictionary arrays. Readers memory-map the buffers and scan them through
+memoryview.cast, so nothing is parsed or loaded whole; NumPy users can
+np.memmap the same files. A chunk is written to a temporary directory and
+renamed into place, so readers never see a partial one. One writer at a time.
+
+This module has no Django dependency so it can be built from raw JSON dumps.
+"""
+import csv
+import json
+import math
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from operator import itemgetter
+from pathlib import Path
+
+from decouple import config
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+COLUMN_STORE_DIR = Path(config('COLUMN_STORE_DIR', default=str(BASE_DIR / 'column_store')))
+
+# Most rows per chunk
+CHUNK_ROWS = 100_000
+
+# Identifying strings, stored dictionary-encoded
+KEY_COLUMNS = ('match_id', 'puuid', 'champion_name', 'team_position', 'game_mode')
+
+# Match-level numbers repeated on each participant row so scans can filter on them
+MATCH_COLUMNS = {'game_creation': 'gameCreation', 'game_duration': 'gameDuration'}
+
+NUMERIC_SUFFIX = '.f64'
+CODE_SUFFIX = '.i32'
+NAN = float('nan')
+
+# Types stored as numeric columns (bool is stored as 0/1)
+NUMERIC_TYPES = (int, float, bool)
+
+
+def participant_rows(match_data):
+    """
+    Flatten a raw match into one dict per participant
+
+    Keys are the KEY_COLUMNS, the MATCH_COLUMNS, every numeric top-level
+    participant field and every numeric challenge as `challenges.<name>`.
+    """
+    info = match_data.get('info', {})
+    match_id = match_data.get('metadata', {}).get('matchId')
+    shared = {name: info[field] for name, field in MATCH_COLUMNS.items() if field in info}
+
+    rows = []
+    for participant in info.get('participants', []):
+        row = {
+            'match_id': match_id,
+            'puuid': participant.get('puuid', ''),
+            'champion_name': participant.get('championName', ''),
+            'team_position': participant.get('teamPosition', ''),
+            'game_mode': info.get('gameMode', ''),
+        }
+        row.update(shared)
+        row.update({field: value for field, value in participant.items() if type(value) in NUMERIC_TYPES})
+        row.update({
+            'challenges.' + field: value
+            for field, value in participant.get('challenges', {}).items()
+            if type(value) in NUMERIC_TYPES
+        })
+        rows.append(row)
+    return rows
+
+
+def _map_buffer(path, typecode):
+    """Memory-map a column file as a read-only typed memoryview"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(array(typecode))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode)
+
+
+class Chunk:
+    """One immutable chunk of rows"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.rows = meta['rows']
+        self.numeric_columns = set(meta['numeric'])
+        self.swapped = meta.get('byteorder', sys.byteorder) != sys.byteorder
+        self._dictionaries = {}
+
+    def _read(self, name, typecode):
+        path = self.path / name
+        if not self.swapped:
+            return _map_buffer(path, typecode)
+        # Written on a machine of the other byte order: copy and swap
+        values = array(typecode)
+        with open(path, 'rb') as f:
+            values.frombytes(f.read())
+        values.byteswap()
+        return memoryview(values)
+
+    def numeric(self, column):
+        """The column's float64 values, or None if no row of this chunk has it"""
+        if column not in self.numeric_columns:
+            return None
+        return self._read(column + NUMERIC_SUFFIX, 'd')
+
+    def codes(self, column):
+        """int32 dictionary codes of a key column"""
+        return self._read(column + CODE_SUFFIX, 'i')
+
+    def dictionary(self, column):
+        """Distinct values of a key column; codes index into this list"""
+        if column not in self._dictionaries:
+            with open(self.path / f'{column}.dict.json', 'r', encoding='utf-8') as f:
+                self._dictionaries[column] = json.load(f)
+        return self._dictionaries[column]
+
+
+def write_chunk(root, rows):
+    """
+    Write rows as a new chunk under root
+
+    Returns:
+        Path: The chunk directory
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    numeric = sorted({field for row in rows for field in row} - set(KEY_COLUMNS))
+
+    # Fill the fields a row lacks with NaN, fetch every column in one itemgetter
+    # call (numeric[0] repeated so a single column still comes back as a
+    # tuple) and transpose the table with zip
+    missing = dict.fromkeys(numeric, NAN)
+    getter = itemgetter(*numeric, numeric[0])
+    table = [getter({**missing, **row}) for row in rows]
+
+    tmp = Path(tempfile.mkdtemp(dir=root, prefix='.chunk-'))
+    try:
+        for column, values in zip(numeric, zip(*table)):
+            with open(tmp / (column + NUMERIC_SUFFIX), 'wb') as f:
+                array('d', values).tofile(f)
+
+        for column in KEY_COLUMNS:
+            lookup = {}
+            codes = array('i', (lookup.setdefault(row.get(column) or '', len(lookup)) for row in rows))
+            with open(tmp / (column + CODE_SUFFIX), 'wb') as f:
+                codes.tofile(f)
+            with open(tmp / f'{column}.dict.json', 'w', encoding='utf-8') as f:
+                json.dump(list(lookup), f, separators=(',', ':'))
+
+        with open(tmp / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'rows': len(rows),
+                'numeric': numeric,
+                'keys': list(KEY_COLUMNS),
+                'byteorder': sys.byteorder,
+            }, f)
+
+        # Chunk numbers only grow, so a rename never replaces an existing chunk
+        existing = [int(path.name.split('-')[1]) for path in root.glob('chunk-*')]
+        path = root / f'chunk-{max(existing, default=-1) + 1:06d}'
+        os.rename(tmp, path)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return path
+
+
+class ColumnStore:
+    """Chunked column files of participant stats"""
+
+    def __init__(self, root=COLUMN_STORE_DIR, chunk_rows=CHUNK_ROWS):
+        self.root = Path(root)
+        self.chunk_rows = chunk_rows
+
+    def chunks(self):
+        return [Chunk(path) for path in sorted(self.root.glob('chunk-*'))]
+
+    def columns(self):
+        """Names of the numeric columns in any chunk"""
+        return sorted(set().union(*(chunk.numeric_columns for chunk in self.chunks())))
+
+    def match_ids(self):
+        """Set of match IDs already stored"""
+        return {match_id for chunk in self.chunks() for match_id in chunk.dictionary('match_id')}
+
+    def append(self, matches):
+        """
+        Add the participants of matches not stored yet
+
+        Args:
+            matches: Iterable of raw match payloads
+
+        Returns:
+            tuple: (matches added, rows written)
+        """
+        known = self.match_ids()
+        rows = []
+        added = 0
+        written = 0
+        for match_data in matches:
+            match_id = match_data.get('metadata', {}).get('matchId')
+            if not match_id or match_id in known:
+                continue
+            known.add(match_id)
+            rows.extend(participant_rows(match_data))
+            added += 1
+            if len(rows) >= self.chunk_rows:
+                write_chunk(self.root, rows)
+                written += len(rows)
+                rows = []
+        if rows:
+            write_chunk(self.root, rows)
+            written += len(rows)
+        return added, written
+
+    def _selected(self, chunk, where):
+        """Indices of the chunk's rows matching every where filter, or None for all rows"""
+        selected = None
+        for column, value in (where or {}).items():
+            names = chunk.dictionary(column)
+            if value not in names:
+                return []
+            wanted = names.index(value)
+            codes = chunk.codes(column)
+            if selected is None:
+                selected = [i for i, code in enumerate(codes) if code == wanted]
+            else:
+                selected = [i for i in selected if codes[i] == wanted]
+        return selected
+
+    def group_stats(self, column, by=None, where=None):
+        """
+        Count, mean, min and max of a numeric column, optionally grouped
+
+        Rows where the column is missing (NaN) are skipped.
+
+        Args:
+            column: Numeric column (e.g. 'challenges.damagePerMinute')
+            by: Key column to group by (e.g. 'champion_name'), or None for one group
+            where: dict of key column -> value rows must equal (e.g. {'puuid': ...})
+
+        Returns:
+            dict: group value (None when ungrouped) -> {'count', 'mean', 'min', 'max'}
+        """
+        totals = {}
+        for chunk in self.chunks():
+            values = chunk.numeric(column)
+            if values is None:
+                continue
+            selected = self._selected(chunk, where)
+
+            if by is None:
+                # NaN != NaN marks a missing value
+                present = [value for value in (values if selected is None else map(values.__getitem__, selected))
+                           if value == value]
+                partial = {None: (sum(present), len(present), min(present, default=0), max(present, default=0))}
+            else:
+                names = chunk.dictionary(by)
+                codes = chunk.codes(by)
+                sums = [0.0] * len(names)
+                counts = [0] * len(names)
+                lows = [math.inf] * len(names)
+                highs = [-math.inf] * len(names)
+                pairs = zip(codes, values) if selected is None else ((codes[i], values[i]) for i in selected)
+                for code, value in pairs:
+                    if value != value:
+                        continue
+                    sums[code] += value
+                    counts[code] += 1
+                    if value < lows[code]:
+                        lows[code] = value
+                    if value > highs[code]:
+                        highs[code] = value
+                partial = {name: group for name, group in zip(names, zip(sums, counts, lows, highs))}
+
+            for name, (total, count, low, high) in partial.items():
+                if not count:
+                    continue
+                group = totals.setdefault(name, [0.0, 0, math.inf, -math.inf])
+                group[0] += total
+                group[1] += count
+                group[2] = min(group[2], low)
+                group[3] = max(group[3], high)
+
+        return {
+            name: {'count': count, 'mean': total / count, 'min': low, 'max': high}
+            for name, (total, count, low, high) in totals.items()
+        }
+
+    def export_csv(self, path, columns=None, where=None):
+        """
+        Write rows to a CSV file (key columns first) for pandas, DuckDB or Arrow
+
+        Args:
+            path: Output file
+            columns: Numeric columns to include (default: all)
+            where: dict of key column -> value rows must equal
+
+        Returns:
+            int: Rows written
+        """
+        columns = list(columns) if columns else self.columns()
+        written = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(list(KEY_COLUMNS) + columns)
+            for chunk in self.chunks():
+                selected = self._selected(chunk, where)
+                keys = [(chunk.codes(column), chunk.dictionary(column)) for column in KEY_COLUMNS]
+                values = [chunk.numeric(column) for column in columns]
+                for i in range(chunk.rows) if selected is None else selected:
+                    row = [names[codes[i]] for codes, names in keys]
+                    row.extend('' if column is None or column[i] != column[i] else column[i] for column in values)
+                    writer.writerow(row)
+                    written += 1
+        return written
+
+
+column_store = ColumnStore()
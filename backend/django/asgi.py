@@ -0,0 +1,12 @@
+"""
+ASGI entry point, used to serve the async fetch views concurrently, e.g.
+
+    uvicorn backend.django.asgi:application
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.django.settings')
+
+application = get_asgi_application()
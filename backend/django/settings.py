@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.ServerTimingMiddleware',  # first, so its total covers the other middleware
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS must be before CommonMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -42,9 +43,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Send per-request stage, Riot API and database timings as a Server-Timing header
+SERVER_TIMING = config('SERVER_TIMING', default=True, cast=bool)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['Server-Timing']
 
 # Database
 DATABASES = {
@@ -54,6 +59,63 @@ DATABASES = {
     }
 }
 
+# Cache (locmem, file or redis; redis expects a local server or stand-in at CACHE_LOCATION)
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_DEFAULT_LOCATIONS = {
+    'locmem': 'gametrack',
+    'file': str(BASE_DIR / '.cache'),
+    'redis': 'redis://127.0.0.1:6379',
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_DEFAULT_LOCATIONS[CACHE_BACKEND]),
+    }
+}
+if CACHE_BACKEND != 'redis':
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=1000, cast=int)}
+
+# Riot API response caching: TTL in seconds per Riot method (None caches forever)
+RIOT_CACHE_ALIAS = 'default'
+RIOT_CACHE_TTLS = {
+    'match-by-id': None,  # finished matches never change
+    'match-ids-by-puuid': config('RIOT_CACHE_MATCH_IDS_TTL', default=60, cast=int),
+    'account-by-riot-id': config('RIOT_CACHE_ACCOUNT_TTL', default=3600, cast=int),
+}
+
+# Background sync jobs (see backend/jobs.py and `manage.py run_sync_worker`)
+SYNC_JOB_MAX_ATTEMPTS = config('SYNC_JOB_MAX_ATTEMPTS', default=5, cast=int)
+SYNC_JOB_RETRY_DELAY = config('SYNC_JOB_RETRY_DELAY', default=30, cast=int)  # seconds, doubled per attempt
+SYNC_JOB_RETRY_MAX_DELAY = config('SYNC_JOB_RETRY_MAX_DELAY', default=900, cast=int)
+SYNC_JOB_TIMEOUT = config('SYNC_JOB_TIMEOUT', default=1800, cast=int)  # running jobs older than this are requeued
+
+# Scheduled refresh of tracked players (`manage.py schedule_refreshes`)
+# Tiers by activity: (name, viewed or played within N seconds (None = everyone else),
+# refresh interval in seconds, sync job priority)
+REFRESH_TIERS = [
+    ('hot', 24 * 3600, config('REFRESH_HOT_INTERVAL', default=15 * 60, cast=int), 10),
+    ('warm', 7 * 24 * 3600, config('REFRESH_WARM_INTERVAL', default=2 * 3600, cast=int), 20),
+    ('cold', None, config('REFRESH_COLD_INTERVAL', default=24 * 3600, cast=int), 30),
+]
+# Share of the Riot rate limit kept free for interactive lookups. Like the
+# rate limits themselves it is enforced per process: RIOT_RATE_PROCESSES (see
+# backend/auth/riotAPI.py) must count the web server and sync worker processes
+REFRESH_RESERVED_CAPACITY = config('REFRESH_RESERVED_CAPACITY', default=0.5, cast=float)
+
+# Rolling-window trends (see backend/trends.py): default window sizes in matches,
+# and the largest window, which is how many recent matches PlayerTrend keeps
+TREND_WINDOWS = [int(size) for size in config('TREND_WINDOWS', default='5,10,20').split(',')]
+TREND_MAX_WINDOW = max(config('TREND_MAX_WINDOW', default=50, cast=int), *TREND_WINDOWS)
+
+# Store every participant of an ingested match (Player stubs and their stats),
+# not only the player being synced
+INGEST_CO_PARTICIPANTS = config('INGEST_CO_PARTICIPANTS', default=True, cast=bool)
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
@@ -79,6 +141,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Root URL configuration
 ROOT_URLCONF = 'backend.django.urls'
 
+# ASGI application (the Riot fetch views are async)
+ASGI_APPLICATION = 'backend.django.asgi.application'
+
 # Templates
 TEMPLATES = [
     {
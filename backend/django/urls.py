@@ -12,10 +12,22 @@ urlpatterns = [
     # GameTrack API endpoints
     path('api/players/search', views.lookup_player, name='lookup-player'),
     path('api/players/<str:puuid>/matches', views.get_player_matches, name='player-matches'),
+    path('api/players/<str:puuid>/sync', views.queue_player_sync, name='queue-player-sync'),
+    path('api/players/<str:puuid>/breakdown', views.get_player_breakdown, name='player-breakdown'),
+    path('api/players/<str:puuid>/trends', views.get_player_trends, name='player-trends'),
+
+    # Background sync job status
+    path('api/jobs/<int:job_id>', views.get_sync_job, name='sync-job'),
 
     # Fetch stats using get_stats functions (user input from frontend)
     path('api/players/fetch-stats', views.fetch_player_stats, name='fetch-player-stats'),
 
     # Cached data endpoint (reads from JSON files created by main.py)
     path('api/matches/cached', views.get_cached_matches, name='cached-matches'),
+
+    # Riot API response cache counters
+    path('api/cache/stats', views.get_riot_cache_stats, name='riot-cache-stats'),
+
+    # Prometheus metrics (request stages, DB queries, Riot API calls)
+    path('api/metrics', views.get_metrics, name='metrics'),
 ]
@@ -0,0 +1,171 @@
+"""
+Normalization of raw Riot match payloads into typed rows.
+
+A payload is taken apart once, at ingest: the match columns, both teams
+(MatchTeam) and every participant (MatchParticipant). Questions about other
+players, teams or objectives are then plain indexed queries, and the raw
+payload in the match store is only opened when something needs a field that
+was not extracted.
+
+A tracked player's PlayerMatchStats row is copied from their MatchParticipant
+row (player_stats_fields), not parsed from the payload again, so it can be
+built for any stored match the player appears in through the participants'
+(puuid, match) index.
+
+Functions return field dicts rather than model instances so the data
+migration can build rows with its historical models.
+"""
+
+
+def calculate_kda(kills, deaths, assists):
+    """KDA ratio, (kills + assists) / deaths, or kills + assists without deaths"""
+    if deaths == 0:
+        return float(kills + assists)
+    return round((kills + assists) / deaths, 2)
+
+
+def match_fields(match_data):
+    """Match columns of a raw payload (without raw_data_key)"""
+    info = match_data['info']
+    return {
+        'match_id': match_data['metadata']['matchId'],
+        'game_creation': info['gameCreation'],
+        'game_duration': info['gameDuration'],
+        'game_mode': info['gameMode'],
+        'game_type': info['gameType'],
+    }
+
+
+def participant_stats(participant):
+    """
+    Stat columns shared by PlayerMatchStats and MatchParticipant
+
+    Args:
+        participant: One entry of match_data['info']['participants']
+
+    Returns:
+        dict: Field name -> value, including the calculated kda
+    """
+    # Extract challenges data
+    challenges = participant.get('challenges', {})
+
+    kills = participant.get('kills', 0)
+    deaths = participant.get('deaths', 0)
+    assists = participant.get('assists', 0)
+
+    return {
+        'kills': kills,
+        'deaths': deaths,
+        'assists': assists,
+        'win': participant.get('win', False),
+        'champion_id': participant.get('championId', 0),
+        'champion_name': participant.get('championName', ''),
+        'champ_level': participant.get('champLevel', 1),
+        'team_position': participant.get('teamPosition', ''),
+        'double_kills': participant.get('doubleKills', 0),
+        'triple_kills': participant.get('tripleKills', 0),
+        'quadra_kills': participant.get('quadraKills', 0),
+        'penta_kills': participant.get('pentaKills', 0),
+        'total_damage_dealt_to_champions': participant.get('totalDamageDealtToChampions', 0),
+        'gold_earned': participant.get('goldEarned', 0),
+        'total_minions_killed': participant.get('totalMinionsKilled', 0),
+        'vision_score': participant.get('visionScore', 0),
+        'wards_placed': participant.get('wardsPlaced', 0),
+        'wards_killed': participant.get('wardsKilled', 0),
+        'kda': calculate_kda(kills, deaths, assists),
+        'kill_participation': challenges.get('killParticipation'),
+        'damage_per_minute': challenges.get('damagePerMinute'),
+        'gold_per_minute': challenges.get('goldPerMinute'),
+    }
+
+
+# PUUID Riot gives every bot participant
+BOT_PUUID = 'BOT'
+
+# Stat columns PlayerMatchStats copies from the player's MatchParticipant row
+PARTICIPANT_STAT_FIELDS = tuple(participant_stats({}))
+
+
+def participant_rows(match_data):
+    """MatchParticipant field dicts for every participant of a raw payload"""
+    rows = []
+    for slot, participant in enumerate(match_data['info'].get('participants', []), start=1):
+        rows.append({
+            'participant_id': participant.get('participantId', slot),
+            'puuid': participant.get('puuid', ''),
+            'riot_id_game_name': participant.get('riotIdGameName', ''),
+            'riot_id_tagline': participant.get('riotIdTagline', ''),
+            'team_id': participant.get('teamId', 0),
+            **participant_stats(participant),
+        })
+    return rows
+
+
+def team_rows(match_data):
+    """MatchTeam field dicts for both teams of a raw payload"""
+    rows = []
+    for team in match_data['info'].get('teams', []):
+        objectives = team.get('objectives', {})
+        champion = objectives.get('champion', {})
+        tower = objectives.get('tower', {})
+        dragon = objectives.get('dragon', {})
+        baron = objectives.get('baron', {})
+
+        rows.append({
+            'team_id': team['teamId'],
+            'win': team.get('win', False),
+            'champion_kills': champion.get('kills', 0),
+            'tower_kills': tower.get('kills', 0),
+            'inhibitor_kills': objectives.get('inhibitor', {}).get('kills', 0),
+            'dragon_kills': dragon.get('kills', 0),
+            'baron_kills': baron.get('kills', 0),
+            'rift_herald_kills': objectives.get('riftHerald', {}).get('kills', 0),
+            'first_blood': champion.get('first', False),
+            'first_tower': tower.get('first', False),
+            'first_dragon': dragon.get('first', False),
+            'first_baron': baron.get('first', False),
+        })
+    return rows
+
+
+def build_match_rows(match, match_data, team_model, participant_model):
+    """
+    Unsaved team and participant rows of a raw payload
+
+    Args:
+        match: The Match (or historical Match) the rows belong to
+        match_data: Raw match payload
+        team_model: MatchTeam model class
+        participant_model: MatchParticipant model class
+
+    Returns:
+        tuple: (list of teams, list of participants)
+    """
+    teams = [team_model(match=match, **fields) for fields in team_rows(match_data)]
+    participants = [participant_model(match=match, **fields) for fields in participant_rows(match_data)]
+    return teams, participants
+
+
+def participants_by_puuid(participants):
+    """Index a match's MatchParticipant rows by PUUID"""
+    return {participant.puuid: participant for participant in participants}
+
+
+def player_stats_fields(participant):
+    """
+    PlayerMatchStats fields (all but player) from a MatchParticipant row
+
+    Args:
+        participant: MatchParticipant, saved or not, with its match set
+
+    Returns:
+        dict: Field name -> value
+    """
+    match = participant.match
+    return {
+        'match': match,
+        'game_creation': match.game_creation,
+        'game_mode': match.game_mode,
+        'game_duration': match.game_duration,
+        **{field: getattr(participant, field) for field in PARTICIPANT_STAT_FIELDS},
+    }
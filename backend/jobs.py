@@ -0,0 +1,207 @@
+"""
+Database-backed queue of player sync jobs.
+
+Views enqueue a SyncJob and answer 202 straight away; one or more
+`manage.py run_sync_worker` processes claim queued jobs and run
+sync.sync_player_matches for them, so slow Riot fetches never hold a web
+worker. The sync_jobs table is the whole queue, no broker needed:
+
+- A partial unique constraint allows one queued or running job per player,
+  so repeated requests for the same PUUID share a job.
+- Workers claim a job with a conditional UPDATE (status queued -> running),
+  which only one of several competing workers can win.
+- Failed attempts are requeued with exponential backoff until max_attempts.
+- Running jobs whose worker died are requeued after SYNC_JOB_TIMEOUT.
+
+Riot calls go through the worker process's shared client, so every job in
+a worker draws from the same rate limiter as the rest of that process.
+Limiters are per process, so RIOT_RATE_PROCESSES must count every worker
+and web server process. Scheduled (non-interactive) jobs can be given a
+client held to (1 - REFRESH_RESERVED_CAPACITY) of that limiter, see
+riotAPI.get_refresh_client.
+"""
+import os
+import random
+import socket
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import SyncJob
+from .sync import sync_match_ids, sync_player_matches
+
+# Jobs looked at per claim attempt, in case other workers win the first ones
+CLAIM_CANDIDATES = 10
+
+
+def worker_name():
+    """Identifier of this worker process"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_sync(player, backfill=False, max_ids=None, priority=SyncJob.PRIORITY_INTERACTIVE, run_after=None):
+    """
+    Queue a sync for the player, or return the job already queued or running for them
+
+    Args:
+        player: Player to sync
+        backfill: Walk the full match history instead of only new matches
+        max_ids: Stop listing after this many match IDs
+        priority: Lower runs first (SyncJob.PRIORITY_INTERACTIVE for user requests)
+        run_after: Earliest start (default: now)
+
+    Returns:
+        tuple: (SyncJob, created)
+    """
+    run_after = run_after or timezone.now()
+    active = SyncJob.objects.filter(player=player, status__in=SyncJob.ACTIVE_STATUSES).first()
+    if active is None:
+        try:
+            with transaction.atomic():
+                job = SyncJob.objects.create(
+                    player=player,
+                    backfill=backfill,
+                    max_ids=max_ids,
+                    priority=priority,
+                    run_after=run_after,
+                    max_attempts=settings.SYNC_JOB_MAX_ATTEMPTS
+                )
+            return job, True
+        except IntegrityError:
+            # Another request queued one between the check and the insert
+            active = SyncJob.objects.get(player=player, status__in=SyncJob.ACTIVE_STATUSES)
+
+    # A job that has not started yet is widened to a backfill and moved up to
+    # the more urgent request's priority and start time
+    changes = {}
+    if backfill and not active.backfill:
+        changes.update(backfill=True, max_ids=max_ids)
+    if priority < active.priority:
+        changes['priority'] = priority
+    if run_after < active.run_after:
+        changes['run_after'] = run_after
+    if changes and SyncJob.objects.filter(pk=active.pk, status=SyncJob.STATUS_QUEUED).update(**changes):
+        active.refresh_from_db()
+    return active, False
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt: exponential backoff with jitter, capped"""
+    delay = settings.SYNC_JOB_RETRY_DELAY * 2 ** (attempts - 1)
+    return min(delay, settings.SYNC_JOB_RETRY_MAX_DELAY) + random.uniform(0, settings.SYNC_JOB_RETRY_DELAY)
+
+
+def requeue_stale_jobs():
+    """Put back running jobs whose worker has not finished them within SYNC_JOB_TIMEOUT"""
+    now = timezone.now()
+    return SyncJob.objects.filter(
+        status=SyncJob.STATUS_RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.SYNC_JOB_TIMEOUT)
+    ).update(status=SyncJob.STATUS_QUEUED, worker='', run_after=now, updated_at=now)
+
+
+def claim_job(worker):
+    """
+    Take the next due job for this worker, most urgent priority first
+
+    Returns:
+        SyncJob: The claimed job (status running, attempts incremented), or None if none is due
+    """
+    now = timezone.now()
+    candidates = list(
+        SyncJob.objects.filter(status=SyncJob.STATUS_QUEUED, run_after__lte=now)
+        .order_by('priority', 'run_after', 'pk')
+        .values_list('pk', flat=True)[:CLAIM_CANDIDATES]
+    )
+    for pk in candidates:
+        claimed = SyncJob.objects.filter(pk=pk, status=SyncJob.STATUS_QUEUED).update(
+            status=SyncJob.STATUS_RUNNING,
+            worker=worker,
+            started_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now
+        )
+        if claimed:
+            return SyncJob.objects.select_related('player').get(pk=pk)
+    return None
+
+
+def finish_job(job, stored_count=0, errors=None, error=''):
+    """
+    Record the outcome of an attempt
+
+    A failed attempt (error, or matches that could not be fetched) is
+    requeued with backoff while attempts remain. When they run out, a job
+    that stored what it could is done with its errors kept; one that never
+    got that far is failed.
+    """
+    now = timezone.now()
+    job.matches_stored += stored_count
+    job.errors = errors or {}
+    job.last_error = error
+    job.worker = ''
+
+    if (error or job.errors) and job.attempts < job.max_attempts:
+        job.status = SyncJob.STATUS_QUEUED
+        job.run_after = now + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        job.status = SyncJob.STATUS_FAILED if error else SyncJob.STATUS_DONE
+        job.finished_at = now
+    job.save(update_fields=[
+        'status', 'matches_stored', 'errors', 'last_error', 'worker', 'run_after', 'finished_at', 'updated_at'
+    ])
+
+
+def run_job(api, job):
+    """Run one attempt of a claimed job"""
+    try:
+        stored, errors = sync_player_matches(api, job.player, backfill=job.backfill, max_ids=job.max_ids)
+
+        # Matches that failed last attempt and were not listed again (a capped backfill) are fetched by ID
+        retry_ids = [match_id for match_id in job.errors if match_id not in stored and match_id not in errors]
+        if retry_ids:
+            retried, errors_left = sync_match_ids(api, job.player, retry_ids)
+            stored.update(retried)
+            errors.update(errors_left)
+    except Exception as e:
+        print(f"Sync job {job.pk} for {job.player} failed: {e}")
+        finish_job(job, errors=job.errors, error=str(e))
+        return
+    finish_job(job, stored_count=len(stored), errors=errors)
+
+
+def run_worker(api, worker=None, poll_interval=2.0, burst=False, log=print, refresh_api=None):
+    """
+    Process sync jobs until interrupted
+
+    Args:
+        api: RiotAPIClient shared by every job
+        worker: Name recorded on claimed jobs (default: host:pid)
+        poll_interval: Seconds to sleep when no job is due
+        burst: Return once no job is due instead of polling
+        refresh_api: Client for jobs below interactive priority (default: api)
+
+    Returns:
+        int: Number of attempts run
+    """
+    worker = worker or worker_name()
+    attempts = 0
+    while True:
+        close_old_connections()
+        requeue_stale_jobs()
+        job = claim_job(worker)
+        if job is None:
+            if burst:
+                return attempts
+            time.sleep(poll_interval)
+            continue
+
+        log(f"{worker}: running sync job {job.pk} for {job.player} (attempt {job.attempts}/{job.max_attempts})")
+        scheduled = refresh_api is not None and job.priority > SyncJob.PRIORITY_INTERACTIVE
+        run_job(refresh_api if scheduled else api, job)
+        attempts += 1
+        log(f"{worker}: sync job {job.pk} {job.status}, {job.matches_stored} matches stored")
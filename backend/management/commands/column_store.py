@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.column_store import KEY_COLUMNS, ColumnStore, column_store
+from backend.match_import import iter_file_matches, iter_match_files
+from backend.match_store import match_store
+from backend.models import Match
+
+
+def stored_matches():
+    """Yield the payload of every stored match that has one in the match store"""
+    keys = Match.objects.exclude(raw_data_key='').order_by('game_creation').values_list('raw_data_key', flat=True)
+    for key in keys.iterator(chunk_size=2000):
+        match_data = match_store.get(key)
+        if match_data is not None:
+            yield match_data
+
+
+class Command(BaseCommand):
+    help = "Build, query or export the columnar store of every numeric participant and challenge stat"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', help="Column store directory (default: COLUMN_STORE_DIR)")
+        actions = parser.add_subparsers(dest='action', required=True)
+
+        build = actions.add_parser('build', help="Add matches not in the column store yet")
+        build.add_argument('paths', nargs='*',
+                           help="JSON dumps or match store directories (default: every match in the database)")
+
+        stats = actions.add_parser('stats', help="Count, mean, min and max of a column")
+        stats.add_argument('column', help="Numeric column, e.g. challenges.damagePerMinute")
+        stats.add_argument('--by', choices=KEY_COLUMNS, help="Group by this key column")
+        stats.add_argument('--puuid', help="Only this player's rows")
+        stats.add_argument('--champion', help="Only rows on this champion")
+
+        export = actions.add_parser('export', help="Write rows to CSV")
+        export.add_argument('output', help="CSV file to write")
+        export.add_argument('--column', action='append', dest='columns', default=[],
+                            help="Numeric column to include (repeatable; default: all)")
+        export.add_argument('--puuid', help="Only this player's rows")
+
+        actions.add_parser('columns', help="List the numeric columns")
+
+    def handle(self, *args, **options):
+        store = ColumnStore(options['root']) if options['root'] else column_store
+        getattr(self, f"handle_{options['action']}")(store, options)
+
+    def handle_build(self, store, options):
+        started = time.perf_counter()
+        if options['paths']:
+            matches = (match for path in iter_match_files(options['paths']) for match in iter_file_matches(path))
+        else:
+            matches = stored_matches()
+        added, rows = store.append(matches)
+        self.stdout.write(f"{added} matches added ({rows} participant rows) in {time.perf_counter() - started:.1f}s")
+
+    def handle_stats(self, store, options):
+        where = {}
+        if options['puuid']:
+            where['puuid'] = options['puuid']
+        if options['champion']:
+            where['champion_name'] = options['champion']
+
+        started = time.perf_counter()
+        groups = store.group_stats(options['column'], by=options['by'], where=where)
+        elapsed = time.perf_counter() - started
+        if not groups:
+            raise CommandError(f"No values for {options['column']}")
+
+        for name, group in sorted(groups.items(), key=lambda item: -item[1]['count']):
+            label = f"{name:<20} " if options['by'] else ''
+            self.stdout.write(
+                f"{label}n={group['count']:<8} mean={group['mean']:.3f}  min={group['min']:.3f}  max={group['max']:.3f}"
+            )
+        rows = sum(group['count'] for group in groups.values())
+        self.stdout.write(f"{rows} values in {elapsed * 1000:.1f} ms")
+
+    def handle_export(self, store, options):
+        where = {'puuid': options['puuid']} if options['puuid'] else None
+        written = store.export_csv(options['output'], columns=options['columns'] or None, where=where)
+        self.stdout.write(f"{written} rows written to {options['output']}")
+
+    def handle_columns(self, store, options):
+        for column in store.columns():
+            self.stdout.write(column)
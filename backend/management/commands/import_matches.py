@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.match_import import BATCH_SIZE, import_matches
+from backend.models import Player
+
+
+class Command(BaseCommand):
+    help = "Import raw match JSON dumps (e.g. dataTenMatches.json) or match store directories into the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help="JSON files or directories of .json / .json.gz files")
+        parser.add_argument('--puuid', action='append', dest='puuids', default=[],
+                            help="Create stats only for this stored player (repeatable; default: every participant "
+                                 "when INGEST_CO_PARTICIPANTS is on, else every stored player)")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Matches inserted per transaction")
+        parser.add_argument('--no-raw', action='store_true',
+                            help="Do not copy payloads into the match store (Match.raw_data will be empty)")
+
+    def handle(self, *args, **options):
+        if options['puuids'] and not Player.objects.filter(puuid__in=options['puuids']).exists():
+            raise CommandError("None of the given PUUIDs belong to a stored player")
+
+        totals = import_matches(
+            options['paths'],
+            set(options['puuids']) or None,
+            batch_size=options['batch_size'],
+            store_raw=not options['no_raw'],
+            co_participants=settings.INGEST_CO_PARTICIPANTS and not options['puuids'],
+            log=self.stdout.write
+        )
+
+        rate = (totals['imported'] + totals['skipped']) / totals['seconds'] if totals['seconds'] else 0
+        self.stdout.write(
+            f"{totals['files']} files: {totals['imported']} matches imported, {totals['skipped']} already stored, "
+            f"{totals['stats']} player stats rows in {totals['seconds']:.1f}s ({rate:.0f} matches/s)"
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from backend.aggregates import build_aggregate_rows
+from backend.models import PlayerAggregate, PlayerMatchStats, PlayerTrend
+from backend.trends import build_trend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-player rollups (PlayerAggregate) and trend state (PlayerTrend) from stored PlayerMatchStats"
+
+    def add_arguments(self, parser):
+        parser.add_argument('puuids', nargs='*', help="PUUIDs of players to rebuild (default: every player)")
+
+    def handle(self, *args, **options):
+        aggregates = PlayerAggregate.objects.all()
+        trends = PlayerTrend.objects.all()
+        stats = PlayerMatchStats.objects.all()
+        if options['puuids']:
+            aggregates = aggregates.filter(player_id__in=options['puuids'])
+            trends = trends.filter(player_id__in=options['puuids'])
+            stats = stats.filter(player_id__in=options['puuids'])
+
+        with transaction.atomic():
+            deleted, _ = aggregates.delete()
+            rows = PlayerAggregate.objects.bulk_create(build_aggregate_rows(stats), batch_size=1000)
+
+            trends.delete()
+            player_ids = stats.order_by().values_list('player_id', flat=True).distinct()
+            rebuilt = PlayerTrend.objects.bulk_create(
+                [build_trend(player_id, stats) for player_id in player_ids], batch_size=500
+            )
+
+        self.stdout.write(f"Replaced {deleted} rollup rows with {len(rows)}, rebuilt trends of {len(rebuilt)} players")
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.auth.riotAPI import get_refresh_client, get_riot_client
+from backend.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Run queued player sync jobs (POST /api/players/fetch-stats and /api/players/<puuid>/sync)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to wait when no job is due")
+        parser.add_argument('--burst', action='store_true', help="Exit once no job is due instead of polling")
+        parser.add_argument('--name', default=None, help="Worker name recorded on jobs (default: host:pid)")
+
+    def handle(self, *args, **options):
+        api_client = get_riot_client(settings.RIOT_API_KEY, base_url="https://americas.api.riotgames.com")
+        # Scheduled refreshes leave REFRESH_RESERVED_CAPACITY of this process's limit to user requests
+        refresh_client = get_refresh_client(api_client, settings.REFRESH_RESERVED_CAPACITY)
+
+        try:
+            attempts = run_worker(
+                api_client,
+                worker=options['name'],
+                poll_interval=options['poll_interval'],
+                burst=options['burst'],
+                log=self.stdout.write,
+                refresh_api=refresh_client
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Worker stopped")
+            return
+
+        self.stdout.write(f"No jobs due, ran {attempts} attempts")
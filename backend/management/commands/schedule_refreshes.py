@@ -0,0 +1,53 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.scheduler import plan_refreshes, queue_refreshes, refresh_rate
+
+
+class Command(BaseCommand):
+    help = "Queue background syncs for tracked players that are due, by activity tier, within the refresh rate budget"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Print the planned schedule without queueing jobs")
+        parser.add_argument('--every', type=int, default=300,
+                            help="Seconds between runs; also how far ahead each run plans (default: 300)")
+        parser.add_argument('--loop', action='store_true', help="Keep planning every --every seconds")
+
+    def handle(self, *args, **options):
+        horizon = timedelta(seconds=options['every'])
+        self.stdout.write(f"Refresh budget: {refresh_rate():.3f} Riot requests/s")
+
+        while True:
+            now = timezone.now()
+            plan = plan_refreshes(now=now, horizon=horizon)
+
+            if options['dry_run']:
+                self.print_plan(plan, now)
+                return
+
+            created = queue_refreshes(plan)
+            total = sum(entry['requests'] for entry in plan)
+            self.stdout.write(f"{now:%H:%M:%S} queued {created} refreshes (~{total} Riot requests)")
+
+            if not options['loop']:
+                return
+            try:
+                time.sleep(options['every'])
+            except KeyboardInterrupt:
+                self.stdout.write("Scheduler stopped")
+                return
+
+    def print_plan(self, plan, now):
+        self.stdout.write(f"{'start':>8}  {'tier':<5} {'prio':>4} {'requests':>8}  {'last synced':<19}  player")
+        for entry in plan:
+            player = entry['player']
+            last_synced = f"{player.last_synced_at:%Y-%m-%d %H:%M:%S}" if player.last_synced_at else 'never'
+            self.stdout.write(
+                f"{'+' + str(int((entry['run_after'] - now).total_seconds())) + 's':>8}  "
+                f"{entry['tier']:<5} {entry['priority']:>4} {entry['requests']:>8}  {last_synced:<19}  {player}"
+            )
+        total = sum(entry['requests'] for entry in plan)
+        self.stdout.write(f"{len(plan)} refreshes planned, ~{total} Riot requests (dry run, nothing queued)")
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.auth.riotAPI import get_riot_client
+from backend.models import Player
+from backend.sync import SyncError, sync_player_matches
+
+
+class Command(BaseCommand):
+    help = "Sync stored players' matches from the Riot API (only matches newer than each player's cursor)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('puuids', nargs='*', help="PUUIDs of stored players (default: every stored player but stubs)")
+        parser.add_argument('--backfill', action='store_true', help="Walk each player's full match history in pages of 100")
+        parser.add_argument('--max-ids', type=int, default=None, help="Stop listing after this many match IDs per player")
+
+    def handle(self, *args, **options):
+        if options['puuids']:
+            players = Player.objects.filter(puuid__in=options['puuids'])
+            if not players.exists():
+                raise CommandError("None of the given PUUIDs belong to a stored player")
+        else:
+            players = Player.objects.filter(is_stub=False)
+
+        api_client = get_riot_client(settings.RIOT_API_KEY, base_url="https://americas.api.riotgames.com")
+
+        for player in players:
+            try:
+                stored, errors = sync_player_matches(
+                    api_client, player, backfill=options['backfill'], max_ids=options['max_ids']
+                )
+            except SyncError as e:
+                self.stderr.write(str(e))
+                continue
+            self.stdout.write(f"{player}: {len(stored)} new matches, {len(errors)} failed")
+            for match_id, error in errors.items():
+                self.stderr.write(f"  {match_id}: {error}")
@@ -0,0 +1,166 @@
+"""
+Filters and keyset pagination for the match history endpoint.
+
+Pages are ordered newest first by (game_creation, match_id). The cursor is the
+(game_creation, match_id) of the last row served, and the next page is every
+row strictly after it in that order, so each page is a single index range scan
+on one of the (player, <filter>, -game_creation) indexes however deep it is,
+instead of an OFFSET that re-reads every earlier page.
+"""
+import base64
+import json
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+
+RESULTS = {'win': True, 'loss': False}
+
+
+def encode_cursor(game_creation, match_id):
+    """Opaque cursor pointing just after a row"""
+    raw = json.dumps([game_creation, match_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor from encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        game_creation, match_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(game_creation, int) or not isinstance(match_id, str):
+        raise ValueError("Invalid cursor")
+    return game_creation, match_id
+
+
+def parse_timestamp(value, end_of_day=False):
+    """
+    Parse an ISO date or datetime into a Unix timestamp in milliseconds
+
+    A bare date means midnight UTC, or the end of that day when end_of_day is
+    True so that date_to includes the whole day.
+
+    Raises:
+        ValueError: If the value is not an ISO date or datetime
+    """
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+    else:
+        moment = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        if end_of_day:
+            moment += timedelta(days=1) - timedelta(milliseconds=1)
+    return int(moment.timestamp() * 1000)
+
+
+def parse_history_params(params):
+    """
+    Validate the match history query parameters
+
+    Args:
+        params: request.GET
+
+    Returns:
+        dict: 'champion', 'game_mode', 'win' (True/False/None), 'date_from' and
+              'date_to' (epoch ms or None), 'cursor' (tuple or None), 'limit'
+
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid
+    """
+    try:
+        limit = int(params.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+
+    result = params.get('result', '').lower()
+    if result and result not in RESULTS:
+        raise ValueError("result must be 'win' or 'loss'")
+
+    dates = {}
+    for name in ('date_from', 'date_to'):
+        value = params.get(name)
+        try:
+            dates[name] = parse_timestamp(value, end_of_day=name == 'date_to') if value else None
+        except ValueError:
+            raise ValueError(f"{name} must be an ISO date or datetime")
+
+    cursor = params.get('cursor')
+
+    return {
+        "champion": params.get('champion') or None,
+        "game_mode": params.get('game_mode') or None,
+        "win": RESULTS.get(result),
+        "date_from": dates['date_from'],
+        "date_to": dates['date_to'],
+        "cursor": decode_cursor(cursor) if cursor else None,
+        "limit": min(limit, MAX_PAGE_SIZE),
+    }
+
+
+def filter_history(queryset, filters):
+    """Apply the champion, game mode, result and date filters to a PlayerMatchStats queryset"""
+    if filters['champion']:
+        queryset = queryset.filter(champion_name=filters['champion'])
+    if filters['game_mode']:
+        queryset = queryset.filter(game_mode=filters['game_mode'].upper())
+    if filters['win'] is not None:
+        queryset = queryset.filter(win=filters['win'])
+    if filters['date_from'] is not None:
+        queryset = queryset.filter(game_creation__gte=filters['date_from'])
+    if filters['date_to'] is not None:
+        queryset = queryset.filter(game_creation__lte=filters['date_to'])
+    return queryset
+
+
+def history_page(queryset, filters):
+    """
+    Queryset of one page of history, newest first
+
+    One row more than the page size is selected so the caller can tell
+    whether there is a next page without a separate COUNT query.
+    """
+    queryset = filter_history(queryset, filters).order_by('-game_creation', '-match_id')
+    if filters['cursor']:
+        game_creation, match_id = filters['cursor']
+        queryset = queryset.filter(
+            Q(game_creation__lt=game_creation) |
+            Q(game_creation=game_creation, match_id__lt=match_id)
+        )
+    return queryset[:filters['limit'] + 1]
+
+
+def split_page(rows, limit):
+    """
+    Trim the extra row fetched by history_page
+
+    Args:
+        rows: .values() dicts with 'game_creation' and 'match_id'
+        limit: Page size
+
+    Returns:
+        tuple: (rows of this page, cursor of the next page or None)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last['game_creation'], last['match_id'])
+
+
+def has_filters(filters):
+    """True if any of the champion, game mode, result or date filters is set"""
+    return any(filters[name] is not None for name in ('champion', 'game_mode', 'win', 'date_from', 'date_to'))
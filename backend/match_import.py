@@ -0,0 +1,189 @@
+"""
+Bulk import of raw match payloads from JSON dumps.
+
+Accepts the dump format main.py writes (a JSON array of matches, like
+dataTenMatches.json), single-match .json files and the match store's own
+.json.gz files, so a store directory can be re-imported into a fresh
+database. Arrays are streamed with match_stream.iter_json_array, so memory
+stays bounded by one batch whatever the file size.
+
+Each batch is one transaction of bulk_create calls; match IDs already in the
+database are skipped before any row is built, except that players missing
+from them get their stats from the stored participant rows. With
+co_participants every participant gets a Player (a stub if new) and stats,
+not only the stored players. Imported matches do not move a player's sync
+cursor, since a dump can have gaps that the next sync would then never list.
+"""
+import gzip
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.db import transaction
+
+from .ingest import build_match_rows, match_fields, player_stats_fields
+from .match_store import match_store
+from .match_stream import WHITESPACE, iter_json_array
+from .models import Match, MatchParticipant, MatchTeam, Player, PlayerMatchStats
+from .sync import is_player, lock_players, player_stub, save_participant_stats
+
+BATCH_SIZE = 500
+
+
+def iter_match_files(paths):
+    """Yield the .json and .json.gz files under each path (directories are walked in name order)"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            for child in sorted(path.rglob('*')):
+                if child.is_file() and child.name.endswith(('.json', '.json.gz')):
+                    yield child
+        else:
+            yield path
+
+
+def iter_file_matches(path):
+    """
+    Yield the match payloads in a file
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON
+    """
+    if path.name.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            yield json.load(f)
+        return
+
+    # A top-level array is streamed; anything else is a single match
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first and first in WHITESPACE:
+            first = f.read(1)
+    if first == '[':
+        yield from iter_json_array(path)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield json.load(f)
+
+
+def import_batch(batch, puuids=None, store_raw=True, co_participants=False):
+    """
+    Insert one batch of payloads
+
+    Args:
+        batch: Raw match payloads
+        puuids: Set of PUUIDs to create PlayerMatchStats for, if they are
+                stored players (default: every stored player)
+        store_raw: Also write each payload to the match store
+        co_participants: Also store every other participant (Player stubs and their stats)
+
+    Returns:
+        tuple: (matches imported, matches skipped, PlayerMatchStats created)
+    """
+    payloads = {}
+    for match_data in batch:
+        payloads.setdefault(match_data['metadata']['matchId'], match_data)
+    known = set(Match.objects.filter(match_id__in=list(payloads)).values_list('match_id', flat=True))
+
+    new_matches = []
+    new_teams = []
+    new_participants = []
+    without_stats = []
+    stubs = {}
+    new_stats = defaultdict(list)
+
+    for match_id, match_data in payloads.items():
+        if match_id in known:
+            continue
+
+        raw_data_key = match_store.put(match_id, match_data) if store_raw else ''
+        match = Match(raw_data_key=raw_data_key, **match_fields(match_data))
+        new_matches.append(match)
+
+        teams, participants = build_match_rows(match, match_data, MatchTeam, MatchParticipant)
+        new_teams.extend(teams)
+        new_participants.extend(participants)
+        without_stats.extend(participants)
+
+    # Players without stats in already stored matches get them from the
+    # stored participant rows
+    if known:
+        have_stats = set(
+            PlayerMatchStats.objects.filter(match_id__in=list(known)).values_list('player_id', 'match_id')
+        )
+        stored_participants = MatchParticipant.objects.filter(match_id__in=list(known)).select_related('match')
+        without_stats.extend(
+            participant for participant in stored_participants
+            if (participant.puuid, participant.match_id) not in have_stats
+        )
+
+    # Stats rows for every tracked player in the batch; only this batch's
+    # PUUIDs are looked up, so memory does not grow with the players table
+    batch_puuids = {participant.puuid for participant in without_stats}
+    if puuids is not None:
+        batch_puuids &= puuids
+    tracked = set(Player.objects.filter(puuid__in=batch_puuids).values_list('puuid', flat=True))
+    for participant in without_stats:
+        if participant.puuid not in tracked:
+            if not co_participants or not is_player(participant):
+                continue
+            stubs.setdefault(participant.puuid, player_stub(participant))
+        new_stats[participant.puuid].append(
+            PlayerMatchStats(player_id=participant.puuid, **player_stats_fields(participant))
+        )
+
+    with transaction.atomic():
+        Match.objects.bulk_create(new_matches, ignore_conflicts=True)
+        MatchTeam.objects.bulk_create(new_teams, ignore_conflicts=True)
+        MatchParticipant.objects.bulk_create(new_participants, ignore_conflicts=True)
+        Player.objects.bulk_create(stubs.values(), ignore_conflicts=True, batch_size=1000)
+        lock_players(new_stats)
+        stats_count = save_participant_stats(new_stats, list(payloads))
+
+    return len(new_matches), len(batch) - len(new_matches), stats_count
+
+
+def import_matches(paths, puuids=None, batch_size=BATCH_SIZE, store_raw=True, co_participants=False, log=print):
+    """
+    Import every match payload found under `paths`
+
+    Args:
+        paths: Files or directories of JSON dumps
+        puuids: Set of PUUIDs to create PlayerMatchStats for, if they are
+                stored players (default: every stored player)
+        batch_size: Payloads inserted per transaction
+        store_raw: Also write each payload to the match store
+        co_participants: Also store every other participant (Player stubs and their stats)
+        log: Called with a progress line after every batch
+
+    Returns:
+        dict: 'files', 'imported', 'skipped' and 'stats' counts and 'seconds' taken
+    """
+    totals = {"files": 0, "imported": 0, "skipped": 0, "stats": 0}
+    start = time.perf_counter()
+
+    def flush(batch):
+        imported, skipped, stats = import_batch(batch, puuids, store_raw=store_raw, co_participants=co_participants)
+        totals['imported'] += imported
+        totals['skipped'] += skipped
+        totals['stats'] += stats
+        elapsed = time.perf_counter() - start
+        seen = totals['imported'] + totals['skipped']
+        log(
+            f"{seen} matches read, {totals['imported']} imported, {totals['skipped']} skipped "
+            f"({seen / elapsed:.0f} matches/s)"
+        )
+
+    batch = []
+    for path in iter_match_files(paths):
+        totals['files'] += 1
+        for match_data in iter_file_matches(path):
+            batch.append(match_data)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+    if batch:
+        flush(batch)
+
+    totals['seconds'] = time.perf_counter() - start
+    return totals
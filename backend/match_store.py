@@ -0,0 +1,87 @@
+"""
+Immutable on-disk store for raw Riot match payloads.
+
+A finished match never changes, so each payload is written exactly once as
+compact gzip-compressed JSON under a path derived from its match ID:
+
+    <MATCH_STORE_DIR>/<platform>/<last two digits>/<match_id>.json.gz
+
+Match.raw_data_key holds that relative path instead of the payload itself.
+This module has no Django dependency so get_stats/ and main.py can use it too.
+"""
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from decouple import config
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MATCH_STORE_DIR = Path(config('MATCH_STORE_DIR', default=str(BASE_DIR / 'match_store')))
+
+# Payloads are written once and read rarely, so favour speed over the last few percent of size
+COMPRESS_LEVEL = 6
+
+
+class MatchStore:
+    """Content store of raw match payloads keyed by match ID"""
+
+    def __init__(self, root=MATCH_STORE_DIR):
+        self.root = Path(root)
+
+    @staticmethod
+    def key_for(match_id):
+        """Relative path of a match's payload (e.g. NA1/22/NA1_5302453222.json.gz)"""
+        platform, _, number = match_id.rpartition('_')
+        return f"{platform or 'UNKNOWN'}/{number[-2:] or '00'}/{match_id}.json.gz"
+
+    def path_for(self, key):
+        return self.root / key
+
+    def contains(self, match_id):
+        return self.path_for(self.key_for(match_id)).exists()
+
+    def put(self, match_id, match_data):
+        """
+        Store a match payload unless it is already present
+
+        Returns:
+            str: Key of the stored payload
+        """
+        key = self.key_for(match_id)
+        path = self.path_for(key)
+        if path.exists():
+            return key
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = gzip.compress(
+            json.dumps(match_data, separators=(',', ':')).encode(),
+            compresslevel=COMPRESS_LEVEL,
+            mtime=0
+        )
+        # Write to a temp file and rename so readers never see a partial payload
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return key
+
+    def get(self, key):
+        """Load a stored payload by key, or None if it is missing"""
+        try:
+            with gzip.open(self.path_for(key), 'rb') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def get_match(self, match_id):
+        """Load a stored payload by match ID, or None if it is missing"""
+        return self.get(self.key_for(match_id))
+
+
+match_store = MatchStore()
@@ -0,0 +1,128 @@
+"""
+Streaming reader for match dumps such as dataTenMatches.json.
+
+The dump is a JSON array of full Riot match payloads. Rather than json.load-ing
+the whole file, matches are decoded one at a time from a fixed-size read
+buffer, the target participant is pulled out and the rest of the match is
+dropped, so memory stays bounded by a single match whatever the file size.
+"""
+import json
+import threading
+
+from .stats_engine import find_participant, transform_participant
+
+CHUNK_SIZE = 256 * 1024
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE):
+    """
+    Yield the elements of a top-level JSON array file one at a time
+
+    Raises:
+        json.JSONDecodeError: If the file is not a well-formed JSON array
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+        started = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+        while True:
+            # Skip whitespace and separators up to the next token
+            while pos < len(buffer) and (buffer[pos] in WHITESPACE or (started and buffer[pos] == ',')):
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    raise json.JSONDecodeError("Unterminated JSON array", buffer, pos)
+                fill()
+                continue
+
+            if not started:
+                if buffer[pos] != '[':
+                    raise json.JSONDecodeError("Expecting '['", buffer, pos)
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element continues past the buffer; read more and retry
+                if eof:
+                    raise
+                fill()
+                continue
+            if end == len(buffer) and not eof:
+                # A number could still continue in the next chunk
+                fill()
+                continue
+            pos = end
+            yield element
+
+
+def read_player_matches(path, puuid):
+    """
+    Stream a match dump and keep only `puuid`'s stats from each match
+
+    Returns:
+        dict: 'matches' (frontend match dicts), 'match_count' (matches in the
+              file), 'game_name' and 'tag_line' of the player (falling back to
+              the first participant of the first match)
+    """
+    result = {"matches": [], "match_count": 0, "game_name": None, "tag_line": None}
+
+    for match_data in iter_json_array(path):
+        result['match_count'] += 1
+        participants = match_data.get('info', {}).get('participants', [])
+        if result['game_name'] is None and participants:
+            result['game_name'] = participants[0].get('riotIdGameName', 'Player')
+            result['tag_line'] = participants[0].get('riotIdTagline', 'NA1')
+
+        player_data = find_participant(match_data, puuid)
+        if not player_data:
+            continue
+        if not result['matches']:
+            result['game_name'] = player_data.get('riotIdGameName', 'Player')
+            result['tag_line'] = player_data.get('riotIdTagline', 'NA1')
+        result['matches'].append(transform_participant(match_data, player_data))
+
+    return result
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_player_matches(path, puuid):
+    """
+    read_player_matches with an in-memory cache
+
+    The parsed result is reused until the file's mtime or size changes.
+    """
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = (str(path), puuid)
+
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    result = read_player_matches(path, puuid)
+    with _cache_lock:
+        _cache[key] = (version, result)
+    return result
@@ -0,0 +1,236 @@
+"""
+Request timings and process-wide metrics.
+
+Each request handled through backend.middleware.ServerTimingMiddleware gets a
+RequestTimings in a context variable. Views time their stages with span(),
+RiotAPIClient reports every call with record_riot_call(), and the database
+execute wrapper installed in BackendConfig.ready() counts queries. asgiref
+copies the context into sync_to_async threads, so work done off the event
+loop is still attributed to its request.
+
+When the request ends, the timings go out as a Server-Timing header and are
+added to the process-wide counters and histograms below, which
+GET /api/metrics renders in the Prometheus text format. Riot calls outside a
+request (sync worker, main.py) only reach the process-wide metrics.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Histogram upper bounds in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        with self._lock:
+            # Per bucket counts, then the total count and the sum
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0, 0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += 1
+            state[-1] += value
+
+    def samples(self):
+        with self._lock:
+            values = {key: list(state) for key, state in self._values.items()}
+        for key, state in sorted(values.items()):
+            labels = dict(zip(self.labels, key))
+            for bound, count in zip(self.buckets, state):
+                yield f"{self.name}_bucket", {**labels, 'le': repr(bound)}, count
+            yield f"{self.name}_bucket", {**labels, 'le': '+Inf'}, state[-2]
+            yield f"{self.name}_sum", labels, state[-1]
+            yield f"{self.name}_count", labels, state[-2]
+
+
+REQUESTS = Counter('gametrack_http_requests_total', 'HTTP requests handled', ('view', 'method', 'status'))
+REQUEST_DURATION = Histogram('gametrack_http_request_duration_seconds', 'HTTP request duration', ('view',))
+STAGE_DURATION = Histogram('gametrack_stage_duration_seconds', 'Duration of view stages', ('view', 'stage'))
+DB_QUERIES = Counter('gametrack_db_queries_total', 'Database queries run by requests', ('view',))
+DB_DURATION = Counter('gametrack_db_query_seconds_total', 'Time spent in database queries by requests', ('view',))
+RIOT_REQUESTS = Counter('gametrack_riot_requests_total', 'Riot API responses received', ('method', 'status'))
+RIOT_DURATION = Histogram('gametrack_riot_request_duration_seconds', 'Riot API call duration', ('method',))
+RIOT_RETRIES = Counter('gametrack_riot_retries_total', 'Riot API calls retried after a 429', ('method',))
+RIOT_COALESCED = Counter('gametrack_riot_coalesced_total', 'Riot API GETs served by an identical in-flight call', ('method',))
+
+METRICS = (
+    REQUESTS, REQUEST_DURATION, STAGE_DURATION, DB_QUERIES, DB_DURATION,
+    RIOT_REQUESTS, RIOT_DURATION, RIOT_RETRIES, RIOT_COALESCED,
+)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help_text}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class RequestTimings:
+    """Stage, Riot and database timings of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.riot_calls = 0
+        self.riot_seconds = 0.0
+        self.riot_retries = 0
+        self.riot_coalesced = 0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        # Riot calls and queries can be recorded from several threads at once
+        self.lock = threading.Lock()
+
+    def add_stage(self, name, seconds):
+        with self.lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def server_timing(self, total):
+        """Server-Timing header value (durations in milliseconds)"""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        if self.riot_calls or self.riot_coalesced:
+            entries.append(
+                f'riot;desc="{self.riot_calls} calls, {self.riot_retries} retries, '
+                f'{self.riot_coalesced} coalesced";dur={self.riot_seconds * 1000:.1f}'
+            )
+        entries.append(f'db;desc="{self.db_queries} queries";dur={self.db_seconds * 1000:.1f}')
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ', '.join(entries)
+
+
+_current = ContextVar('gametrack_request_timings', default=None)
+
+
+def start_request():
+    """
+    Begin collecting timings for a request
+
+    Returns:
+        tuple: (RequestTimings, token for end_request)
+    """
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(timings, token, view, method, status_code):
+    """
+    Stop collecting and add the request to the process-wide metrics
+
+    Returns:
+        float: Total request duration in seconds
+    """
+    _current.reset(token)
+    total = time.perf_counter() - timings.started
+    REQUESTS.inc(view=view, method=method, status=status_code)
+    REQUEST_DURATION.observe(total, view=view)
+    for stage, seconds in timings.stages.items():
+        STAGE_DURATION.observe(seconds, view=view, stage=stage)
+    DB_QUERIES.inc(timings.db_queries, view=view)
+    DB_DURATION.inc(timings.db_seconds, view=view)
+    return total
+
+
+@contextmanager
+def span(name):
+    """Time a stage of the current request (a no-op outside one)"""
+    timings = _current.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.add_stage(name, time.perf_counter() - started)
+
+
+def record_riot_call(riot_method, status_code, seconds, retry=False):
+    """Record one Riot API call attempt (status_code 'error' when no response came back)"""
+    RIOT_REQUESTS.inc(method=riot_method, status=status_code)
+    RIOT_DURATION.observe(seconds, method=riot_method)
+    if retry:
+        RIOT_RETRIES.inc(method=riot_method)
+    timings = _current.get()
+    if timings is not None:
+        with timings.lock:
+            timings.riot_calls += 1
+            timings.riot_seconds += seconds
+            timings.riot_retries += retry
+
+
+def record_riot_coalesced(riot_method):
+    """Record a Riot GET answered by an identical call already in flight"""
+    RIOT_COALESCED.inc(method=riot_method)
+    timings = _current.get()
+    if timings is not None:
+        with timings.lock:
+            timings.riot_coalesced += 1
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of the current request"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        with timings.lock:
+            timings.db_queries += 1
+            timings.db_seconds += time.perf_counter() - started
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """connection_created receiver adding db_execute_wrapper to every new connection"""
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
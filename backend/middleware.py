@@ -0,0 +1,51 @@
+"""
+Per-request timing middleware.
+
+ServerTimingMiddleware collects the stage, Riot API and database timings of
+each request (see backend.metrics), adds them to the response as a
+Server-Timing header (browser devtools show it under the request's Timing
+tab) and records them in the process-wide metrics served at /api/metrics.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import end_request, start_request
+
+
+class ServerTimingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        timings, token = start_request()
+        response = None
+        try:
+            response = self.get_response(request)
+        finally:
+            self.finish(request, response, timings, token)
+        return response
+
+    async def __acall__(self, request):
+        timings, token = start_request()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.finish(request, response, timings, token)
+        return response
+
+    def finish(self, request, response, timings, token):
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match and match.url_name else 'unmatched'
+        status_code = response.status_code if response is not None else 500
+        total = end_request(timings, token, view, request.method, status_code)
+        if response is not None and settings.SERVER_TIMING:
+            response['Server-Timing'] = timings.server_timing(total)
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='last_game_creation',
+            field=models.BigIntegerField(blank=True, help_text='Unix timestamp (ms) of the newest stored match', null=True),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='last_match_id',
+            field=models.CharField(blank=True, default='', help_text='Newest stored match ID', max_length=50),
+        ),
+    ]
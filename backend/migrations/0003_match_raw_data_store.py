@@ -0,0 +1,32 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:24
+
+from django.db import migrations, models
+
+
+def move_raw_data_to_store(apps, schema_editor):
+    from backend.match_store import match_store
+
+    Match = apps.get_model('backend', 'Match')
+    for match in Match.objects.exclude(raw_data=None).iterator():
+        match.raw_data_key = match_store.put(match.match_id, match.raw_data)
+        match.save(update_fields=['raw_data_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0002_player_sync_cursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='raw_data_key',
+            field=models.CharField(blank=True, default='', help_text='Key of the full Riot API payload in the match store', max_length=100),
+        ),
+        migrations.RunPython(move_raw_data_to_store, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='match',
+            name='raw_data',
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_aggregates(apps, schema_editor):
+    from backend.aggregates import build_aggregate_rows
+
+    PlayerMatchStats = apps.get_model('backend', 'PlayerMatchStats')
+    PlayerAggregate = apps.get_model('backend', 'PlayerAggregate')
+    PlayerAggregate.objects.bulk_create(
+        build_aggregate_rows(PlayerMatchStats.objects.all(), PlayerAggregate),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_match_raw_data_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('all', 'All matches'), ('champion', 'Per champion'), ('game_mode', 'Per game mode')], max_length=20)),
+                ('key', models.CharField(blank=True, default='', help_text="Champion name or game mode ('' for all matches)", max_length=50)),
+                ('matches', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('kills', models.IntegerField(default=0)),
+                ('deaths', models.IntegerField(default=0)),
+                ('assists', models.IntegerField(default=0)),
+                ('total_damage_dealt_to_champions', models.BigIntegerField(default=0)),
+                ('gold_earned', models.BigIntegerField(default=0)),
+                ('total_minions_killed', models.IntegerField(default=0)),
+                ('vision_score', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aggregates', to='backend.player')),
+            ],
+            options={
+                'verbose_name': 'Player Aggregate',
+                'verbose_name_plural': 'Player Aggregates',
+                'db_table': 'player_aggregates',
+                'unique_together': {('player', 'scope', 'key')},
+            },
+        ),
+        migrations.RunPython(build_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:22
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_match_fields(apps, schema_editor):
+    Match = apps.get_model('backend', 'Match')
+    PlayerMatchStats = apps.get_model('backend', 'PlayerMatchStats')
+    match = Match.objects.filter(pk=OuterRef('match_id'))
+    PlayerMatchStats.objects.update(
+        game_creation=Subquery(match.values('game_creation')[:1]),
+        game_mode=Subquery(match.values('game_mode')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_player_aggregate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playermatchstats',
+            name='game_creation',
+            field=models.BigIntegerField(default=0, help_text='Unix timestamp when game was created (copy of match.game_creation)'),
+        ),
+        migrations.AddField(
+            model_name='playermatchstats',
+            name='game_mode',
+            field=models.CharField(blank=True, default='', help_text='Game mode (copy of match.game_mode)', max_length=50),
+        ),
+        migrations.RunPython(copy_match_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='playermatchstats',
+            index=models.Index(fields=['player', '-game_creation', '-match'], name='player_matc_player__3fc861_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playermatchstats',
+            index=models.Index(fields=['player', 'champion_name', '-game_creation'], name='player_matc_player__6f4a0e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playermatchstats',
+            index=models.Index(fields=['player', 'game_mode', '-game_creation'], name='player_matc_player__802191_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playermatchstats',
+            index=models.Index(fields=['player', 'win', '-game_creation'], name='player_matc_player__ef927d_idx'),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def normalize_stored_matches(apps, schema_editor):
+    from backend.ingest import build_match_rows
+    from backend.match_store import match_store
+
+    Match = apps.get_model('backend', 'Match')
+    MatchTeam = apps.get_model('backend', 'MatchTeam')
+    MatchParticipant = apps.get_model('backend', 'MatchParticipant')
+    for match in Match.objects.exclude(raw_data_key='').iterator():
+        match_data = match_store.get(match.raw_data_key)
+        if match_data is None:
+            continue
+        teams, participants = build_match_rows(match, match_data, MatchTeam, MatchParticipant)
+        MatchTeam.objects.bulk_create(teams)
+        MatchParticipant.objects.bulk_create(participants)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_match_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchTeam',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team_id', models.IntegerField(help_text='Riot team ID (100 blue side, 200 red side)')),
+                ('win', models.BooleanField(default=False)),
+                ('champion_kills', models.IntegerField(default=0)),
+                ('tower_kills', models.IntegerField(default=0)),
+                ('inhibitor_kills', models.IntegerField(default=0)),
+                ('dragon_kills', models.IntegerField(default=0)),
+                ('baron_kills', models.IntegerField(default=0)),
+                ('rift_herald_kills', models.IntegerField(default=0)),
+                ('first_blood', models.BooleanField(default=False)),
+                ('first_tower', models.BooleanField(default=False)),
+                ('first_dragon', models.BooleanField(default=False)),
+                ('first_baron', models.BooleanField(default=False)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='teams', to='backend.match')),
+            ],
+            options={
+                'verbose_name': 'Match Team',
+                'verbose_name_plural': 'Match Teams',
+                'db_table': 'match_teams',
+                'unique_together': {('match', 'team_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MatchParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant_id', models.IntegerField(help_text='Participant slot in the match (1-10)')),
+                ('puuid', models.CharField(help_text="Participant's PUUID (may not be a stored Player)", max_length=78)),
+                ('riot_id_game_name', models.CharField(blank=True, default='', max_length=100)),
+                ('riot_id_tagline', models.CharField(blank=True, default='', max_length=10)),
+                ('team_id', models.IntegerField(help_text='Riot team ID (100 blue side, 200 red side)')),
+                ('team_position', models.CharField(blank=True, default='', help_text='TOP, JUNGLE, MIDDLE, BOTTOM or UTILITY', max_length=20)),
+                ('kills', models.IntegerField(default=0)),
+                ('deaths', models.IntegerField(default=0)),
+                ('assists', models.IntegerField(default=0)),
+                ('win', models.BooleanField(default=False)),
+                ('champion_id', models.IntegerField()),
+                ('champion_name', models.CharField(max_length=50)),
+                ('champ_level', models.IntegerField(default=1)),
+                ('double_kills', models.IntegerField(default=0)),
+                ('triple_kills', models.IntegerField(default=0)),
+                ('quadra_kills', models.IntegerField(default=0)),
+                ('penta_kills', models.IntegerField(default=0)),
+                ('total_damage_dealt_to_champions', models.IntegerField(default=0)),
+                ('gold_earned', models.IntegerField(default=0)),
+                ('total_minions_killed', models.IntegerField(default=0)),
+                ('vision_score', models.IntegerField(default=0)),
+                ('wards_placed', models.IntegerField(default=0)),
+                ('wards_killed', models.IntegerField(default=0)),
+                ('kda', models.FloatField(blank=True, null=True)),
+                ('kill_participation', models.FloatField(blank=True, null=True)),
+                ('damage_per_minute', models.FloatField(blank=True, null=True)),
+                ('gold_per_minute', models.FloatField(blank=True, null=True)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='backend.match')),
+            ],
+            options={
+                'verbose_name': 'Match Participant',
+                'verbose_name_plural': 'Match Participants',
+                'db_table': 'match_participants',
+                'indexes': [models.Index(fields=['puuid', 'match'], name='match_parti_puuid_ac6a09_idx'), models.Index(fields=['champion_name'], name='match_parti_champio_54a69d_idx')],
+                'unique_together': {('match', 'participant_id')},
+            },
+        ),
+        migrations.RunPython(normalize_stored_matches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_match_teams_participants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('backfill', models.BooleanField(default=False, help_text='Walk the full match history instead of only new matches')),
+                ('max_ids', models.IntegerField(blank=True, help_text='Stop listing after this many match IDs', null=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('max_attempts', models.IntegerField(default=5)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Not picked up before this time (retry backoff)')),
+                ('worker', models.CharField(blank=True, default='', help_text='Worker running the job', max_length=100)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('matches_stored', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=dict, help_text='Match ID -> error of the last attempt')),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_jobs', to='backend.player')),
+            ],
+            options={
+                'verbose_name': 'Sync Job',
+                'verbose_name_plural': 'Sync Jobs',
+                'db_table': 'sync_jobs',
+                'indexes': [models.Index(fields=['status', 'run_after'], name='sync_jobs_status_8e4aed_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='syncjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('player',), name='sync_jobs_one_active_per_player'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0007_sync_jobs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='syncjob',
+            name='sync_jobs_status_8e4aed_idx',
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='last_synced_at',
+            field=models.DateTimeField(blank=True, help_text='Last successful match sync', null=True),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='last_viewed_at',
+            field=models.DateTimeField(blank=True, help_text="Last time the player's stats were requested", null=True),
+        ),
+        migrations.AddField(
+            model_name='syncjob',
+            name='priority',
+            field=models.IntegerField(default=0, help_text='Lower runs first (0 = user request)'),
+        ),
+        migrations.AddIndex(
+            model_name='syncjob',
+            index=models.Index(fields=['status', 'priority', 'run_after'], name='sync_jobs_status_32bb99_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:49
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def copy_breakdown_fields(apps, schema_editor):
+    Match = apps.get_model('backend', 'Match')
+    MatchParticipant = apps.get_model('backend', 'MatchParticipant')
+    Player = apps.get_model('backend', 'Player')
+    PlayerMatchStats = apps.get_model('backend', 'PlayerMatchStats')
+    match = Match.objects.filter(pk=OuterRef('match_id'))
+    PlayerMatchStats.objects.update(game_duration=Subquery(match.values('game_duration')[:1]))
+
+    # The player's own participant row has the position
+    for puuid in Player.objects.filter(match_stats__isnull=False).distinct().values_list('puuid', flat=True):
+        participant = MatchParticipant.objects.filter(match_id=OuterRef('match_id'), puuid=puuid)
+        PlayerMatchStats.objects.filter(player_id=puuid).update(
+            team_position=Coalesce(Subquery(participant.values('team_position')[:1]), Value(''))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_refresh_scheduling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playermatchstats',
+            name='game_duration',
+            field=models.IntegerField(default=0, help_text='Game duration in seconds (copy of match.game_duration)'),
+        ),
+        migrations.AddField(
+            model_name='playermatchstats',
+            name='team_position',
+            field=models.CharField(blank=True, default='', help_text="TOP, JUNGLE, MIDDLE, BOTTOM, UTILITY or '' (e.g. ARAM)", max_length=20),
+        ),
+        migrations.RunPython(copy_breakdown_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='playermatchstats',
+            index=models.Index(fields=['player', 'champion_name', 'win', 'kills', 'deaths', 'assists', 'total_damage_dealt_to_champions', 'gold_earned', 'total_minions_killed', 'game_duration'], name='player_matc_player__55be14_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playermatchstats',
+            index=models.Index(fields=['player', 'team_position', 'win', 'kills', 'deaths', 'assists', 'total_damage_dealt_to_champions', 'gold_earned', 'total_minions_killed', 'game_duration'], name='player_matc_player__c86fa0_idx'),
+        ),
+    ]
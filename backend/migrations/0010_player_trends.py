@@ -0,0 +1,46 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_trends(apps, schema_editor):
+    from backend.trends import build_trend
+
+    PlayerMatchStats = apps.get_model('backend', 'PlayerMatchStats')
+    PlayerTrend = apps.get_model('backend', 'PlayerTrend')
+    player_ids = PlayerMatchStats.objects.order_by().values_list('player_id', flat=True).distinct()
+    PlayerTrend.objects.bulk_create(
+        (build_trend(player_id, PlayerMatchStats.objects.all(), PlayerTrend) for player_id in player_ids),
+        batch_size=500
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0009_breakdown_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerTrend',
+            fields=[
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trend', serialize=False, to='backend.player')),
+                ('last_match_id', models.CharField(blank=True, default='', max_length=50)),
+                ('last_game_creation', models.BigIntegerField(blank=True, null=True)),
+                ('matches', models.IntegerField(default=0)),
+                ('capacity', models.IntegerField(help_text='Number of recent matches kept (TREND_MAX_WINDOW when built)')),
+                ('recent', models.JSONField(default=list, help_text='Per-match trend metrics of the last `capacity` matches, oldest first')),
+                ('current_streak', models.IntegerField(default=0, help_text='Wins in a row (positive) or losses in a row (negative)')),
+                ('longest_win_streak', models.IntegerField(default=0)),
+                ('longest_loss_streak', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Player Trend',
+                'verbose_name_plural': 'Player Trends',
+                'db_table': 'player_trends',
+            },
+        ),
+        migrations.RunPython(build_trends, migrations.RunPython.noop),
+    ]
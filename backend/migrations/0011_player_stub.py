@@ -0,0 +1,18 @@
+# Generated by Django 4.2.26 on 2026-10-18 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0010_player_trends'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='player',
+            name='is_stub',
+            field=models.BooleanField(default=False, help_text="Created from another player's matches; not synced or scheduled until looked up"),
+        ),
+    ]
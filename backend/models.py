@@ -1,6 +1,11 @@
 from django.db import models
 from django.utils import timezone
 
+from .breakdown import BREAKDOWN_FIELDS
+from .ingest import calculate_kda
+from .match_store import match_store
+from .stats_engine import summarize_totals
+
 
 class Player(models.Model):
     """Stores Riot Games player information"""
@@ -8,6 +13,18 @@ class Player(models.Model):
     game_name = models.CharField(max_length=100, help_text="Riot ID game name")
     tag_line = models.CharField(max_length=10, help_text="Riot ID tag line")
 
+    # Sync cursor: newest match stored for this player
+    last_match_id = models.CharField(max_length=50, blank=True, default='', help_text="Newest stored match ID")
+    last_game_creation = models.BigIntegerField(null=True, blank=True, help_text="Unix timestamp (ms) of the newest stored match")
+
+    # Refresh scheduling (see backend/scheduler.py)
+    last_synced_at = models.DateTimeField(null=True, blank=True, help_text="Last successful match sync")
+    last_viewed_at = models.DateTimeField(null=True, blank=True, help_text="Last time the player's stats were requested")
+    is_stub = models.BooleanField(
+        default=False,
+        help_text="Created from another player's matches; not synced or scheduled until looked up"
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -31,7 +48,7 @@ class Match(models.Model):
     game_mode = models.CharField(max_length=50, help_text="Game mode (e.g., CLASSIC, ARAM)")
     game_type = models.CharField(max_length=50, help_text="Game type (e.g., MATCHED_GAME)")
 
-    raw_data = models.JSONField(help_text="Full match data from Riot API", null=True, blank=True)
+    raw_data_key = models.CharField(max_length=100, blank=True, default='', help_text="Key of the full Riot API payload in the match store")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -53,12 +70,109 @@ class Match(models.Model):
         """Convert Unix timestamp to datetime"""
         return timezone.datetime.fromtimestamp(self.game_creation / 1000, tz=timezone.utc)
 
+    @property
+    def raw_data(self):
+        """Full match data from Riot API, loaded from the match store on first access"""
+        if not hasattr(self, '_raw_data'):
+            self._raw_data = match_store.get(self.raw_data_key) if self.raw_data_key else None
+        return self._raw_data
+
+
+class MatchTeam(models.Model):
+    """Result and objectives of one team in a match"""
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='teams')
+    team_id = models.IntegerField(help_text="Riot team ID (100 blue side, 200 red side)")
+    win = models.BooleanField(default=False)
+
+    # Objectives
+    champion_kills = models.IntegerField(default=0)
+    tower_kills = models.IntegerField(default=0)
+    inhibitor_kills = models.IntegerField(default=0)
+    dragon_kills = models.IntegerField(default=0)
+    baron_kills = models.IntegerField(default=0)
+    rift_herald_kills = models.IntegerField(default=0)
+    first_blood = models.BooleanField(default=False)
+    first_tower = models.BooleanField(default=False)
+    first_dragon = models.BooleanField(default=False)
+    first_baron = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = 'match_teams'
+        verbose_name = 'Match Team'
+        verbose_name_plural = 'Match Teams'
+        unique_together = [['match', 'team_id']]
+
+    def __str__(self):
+        return f"{self.match_id} - team {self.team_id}"
+
+
+class MatchParticipant(models.Model):
+    """Stats of one of the (usually 10) participants in a match, tracked player or not"""
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='participants')
+    participant_id = models.IntegerField(help_text="Participant slot in the match (1-10)")
+    puuid = models.CharField(max_length=78, help_text="Participant's PUUID (may not be a stored Player)")
+    riot_id_game_name = models.CharField(max_length=100, blank=True, default='')
+    riot_id_tagline = models.CharField(max_length=10, blank=True, default='')
+    team_id = models.IntegerField(help_text="Riot team ID (100 blue side, 200 red side)")
+    team_position = models.CharField(max_length=20, blank=True, default='', help_text="TOP, JUNGLE, MIDDLE, BOTTOM or UTILITY")
+
+    # Core stats
+    kills = models.IntegerField(default=0)
+    deaths = models.IntegerField(default=0)
+    assists = models.IntegerField(default=0)
+    win = models.BooleanField(default=False)
+
+    # Champion info
+    champion_id = models.IntegerField()
+    champion_name = models.CharField(max_length=50)
+    champ_level = models.IntegerField(default=1)
+
+    # Combat stats
+    double_kills = models.IntegerField(default=0)
+    triple_kills = models.IntegerField(default=0)
+    quadra_kills = models.IntegerField(default=0)
+    penta_kills = models.IntegerField(default=0)
+    total_damage_dealt_to_champions = models.IntegerField(default=0)
+
+    # Economy stats
+    gold_earned = models.IntegerField(default=0)
+    total_minions_killed = models.IntegerField(default=0)
+
+    # Vision stats
+    vision_score = models.IntegerField(default=0)
+    wards_placed = models.IntegerField(default=0)
+    wards_killed = models.IntegerField(default=0)
+
+    # Calculated metrics
+    kda = models.FloatField(null=True, blank=True)
+    kill_participation = models.FloatField(null=True, blank=True)
+    damage_per_minute = models.FloatField(null=True, blank=True)
+    gold_per_minute = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'match_participants'
+        verbose_name = 'Match Participant'
+        verbose_name_plural = 'Match Participants'
+        unique_together = [['match', 'participant_id']]
+        indexes = [
+            models.Index(fields=['puuid', 'match']),
+            models.Index(fields=['champion_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.match_id} - {self.riot_id_game_name}#{self.riot_id_tagline} ({self.champion_name})"
+
 
 class PlayerMatchStats(models.Model):
     """Stores individual player statistics for a specific match"""
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='match_stats')
     match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='player_stats')
 
+    # Copied from the match so history filters and keyset pagination stay on one indexed table
+    game_creation = models.BigIntegerField(default=0, help_text="Unix timestamp when game was created (copy of match.game_creation)")
+    game_mode = models.CharField(max_length=50, blank=True, default='', help_text="Game mode (copy of match.game_mode)")
+    game_duration = models.IntegerField(default=0, help_text="Game duration in seconds (copy of match.game_duration)")
+
     # Core stats
     kills = models.IntegerField(default=0)
     deaths = models.IntegerField(default=0)
@@ -69,6 +183,7 @@ class PlayerMatchStats(models.Model):
     champion_id = models.IntegerField()
     champion_name = models.CharField(max_length=50)
     champ_level = models.IntegerField(default=1)
+    team_position = models.CharField(max_length=20, blank=True, default='', help_text="TOP, JUNGLE, MIDDLE, BOTTOM, UTILITY or '' (e.g. ARAM)")
 
     # Combat stats
     double_kills = models.IntegerField(default=0)
@@ -104,6 +219,15 @@ class PlayerMatchStats(models.Model):
         indexes = [
             models.Index(fields=['player', '-created_at']),
             models.Index(fields=['win']),
+            # Match history filters, newest first (keyset on game_creation, match)
+            models.Index(fields=['player', '-game_creation', '-match']),
+            models.Index(fields=['player', 'champion_name', '-game_creation']),
+            models.Index(fields=['player', 'game_mode', '-game_creation']),
+            models.Index(fields=['player', 'win', '-game_creation']),
+            # Covering indexes for the champion and role breakdowns: the grouped
+            # aggregation reads only the index, never the table
+            models.Index(fields=['player', 'champion_name', *BREAKDOWN_FIELDS]),
+            models.Index(fields=['player', 'team_position', *BREAKDOWN_FIELDS]),
         ]
 
     def __str__(self):
@@ -111,8 +235,146 @@ class PlayerMatchStats(models.Model):
 
     def save(self, *args, **kwargs):
         """Calculate KDA on save"""
-        if self.deaths == 0:
-            self.kda = float(self.kills + self.assists)
-        else:
-            self.kda = round((self.kills + self.assists) / self.deaths, 2)
+        self.kda = calculate_kda(self.kills, self.deaths, self.assists)
         super().save(*args, **kwargs)
+
+
+class PlayerAggregate(models.Model):
+    """Running totals of a player's stored matches, overall and per champion / game mode"""
+    SCOPE_ALL = 'all'
+    SCOPE_CHAMPION = 'champion'
+    SCOPE_GAME_MODE = 'game_mode'
+    SCOPE_CHOICES = [
+        (SCOPE_ALL, 'All matches'),
+        (SCOPE_CHAMPION, 'Per champion'),
+        (SCOPE_GAME_MODE, 'Per game mode'),
+    ]
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='aggregates')
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    key = models.CharField(max_length=50, blank=True, default='', help_text="Champion name or game mode ('' for all matches)")
+
+    # Running sums
+    matches = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    kills = models.IntegerField(default=0)
+    deaths = models.IntegerField(default=0)
+    assists = models.IntegerField(default=0)
+    total_damage_dealt_to_champions = models.BigIntegerField(default=0)
+    gold_earned = models.BigIntegerField(default=0)
+    total_minions_killed = models.IntegerField(default=0)
+    vision_score = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'player_aggregates'
+        verbose_name = 'Player Aggregate'
+        verbose_name_plural = 'Player Aggregates'
+        unique_together = [['player', 'scope', 'key']]
+
+    def __str__(self):
+        return f"{self.player} - {self.scope} {self.key}".rstrip()
+
+    def totals(self):
+        """Sums keyed like stats_engine.SUMMARY_FIELDS"""
+        return {
+            'win': self.wins,
+            'kills': self.kills,
+            'deaths': self.deaths,
+            'assists': self.assists,
+            'total_damage_dealt_to_champions': self.total_damage_dealt_to_champions,
+            'gold_earned': self.gold_earned,
+            'total_minions_killed': self.total_minions_killed,
+            'vision_score': self.vision_score,
+        }
+
+    def summary(self):
+        """Summary block for these totals"""
+        return summarize_totals(self.matches, self.totals())
+
+
+class PlayerTrend(models.Model):
+    """Rolling-window state of a player's stored matches (see backend/trends.py)"""
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, primary_key=True, related_name='trend')
+
+    # Newest match folded in; older matches arriving later trigger a rebuild
+    last_match_id = models.CharField(max_length=50, blank=True, default='')
+    last_game_creation = models.BigIntegerField(null=True, blank=True)
+    matches = models.IntegerField(default=0)
+
+    capacity = models.IntegerField(help_text="Number of recent matches kept (TREND_MAX_WINDOW when built)")
+    recent = models.JSONField(default=list, help_text="Per-match trend metrics of the last `capacity` matches, oldest first")
+
+    current_streak = models.IntegerField(default=0, help_text="Wins in a row (positive) or losses in a row (negative)")
+    longest_win_streak = models.IntegerField(default=0)
+    longest_loss_streak = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'player_trends'
+        verbose_name = 'Player Trend'
+        verbose_name_plural = 'Player Trends'
+
+    def __str__(self):
+        return f"{self.player} - trend over {self.matches} matches"
+
+
+class SyncJob(models.Model):
+    """A queued "sync player X" request, run by `manage.py run_sync_worker`"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    ACTIVE_STATUSES = [STATUS_QUEUED, STATUS_RUNNING]
+
+    # Lower runs first; scheduled refreshes use their tier's priority
+    PRIORITY_INTERACTIVE = 0
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='sync_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    priority = models.IntegerField(default=PRIORITY_INTERACTIVE, help_text="Lower runs first (0 = user request)")
+    backfill = models.BooleanField(default=False, help_text="Walk the full match history instead of only new matches")
+    max_ids = models.IntegerField(null=True, blank=True, help_text="Stop listing after this many match IDs")
+
+    # Retry state
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Not picked up before this time (retry backoff)")
+    worker = models.CharField(max_length=100, blank=True, default='', help_text="Worker running the job")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Outcome
+    matches_stored = models.IntegerField(default=0)
+    errors = models.JSONField(default=dict, blank=True, help_text="Match ID -> error of the last attempt")
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'sync_jobs'
+        verbose_name = 'Sync Job'
+        verbose_name_plural = 'Sync Jobs'
+        constraints = [
+            # At most one queued or running job per player
+            models.UniqueConstraint(
+                fields=['player'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='sync_jobs_one_active_per_player'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f"SyncJob {self.pk} {self.player_id} ({self.status})"
@@ -0,0 +1,93 @@
+"""
+Caching layer in front of RiotAPIClient for the Django views.
+
+Successful responses are kept in the configured Django cache with a TTL per
+Riot method (see RIOT_CACHE_TTLS): match details forever since a finished
+match never changes, match-ID lists briefly, account lookups for longer.
+"""
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .auth.rateLimiter import method_key
+from .auth.riotAPI import get_riot_client
+
+_MISSING = object()
+
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def _count(method, outcome):
+    with _counters_lock:
+        counts = _counters.setdefault(method, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+
+def cache_stats():
+    """Hit/miss counters per Riot method since the process started, plus misses coalesced in flight"""
+    with _counters_lock:
+        stats = {method: dict(counts) for method, counts in _counters.items()}
+    hits = sum(counts['hits'] for counts in stats.values())
+    misses = sum(counts['misses'] for counts in stats.values())
+    with _clients_lock:
+        coalesced = sum(cached.client.coalesced for cached in _clients.values())
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0,
+        "coalesced": coalesced,
+        "methods": stats,
+    }
+
+
+class CachedRiotAPIClient:
+    """Wraps a RiotAPIClient and serves repeated GETs of cacheable methods from the cache"""
+
+    def __init__(self, client, cache=None, ttls=None):
+        self.client = client
+        self.cache = cache or caches[settings.RIOT_CACHE_ALIAS]
+        self.ttls = settings.RIOT_CACHE_TTLS if ttls is None else ttls
+
+    def cache_key(self, endpoint, params):
+        # Riot IDs can contain spaces and non-ASCII characters, so hash the request
+        request = json.dumps([self.client.base_url, endpoint, params or {}], sort_keys=True)
+        return f"riot:{hashlib.sha1(request.encode()).hexdigest()}"
+
+    def call_api(self, endpoint, params=None, headers=None, method="GET"):
+        riot_method = method_key(endpoint)
+        if method != "GET" or headers or riot_method not in self.ttls:
+            return self.client.call_api(endpoint, params=params, headers=headers, method=method)
+
+        key = self.cache_key(endpoint, params)
+        response = self.cache.get(key, _MISSING)
+        if response is not _MISSING:
+            _count(riot_method, "hits")
+            return response
+
+        _count(riot_method, "misses")
+        response = self.client.call_api(endpoint, params=params)
+        # Failures are not cached so the next call retries Riot
+        if response is not None:
+            self.cache.set(key, response, timeout=self.ttls[riot_method])
+        return response
+
+    @property
+    def base_url(self):
+        return self.client.base_url
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_cached_riot_client(api_key, base_url="https://americas.api.riotgames.com"):
+    """Return the process-wide cached client for a routing host"""
+    with _clients_lock:
+        key = (api_key, base_url)
+        if key not in _clients:
+            _clients[key] = CachedRiotAPIClient(get_riot_client(api_key, base_url=base_url))
+        return _clients[key]
@@ -0,0 +1,163 @@
+"""
+Scheduled refresh of tracked players.
+
+Players fall into the activity tiers of settings.REFRESH_TIERS by the more
+recent of their last view and their last played match. Each tier has its own
+refresh interval and sync job priority. A run of `manage.py
+schedule_refreshes` queues the players that are due, hottest tier and
+stalest sync first. It spaces the jobs' run_after so that scheduled syncs use
+at most (1 - REFRESH_RESERVED_CAPACITY) of a worker process's share of the
+tightest Riot rate-limit window (riotAPI.refresh_share). run_sync_worker
+runs them through a client held to that same share of its limiter
+(riotAPI.get_refresh_client), so a backlog of due jobs cannot use the rest
+either. User requests are queued at SyncJob.PRIORITY_INTERACTIVE to run
+immediately, so they go ahead of any planned refresh and find the reserved
+headroom free. Player stubs stored from other players' matches are not
+scheduled until someone looks them up.
+"""
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .auth.riotAPI import RIOT_RATE_LIMITS, refresh_share
+from .jobs import enqueue_sync
+from .models import Player, SyncJob
+
+# Match IDs listed by a player's first scheduled sync, and per listing request
+REFRESH_MAX_IDS = 100
+
+# Window used to estimate how often a player plays
+ACTIVITY_WINDOW = timedelta(days=7)
+
+
+def refresh_rate(limits=None, reserved=None):
+    """Riot requests per second the scheduler may plan for, what a worker's refresh client allows"""
+    limits = RIOT_RATE_LIMITS if limits is None else limits
+    reserved = settings.REFRESH_RESERVED_CAPACITY if reserved is None else reserved
+    sustained = min(count / window for window, count in limits.items())
+    return sustained * refresh_share(reserved)
+
+
+def last_active(player):
+    """Most recent of the player's last view and last played match, or None"""
+    played = None
+    if player.last_game_creation is not None:
+        played = datetime.fromtimestamp(player.last_game_creation / 1000, tz=dt_timezone.utc)
+    return max((moment for moment in (player.last_viewed_at, played) if moment), default=None)
+
+
+def tier_for(player, now):
+    """
+    The player's refresh tier
+
+    Returns:
+        tuple: (name, active_within, interval, priority) from settings.REFRESH_TIERS
+    """
+    active = last_active(player)
+    for tier in settings.REFRESH_TIERS:
+        active_within = tier[1]
+        if active_within is None or (active and now - active <= timedelta(seconds=active_within)):
+            return tier
+    return settings.REFRESH_TIERS[-1]
+
+
+def estimate_requests(player, now):
+    """
+    Riot requests a sync of the player is expected to make
+
+    One match-ID listing request per page of new matches plus one request
+    per new match, the new matches estimated from how many matches they
+    played in the last ACTIVITY_WINDOW (needs the `recent_matches`
+    annotation from plan_refreshes). A player with no stored matches gets a
+    full first page.
+    """
+    if player.last_game_creation is None:
+        return 1 + REFRESH_MAX_IDS
+    since = player.last_synced_at or now - ACTIVITY_WINDOW
+    matches_per_second = player.recent_matches / ACTIVITY_WINDOW.total_seconds()
+    expected = math.ceil(matches_per_second * (now - since).total_seconds())
+    # The listing pages all the way down to the cursor
+    return expected // REFRESH_MAX_IDS + 1 + expected
+
+
+def plan_refreshes(now=None, horizon=None):
+    """
+    Work out which due players to queue and when
+
+    Args:
+        now: Planning time (default: now)
+        horizon: Only plan refreshes starting within this timedelta; the
+                 rest wait for the next run (default: no limit)
+
+    Returns:
+        list: Dicts with 'player', 'tier', 'priority', 'run_after' and
+              'requests', in start order
+    """
+    now = now or timezone.now()
+    since_ms = int((now - ACTIVITY_WINDOW).timestamp() * 1000)
+    players = (
+        Player.objects
+        .filter(is_stub=False)
+        .exclude(sync_jobs__status__in=SyncJob.ACTIVE_STATUSES)
+        .annotate(recent_matches=Count('match_stats', filter=Q(match_stats__game_creation__gte=since_ms)))
+    )
+
+    due = []
+    for player in players:
+        tier = tier_for(player, now)
+        if player.last_synced_at is None or player.last_synced_at + timedelta(seconds=tier[2]) <= now:
+            due.append((tier, player))
+    # Hottest tier first, then the longest since its last sync
+    oldest = datetime.min.replace(tzinfo=dt_timezone.utc)
+    due.sort(key=lambda item: (item[0][3], item[1].last_synced_at or oldest))
+
+    # With the whole budget reserved for users nothing is scheduled
+    rate = refresh_rate()
+    if rate <= 0:
+        return []
+
+    # Start after the refreshes already planned by earlier runs
+    start = SyncJob.objects.filter(
+        status=SyncJob.STATUS_QUEUED,
+        priority__gt=SyncJob.PRIORITY_INTERACTIVE
+    ).aggregate(latest=Max('run_after'))['latest']
+    start = max(now, start) if start else now
+
+    plan = []
+    offset = 0.0
+    for tier, player in due:
+        run_after = start + timedelta(seconds=offset)
+        if horizon is not None and run_after > now + horizon:
+            break
+        requests = estimate_requests(player, now)
+        plan.append({
+            "player": player,
+            "tier": tier[0],
+            "priority": tier[3],
+            "run_after": run_after,
+            "requests": requests,
+        })
+        offset += requests / rate
+    return plan
+
+
+def queue_refreshes(plan):
+    """
+    Queue the sync jobs of a plan from plan_refreshes
+
+    Returns:
+        int: Number of jobs created
+    """
+    created = 0
+    for entry in plan:
+        _, was_created = enqueue_sync(
+            entry['player'],
+            max_ids=REFRESH_MAX_IDS,
+            priority=entry['priority'],
+            run_after=entry['run_after']
+        )
+        created += was_created
+    return created
@@ -1,5 +1,6 @@
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Player, Match, PlayerMatchStats
+from .models import Player, Match, PlayerMatchStats, SyncJob
 
 
 class PlayerSerializer(serializers.ModelSerializer):
@@ -26,10 +27,11 @@ class MatchSerializer(serializers.ModelSerializer):
 
 class PlayerMatchStatsSerializer(serializers.ModelSerializer):
     """Serializer for PlayerMatchStats model"""
-    match_id = serializers.CharField(source='match.match_id', read_only=True)
+    # match_id, game_duration and game_mode are columns of the stats row, so only game_datetime needs the Match
+    match_id = serializers.CharField(read_only=True)
     game_datetime = serializers.DateTimeField(source='match.game_datetime', read_only=True)
-    game_duration = serializers.IntegerField(source='match.game_duration', read_only=True)
-    game_mode = serializers.CharField(source='match.game_mode', read_only=True)
+    game_duration = serializers.IntegerField(read_only=True)
+    game_mode = serializers.CharField(read_only=True)
 
     class Meta:
         model = PlayerMatchStats
@@ -62,6 +64,55 @@ class PlayerMatchStatsSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at', 'kda']
 
 
+# PlayerMatchStatsSerializer fields read straight from PlayerMatchStats columns
+STATS_COLUMNS = tuple(
+    field for field in PlayerMatchStatsSerializer.Meta.fields
+    if field not in ('match_id', 'game_datetime')
+)
+DATETIME_COLUMNS = ('created_at', 'updated_at')
+
+_datetime_field = serializers.DateTimeField()
+
+
+def match_stats_values(queryset):
+    """
+    PlayerMatchStats queryset as .values() dicts for serialize_match_stats_values
+
+    game_creation is included for game_datetime and the history cursor.
+    """
+    return queryset.values('match_id', 'game_creation', *STATS_COLUMNS)
+
+
+def serialize_match_stats_values(rows):
+    """
+    Fast path for bulk listings: PlayerMatchStatsSerializer output from .values() rows
+
+    Skips model instances and per-field DRF calls; only the datetimes need
+    formatting, every other column is already JSON-ready.
+
+    Args:
+        rows: Dicts from match_stats_values()
+
+    Returns:
+        list: Dicts equal to PlayerMatchStatsSerializer(many=True).data
+    """
+    to_datetime = _datetime_field.to_representation
+    matches = []
+    for row in rows:
+        match = {
+            "match_id": row['match_id'],
+            "game_datetime": to_datetime(
+                timezone.datetime.fromtimestamp(row['game_creation'] / 1000, tz=timezone.utc)
+            ),
+        }
+        for field in STATS_COLUMNS:
+            match[field] = row[field]
+        for field in DATETIME_COLUMNS:
+            match[field] = to_datetime(row[field])
+        matches.append(match)
+    return matches
+
+
 class PlayerMatchHistorySerializer(serializers.Serializer):
     """Serializer for player match history with all stats"""
     player = PlayerSerializer(read_only=True)
@@ -72,6 +123,20 @@ class PlayerMatchHistorySerializer(serializers.Serializer):
     summary = serializers.DictField(read_only=True)
 
 
+class SyncJobSerializer(serializers.ModelSerializer):
+    """Serializer for SyncJob model"""
+    puuid = serializers.CharField(source='player_id', read_only=True)
+
+    class Meta:
+        model = SyncJob
+        fields = [
+            'id', 'puuid', 'status', 'backfill', 'max_ids',
+            'attempts', 'max_attempts', 'run_after', 'started_at', 'finished_at',
+            'matches_stored', 'errors', 'last_error', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
 class PlayerLookupSerializer(serializers.Serializer):
     """Serializer for player lookup by Riot ID"""
     game_name = serializers.CharField(max_length=100, required=True, help_text="Riot ID game name (e.g., 'Player')")
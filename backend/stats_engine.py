@@ -0,0 +1,134 @@
+"""
+Shared match transform and summary statistics for the match history views.
+
+Each summary field is read with an operator getter mapped over the rows, so
+the per-row work happens in C instead of in a Python generator frame.
+"""
+from operator import attrgetter, itemgetter
+
+from .ingest import calculate_kda
+
+
+# Fields the summary block aggregates over
+SUMMARY_FIELDS = (
+    'win', 'kills', 'deaths', 'assists',
+    'total_damage_dealt_to_champions', 'gold_earned',
+    'total_minions_killed', 'vision_score',
+)
+
+
+def find_participant(match_data, puuid):
+    """Return the participant dict for `puuid` in a raw match payload, or None"""
+    for participant in match_data.get('info', {}).get('participants', []):
+        if participant.get('puuid') == puuid:
+            return participant
+    return None
+
+
+def transform_participant(match_data, player_data):
+    """
+    Convert one participant of a raw Riot match into the frontend match format
+
+    Args:
+        match_data: Raw match payload from /lol/match/v5/matches/{matchId}
+        player_data: The player's entry in match_data['info']['participants']
+
+    Returns:
+        dict: Match stats in the same shape as PlayerMatchStatsSerializer
+    """
+    match_info = match_data.get('info', {})
+
+    # Extract challenges data
+    challenges = player_data.get('challenges', {})
+
+    # Calculate KDA
+    kills = player_data.get('kills', 0)
+    deaths = player_data.get('deaths', 0)
+    assists = player_data.get('assists', 0)
+    kda = calculate_kda(kills, deaths, assists)
+
+    return {
+        "match_id": match_data.get('metadata', {}).get('matchId', ''),
+        "game_datetime": str(match_info.get('gameCreation', 0)),
+        "game_duration": match_info.get('gameDuration', 0),
+        "game_mode": match_info.get('gameMode', ''),
+        "kills": kills,
+        "deaths": deaths,
+        "assists": assists,
+        "win": player_data.get('win', False),
+        "kda": kda,
+        "champion_id": player_data.get('championId', 0),
+        "champion_name": player_data.get('championName', ''),
+        "champ_level": player_data.get('champLevel', 1),
+        "double_kills": player_data.get('doubleKills', 0),
+        "triple_kills": player_data.get('tripleKills', 0),
+        "quadra_kills": player_data.get('quadraKills', 0),
+        "penta_kills": player_data.get('pentaKills', 0),
+        "total_damage_dealt_to_champions": player_data.get('totalDamageDealtToChampions', 0),
+        "damage_per_minute": challenges.get('damagePerMinute'),
+        "gold_earned": player_data.get('goldEarned', 0),
+        "gold_per_minute": challenges.get('goldPerMinute'),
+        "total_minions_killed": player_data.get('totalMinionsKilled', 0),
+        "vision_score": player_data.get('visionScore', 0),
+        "wards_placed": player_data.get('wardsPlaced', 0),
+        "wards_killed": player_data.get('wardsKilled', 0),
+        "kill_participation": challenges.get('killParticipation'),
+        "created_at": "",
+        "updated_at": ""
+    }
+
+
+def transform_matches(raw_matches, puuid):
+    """Transform raw matches into frontend match dicts for `puuid`, skipping matches without the player"""
+    transformed_matches = []
+    for match_data in raw_matches:
+        player_data = find_participant(match_data, puuid)
+        if player_data:
+            transformed_matches.append(transform_participant(match_data, player_data))
+    return transformed_matches
+
+
+def column_totals(rows, fields=SUMMARY_FIELDS, from_attributes=False):
+    """Sum each of `fields` over the rows"""
+    getter = attrgetter if from_attributes else itemgetter
+    return {field: sum(map(getter(field), rows)) for field in fields}
+
+
+def summarize_totals(total_matches, totals):
+    """Compute the summary block (win rate, averages, KDA) from per-field totals"""
+    if total_matches == 0:
+        return {}
+
+    wins = totals['win']
+    total_kills = totals['kills']
+    total_deaths = totals['deaths']
+    total_assists = totals['assists']
+
+    return {
+        "total_matches": total_matches,
+        "wins": wins,
+        "losses": total_matches - wins,
+        "win_rate": round((wins / total_matches) * 100, 1),
+        "avg_kills": round(total_kills / total_matches, 1),
+        "avg_deaths": round(total_deaths / total_matches, 1),
+        "avg_assists": round(total_assists / total_matches, 1),
+        "avg_kda": calculate_kda(total_kills, total_deaths, total_assists),
+        "avg_damage": round(totals['total_damage_dealt_to_champions'] / total_matches, 0),
+        "avg_gold": round(totals['gold_earned'] / total_matches, 0),
+        "avg_cs": round(totals['total_minions_killed'] / total_matches, 1),
+        "avg_vision_score": round(totals['vision_score'] / total_matches, 1),
+    }
+
+
+def summarize_matches(rows, from_attributes=False):
+    """
+    Summary statistics for a list of matches
+
+    Args:
+        rows: Match dicts, or PlayerMatchStats instances when from_attributes is True
+        from_attributes: Read fields as attributes instead of keys
+
+    Returns:
+        dict: Summary block for the match history response ({} when there are no matches)
+    """
+    return summarize_totals(len(rows), column_totals(rows, from_attributes=from_attributes))
@@ -0,0 +1,325 @@
+"""
+Match sync for stored players.
+
+Each Player keeps a cursor (last_game_creation / last_match_id) for the newest
+match stored for them, so a refresh only lists match IDs started since then
+instead of re-requesting the latest N every time.
+
+With settings.INGEST_CO_PARTICIPANTS, a stored match also gets a Player stub
+and PlayerMatchStats row for each of its other participants, so looking one
+of them up later finds most of their recent matches already stored. Only a
+player's own listing moves their cursor, since storing a match for someone
+else says nothing about which of their other matches are stored.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .aggregates import update_aggregates, update_player_aggregates
+from .ingest import BOT_PUUID, build_match_rows, match_fields, participants_by_puuid, player_stats_fields
+from .match_store import match_store
+from .models import Player, Match, MatchParticipant, MatchTeam, PlayerMatchStats
+from .trends import update_player_trends, update_trends
+from get_stats.get_matches import list_match_ids
+from get_stats.get_ten_matches_data import fetch_matches_concurrently
+
+
+class SyncError(Exception):
+    """The player's match IDs could not be listed from the Riot API"""
+
+
+def cursor_start_time(player):
+    """Riot startTime (epoch seconds) for the player's cursor, or None before the first sync"""
+    if player.last_game_creation is None:
+        return None
+    return player.last_game_creation // 1000
+
+
+def new_match_ids(api, player, max_ids=None, page_size=100):
+    """
+    List match IDs for the player that are newer than their sync cursor
+
+    Before the first sync this is the newest `max_ids` IDs. After it every
+    page down to the cursor is listed and `max_ids` is ignored: the cursor
+    moves past the listed matches, so ones left out of a capped listing
+    would never be listed again. The cursor match itself is included by
+    startTime, so callers still filter out IDs they already hold.
+
+    Returns:
+        list: Match IDs (newest first), or None if a Riot API call failed
+    """
+    start_time = cursor_start_time(player)
+    if start_time is None:
+        return list_match_ids(api, player.puuid, max_ids=max_ids, page_size=page_size)
+    return list_match_ids(api, player.puuid, start_time=start_time, page_size=page_size, partial=False)
+
+
+def missing_match_ids(player, match_ids):
+    """Return the IDs from match_ids that have no stored PlayerMatchStats for the player, in order"""
+    stored = set(
+        PlayerMatchStats.objects.filter(player=player, match_id__in=match_ids).values_list('match_id', flat=True)
+    )
+    return [match_id for match_id in match_ids if match_id not in stored]
+
+
+def lock_players(puuids):
+    """
+    Lock the players' rows until the end of the transaction
+
+    Locks are taken in primary key order, so two syncs sharing players
+    cannot deadlock on each other.
+    """
+    list(Player.objects.select_for_update().filter(pk__in=sorted(puuids)).order_by('pk').values_list('pk', flat=True))
+
+
+def save_player_stats(player, stored):
+    """
+    Insert new PlayerMatchStats rows for the player and fold them into the rollups
+
+    Must run inside a transaction. Locks the player and drops rows a
+    concurrent sync already inserted, so the rollups count every match
+    exactly once.
+
+    Args:
+        player: Player the rows belong to
+        stored: Dict of match ID -> unsaved PlayerMatchStats
+
+    Returns:
+        dict: Match ID -> PlayerMatchStats actually inserted
+    """
+    lock_players([player.pk])
+    already_stored = set(
+        PlayerMatchStats.objects.filter(player=player, match_id__in=list(stored))
+        .values_list('match_id', flat=True)
+    )
+    stored = {match_id: stats for match_id, stats in stored.items() if match_id not in already_stored}
+    PlayerMatchStats.objects.bulk_create(stored.values(), ignore_conflicts=True)
+    update_aggregates(player, list(stored.values()))
+    update_trends(player, list(stored.values()))
+    return stored
+
+
+def player_stub(participant):
+    """Unsaved Player for a participant who is not stored yet"""
+    return Player(
+        puuid=participant.puuid,
+        game_name=participant.riot_id_game_name,
+        tag_line=participant.riot_id_tagline,
+        is_stub=True
+    )
+
+
+def is_player(participant):
+    """Whether a participant is a real player (bots share one PUUID)"""
+    return bool(participant.puuid) and participant.puuid != BOT_PUUID
+
+
+def save_participant_stats(stats_by_player, match_ids):
+    """
+    Insert stats rows of many players at once, e.g. every participant of newly stored matches
+
+    Must run inside a transaction that has stored their Player rows (stubs
+    for new ones) and holds their locks (lock_players). Rows that already
+    exist are skipped, the rest are folded into each player's rollups and
+    trend state in bulk. The players' sync cursors are left alone.
+
+    Args:
+        stats_by_player: Dict of PUUID -> unsaved PlayerMatchStats
+        match_ids: IDs of the matches the rows belong to
+
+    Returns:
+        int: PlayerMatchStats rows inserted
+    """
+    if not stats_by_player:
+        return 0
+    already_stored = set(
+        PlayerMatchStats.objects.filter(match_id__in=list(match_ids)).values_list('player_id', 'match_id')
+    )
+    new_stats = {}
+    for player_id, rows in stats_by_player.items():
+        rows = [stats for stats in rows if (player_id, stats.match_id) not in already_stored]
+        if rows:
+            new_stats[player_id] = rows
+
+    PlayerMatchStats.objects.bulk_create(
+        [stats for rows in new_stats.values() for stats in rows], ignore_conflicts=True, batch_size=1000
+    )
+    update_player_aggregates(new_stats)
+    update_player_trends(new_stats)
+    return sum(len(rows) for rows in new_stats.values())
+
+
+def store_fetched_matches(player, fetched_results):
+    """
+    Save fetched match payloads, their teams and participants, and the player's stats from each of them
+
+    Rows are built in memory first and written with bulk_create in one short
+    transaction after the network phase has finished. Matches another lookup
+    already stored are left untouched, since match payloads never change.
+    The player's rollups are updated in the same transaction, and with
+    settings.INGEST_CO_PARTICIPANTS so are the other participants' rows.
+    Returns a dict of match ID -> new PlayerMatchStats.
+    """
+    new_matches = []
+    new_teams = []
+    new_participants = []
+    stored = {}
+    stubs = {}
+    others = defaultdict(list)
+
+    for result in fetched_results:
+        if result['error']:
+            continue
+        match_id = result['match_id']
+        match_data = result['data']
+
+        # Build Match object, keeping the raw payload in the match store
+        match = Match(raw_data_key=match_store.put(match_id, match_data), **match_fields(match_data))
+        new_matches.append(match)
+
+        # Normalize both teams and all participants
+        teams, participants = build_match_rows(match, match_data, MatchTeam, MatchParticipant)
+        new_teams.extend(teams)
+        new_participants.extend(participants)
+
+        # The player's stats are their participant row's columns
+        for puuid, participant in participants_by_puuid(participants).items():
+            if puuid == player.puuid:
+                stored[match_id] = PlayerMatchStats(player=player, **player_stats_fields(participant))
+            elif settings.INGEST_CO_PARTICIPANTS and is_player(participant):
+                stubs.setdefault(puuid, player_stub(participant))
+                others[puuid].append(PlayerMatchStats(player_id=puuid, **player_stats_fields(participant)))
+
+    if not new_matches:
+        return stored
+
+    with transaction.atomic():
+        Match.objects.bulk_create(new_matches, ignore_conflicts=True)
+        MatchTeam.objects.bulk_create(new_teams, ignore_conflicts=True)
+        MatchParticipant.objects.bulk_create(new_participants, ignore_conflicts=True)
+        # Lock the player and everyone they played with in one ordered pass
+        Player.objects.bulk_create(stubs.values(), ignore_conflicts=True, batch_size=1000)
+        lock_players([player.pk, *others])
+        stored = save_player_stats(player, stored)
+        save_participant_stats(others, [match.match_id for match in new_matches])
+    return stored
+
+
+def store_indexed_matches(player, match_ids):
+    """
+    Store the player's stats from matches already in the database
+
+    A match stored for another player also holds this player's
+    MatchParticipant row, found through the participants' (puuid, match)
+    index, so it needs no Riot request and no payload parsing.
+
+    Returns:
+        tuple: (dict of match ID -> new PlayerMatchStats, list of the
+               match_ids not stored yet, in order)
+    """
+    participants = (
+        MatchParticipant.objects.filter(puuid=player.puuid, match_id__in=list(match_ids))
+        .select_related('match')
+    )
+    indexed = {
+        participant.match_id: PlayerMatchStats(player=player, **player_stats_fields(participant))
+        for participant in participants
+    }
+    if not indexed:
+        return {}, list(match_ids)
+
+    with transaction.atomic():
+        stored = save_player_stats(player, indexed)
+    return stored, [match_id for match_id in match_ids if match_id not in indexed]
+
+
+def advance_cursor(player, match_ids):
+    """
+    Move the player's sync cursor up through a listing of their matches
+
+    `match_ids` is a listing, newest first, that reaches back to the cursor.
+    The cursor moves to the newest listed match that has no unstored match
+    listed before it, so a match that failed to fetch holds it back and is
+    listed, and fetched, again by the next sync. Matches already stored from
+    another player's sync are never fetched again, so the listing that
+    covered them, not the store, moves the cursor.
+    """
+    stored = dict(
+        PlayerMatchStats.objects.filter(player=player, match_id__in=list(match_ids))
+        .values_list('match_id', 'game_creation')
+    )
+    newest = None
+    for match_id in reversed(match_ids):
+        if match_id not in stored:
+            break
+        newest = (match_id, stored[match_id])
+    if newest is None or (player.last_game_creation is not None and newest[1] <= player.last_game_creation):
+        return
+    player.last_match_id, player.last_game_creation = newest
+    Player.objects.filter(pk=player.pk).update(last_match_id=newest[0], last_game_creation=newest[1])
+
+
+def sync_player_matches(api, player, backfill=False, max_ids=None, page_size=100):
+    """
+    Bring a player's stored matches up to date
+
+    Args:
+        api: RiotAPIClient used for the requests
+        player: Player to sync
+        backfill: Walk the player's full history instead of only matches newer than the cursor
+        max_ids: Stop listing after this many match IDs (default: no limit); an
+                 incremental sync only applies it before the player's first sync
+        page_size: Match IDs listed per request, and details fetched and stored per batch
+
+    Returns:
+        tuple: (dict of match ID -> new PlayerMatchStats, dict of match ID -> error)
+
+    Raises:
+        SyncError: If listing the match IDs failed
+    """
+    if backfill:
+        match_ids = list_match_ids(api, player.puuid, max_ids=max_ids, page_size=page_size)
+    else:
+        match_ids = new_match_ids(api, player, max_ids=max_ids, page_size=page_size)
+
+    if match_ids is None:
+        raise SyncError(f"Could not list match IDs for {player}")
+
+    stored, errors = sync_match_ids(api, player, match_ids, page_size=page_size)
+    # A capped backfill listing can stop short of the cursor, leaving a gap behind it
+    if not backfill or max_ids is None or player.last_match_id is None or player.last_match_id in match_ids:
+        advance_cursor(player, match_ids)
+    mark_synced(player)
+    return stored, errors
+
+
+def mark_synced(player):
+    """Record that the player's match list was just synced"""
+    player.last_synced_at = timezone.now()
+    Player.objects.filter(pk=player.pk).update(last_synced_at=player.last_synced_at)
+
+
+def sync_match_ids(api, player, match_ids, page_size=100):
+    """
+    Fetch and store the given matches for the player, skipping ones already stored
+
+    The cursor is left alone: only a listing can move it (advance_cursor).
+
+    Returns:
+        tuple: (dict of match ID -> new PlayerMatchStats, dict of match ID -> error)
+    """
+    # Matches already stored for another player need no fetch
+    stored, missing_ids = store_indexed_matches(player, missing_match_ids(player, match_ids))
+    total = len(stored) + len(missing_ids)
+    errors = {}
+
+    # Store page by page so an interrupted backfill keeps what it already fetched
+    for offset in range(0, len(missing_ids), page_size):
+        fetched_results = fetch_matches_concurrently(api, missing_ids[offset:offset + page_size])
+        errors.update({result['match_id']: result['error'] for result in fetched_results if result['error']})
+        stored.update(store_fetched_matches(player, fetched_results))
+        print(f"{player}: stored {len(stored)}/{total} new matches")
+
+    return stored, errors
@@ -0,0 +1,91 @@
+"""
+Tests of GET /api/players/<puuid>/matches (run with `python manage.py test backend`).
+"""
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from .ingest import calculate_kda
+from .models import Match, Player, PlayerMatchStats
+
+STORED_MATCHES = 25
+PAGE_SIZE = 10
+
+
+class NoNewMatchesClient:
+    """Riot client stand-in whose match-ID listings are always empty"""
+
+    def call_api(self, endpoint, params=None, headers=None, method="GET"):
+        return []
+
+
+class PlayerMatchHistoryQueryTests(TestCase):
+    """GET /api/players/<puuid>/matches: queries per page, order and cursor paging"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.player = Player.objects.create(puuid='test-puuid', game_name='Test', tag_line='NA1')
+        matches = []
+        stats = []
+        for i in range(STORED_MATCHES):
+            # Pairs of matches share a start time, so the match ID breaks ties
+            game_creation = 1700000000000 + (i // 2) * 1800000
+            match = Match(
+                match_id=f'NA1_{5000000000 + i}', game_creation=game_creation, game_duration=1500 + i,
+                game_mode='CLASSIC', game_type='MATCHED_GAME'
+            )
+            matches.append(match)
+            stats.append(PlayerMatchStats(
+                player=cls.player, match=match, game_creation=game_creation, game_duration=match.game_duration,
+                game_mode='CLASSIC', kills=i % 12, deaths=i % 7, assists=i % 15, win=i % 2 == 0,
+                kda=calculate_kda(i % 12, i % 7, i % 15), champion_id=103, champion_name='Ahri'
+            ))
+        Match.objects.bulk_create(matches)
+        PlayerMatchStats.objects.bulk_create(stats)
+
+        newest = matches[-1]
+        cls.player.last_match_id, cls.player.last_game_creation = newest.match_id, newest.game_creation
+        cls.player.save()
+
+        cls.expected_ids = list(
+            PlayerMatchStats.objects.filter(player=cls.player)
+            .order_by('-game_creation', '-match_id')
+            .values_list('match_id', flat=True)
+        )
+
+    def setUp(self):
+        patcher = mock.patch('backend.views.get_cached_riot_client', return_value=NoNewMatchesClient())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse('player-matches', args=[self.player.puuid])
+
+    def get_page(self, **params):
+        response = self.client.get(self.url, {'limit': PAGE_SIZE, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_page_queries(self):
+        # Player, last_viewed_at, last_synced_at, the page and the summary rollup
+        with self.assertNumQueries(5):
+            body = self.get_page()
+
+        match_ids = [match['match_id'] for match in body['matches']]
+        self.assertEqual(match_ids, self.expected_ids[:PAGE_SIZE])
+        self.assertEqual(len(set(match_ids)), len(match_ids))
+        self.assertEqual(body['matches'][0]['game_duration'], 1500 + STORED_MATCHES - 1)
+        self.assertIsNotNone(body['next_cursor'])
+
+    def test_cursor_pages_queries(self):
+        seen = [match['match_id'] for match in self.get_page()['matches']]
+        cursor = self.get_page()['next_cursor']
+
+        while cursor:
+            # Player, the page and the summary rollup; later pages never call Riot
+            with self.assertNumQueries(3):
+                body = self.get_page(cursor=cursor)
+            seen.extend(match['match_id'] for match in body['matches'])
+            cursor = body['next_cursor']
+
+        self.assertEqual(seen, self.expected_ids)
+        self.assertEqual(len(set(seen)), STORED_MATCHES)
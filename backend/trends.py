@@ -0,0 +1,321 @@
+"""
+Rolling-window trends and win/loss streaks of a player's matches.
+
+Per match, TREND_METRICS are KDA, damage and gold per minute, vision score
+and win rate (100 for a win, 0 for a loss). Rolling means over the last N
+matches use RollingMean, which adds the new value and drops the oldest, so
+a series over n matches costs O(n) whatever the window sizes.
+
+PlayerTrend keeps the state needed to answer "now" without reading the
+history: the metrics of the last TREND_MAX_WINDOW matches, the current and
+longest streaks and the newest match folded in. update_trends() pushes newly
+stored matches onto it in the ingest transaction, next to the PlayerAggregate
+update; only a match older than that newest one (a backfill) makes it
+rebuild from the stored history.
+"""
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PlayerMatchStats, PlayerTrend
+
+# PlayerMatchStats columns the metrics are computed from
+TREND_FIELDS = (
+    'match_id', 'game_creation', 'win', 'kda', 'damage_per_minute', 'gold_per_minute',
+    'total_damage_dealt_to_champions', 'gold_earned', 'game_duration', 'vision_score',
+)
+
+TREND_METRICS = ('kda', 'damage_per_minute', 'gold_per_minute', 'vision_score', 'win_rate')
+
+DEFAULT_SERIES_POINTS = 20
+MAX_SERIES_POINTS = 200
+
+
+def match_metrics(row):
+    """TREND_METRICS of one match from a dict of TREND_FIELDS"""
+    minutes = (row['game_duration'] or 0) / 60
+    damage_per_minute = row['damage_per_minute']
+    gold_per_minute = row['gold_per_minute']
+    # Older payloads have no challenges block to read the per-minute values from
+    if damage_per_minute is None and minutes:
+        damage_per_minute = row['total_damage_dealt_to_champions'] / minutes
+    if gold_per_minute is None and minutes:
+        gold_per_minute = row['gold_earned'] / minutes
+    return {
+        'kda': row['kda'],
+        'damage_per_minute': damage_per_minute,
+        'gold_per_minute': gold_per_minute,
+        'vision_score': row['vision_score'],
+        'win_rate': 100.0 if row['win'] else 0.0,
+    }
+
+
+def stats_row(stats):
+    """Dict of TREND_FIELDS from a PlayerMatchStats instance"""
+    return {field: getattr(stats, field) for field in TREND_FIELDS}
+
+
+class RollingMean:
+    """Mean of the last `size` values, updated in O(1) per value (None values are skipped)"""
+
+    def __init__(self, size):
+        self.window = deque(maxlen=size)
+        self.total = 0.0
+        self.count = 0
+
+    def push(self, value):
+        if len(self.window) == self.window.maxlen:
+            dropped = self.window[0]
+            if dropped is not None:
+                self.total -= dropped
+                self.count -= 1
+        self.window.append(value)
+        if value is not None:
+            self.total += value
+            self.count += 1
+
+    @property
+    def mean(self):
+        return round(self.total / self.count, 2) if self.count else None
+
+
+def push_streak(streak, longest_win, longest_loss, win):
+    """
+    Extend the streaks by one result
+
+    Returns:
+        tuple: (streak, longest_win, longest_loss); streak is positive for
+               wins in a row and negative for losses in a row
+    """
+    if win:
+        streak = streak + 1 if streak > 0 else 1
+    else:
+        streak = streak - 1 if streak < 0 else -1
+    return streak, max(longest_win, streak), max(longest_loss, -streak)
+
+
+def apply_matches(trend, rows):
+    """Fold match rows (dicts of TREND_FIELDS, oldest first) into a PlayerTrend"""
+    recent = deque(trend.recent, maxlen=trend.capacity)
+    streak, longest_win, longest_loss = trend.current_streak, trend.longest_win_streak, trend.longest_loss_streak
+    for row in rows:
+        recent.append(match_metrics(row))
+        streak, longest_win, longest_loss = push_streak(streak, longest_win, longest_loss, row['win'])
+        trend.matches += 1
+        trend.last_game_creation = row['game_creation']
+        trend.last_match_id = row['match_id']
+    trend.recent = list(recent)
+    trend.current_streak, trend.longest_win_streak, trend.longest_loss_streak = streak, longest_win, longest_loss
+
+
+def build_trend(player_id, stats_queryset, trend_model=PlayerTrend, capacity=None):
+    """
+    Compute a player's trend state from their whole stored history
+
+    Takes the models as arguments so migrations can pass historical models.
+
+    Returns:
+        PlayerTrend: Unsaved trend_model instance
+    """
+    trend = trend_model(player_id=player_id, capacity=capacity or settings.TREND_MAX_WINDOW)
+    rows = (
+        stats_queryset.filter(player_id=player_id)
+        .order_by('game_creation', 'match_id')
+        .values(*TREND_FIELDS)
+    )
+    apply_matches(trend, rows.iterator(chunk_size=2000))
+    return trend
+
+
+def rebuild_trend(player):
+    """Replace the player's stored trend state with one built from their history"""
+    trend = build_trend(player.pk, PlayerMatchStats.objects.all())
+    with transaction.atomic():
+        PlayerTrend.objects.filter(player=player).delete()
+        trend.save()
+    return trend
+
+
+def _new_rows(new_stats):
+    """TREND_FIELDS dicts of new PlayerMatchStats rows, oldest first"""
+    return sorted((stats_row(stats) for stats in new_stats), key=lambda row: (row['game_creation'], row['match_id']))
+
+
+def _can_append(trend, rows):
+    """Whether rows can be folded into the stored state instead of rebuilding it"""
+    if trend.capacity < settings.TREND_MAX_WINDOW:
+        return False
+    # A state built before the player had any matches takes anything
+    if trend.last_game_creation is None:
+        return True
+    return (rows[0]['game_creation'], rows[0]['match_id']) > (trend.last_game_creation, trend.last_match_id)
+
+
+def update_trends(player, new_stats):
+    """
+    Push newly inserted PlayerMatchStats rows onto the player's trend state
+
+    Must run inside the transaction that inserted `new_stats`. Rows newer
+    than the state's last match are folded in directly; anything else
+    (no state yet, an older match, a larger TREND_MAX_WINDOW) rebuilds it.
+    """
+    if not new_stats:
+        return
+    rows = _new_rows(new_stats)
+    trend = PlayerTrend.objects.filter(player=player).first()
+
+    if trend is None or not _can_append(trend, rows):
+        rebuild_trend(player)
+        return
+
+    apply_matches(trend, rows)
+    trend.save()
+
+
+def update_player_trends(stats_by_player):
+    """
+    update_trends for the other participants of newly stored matches
+
+    States are read in one query and written back in one bulk update.
+    Players without a state are skipped: their own sync builds it from
+    their whole history, and until then player_trends() builds one in
+    memory.
+
+    Args:
+        stats_by_player: Dict of player PUUID -> newly inserted PlayerMatchStats
+    """
+    trends = PlayerTrend.objects.filter(player_id__in=[player_id for player_id, stats in stats_by_player.items() if stats])
+    now = timezone.now()
+    to_update = []
+    for trend in trends:
+        rows = _new_rows(stats_by_player[trend.player_id])
+        if not _can_append(trend, rows):
+            rebuild_trend(trend.player)
+            continue
+        apply_matches(trend, rows)
+        trend.updated_at = now
+        to_update.append(trend)
+    PlayerTrend.objects.bulk_update(to_update, [
+        'last_match_id', 'last_game_creation', 'matches', 'recent',
+        'current_streak', 'longest_win_streak', 'longest_loss_streak', 'updated_at',
+    ], batch_size=500)
+
+
+def parse_trend_params(params):
+    """
+    Validate the trends query parameters
+
+    Args:
+        params: request.GET
+
+    Returns:
+        dict: 'windows' (sorted window sizes) and 'limit' (series points, 0 for none)
+
+    Raises:
+        ValueError: With a message for the client if a parameter is invalid
+    """
+    windows = params.get('windows')
+    if windows:
+        try:
+            windows = sorted({int(size) for size in windows.split(',')})
+        except ValueError:
+            raise ValueError("windows must be comma-separated integers")
+        if windows[0] < 1 or windows[-1] > settings.TREND_MAX_WINDOW:
+            raise ValueError(f"windows must be between 1 and {settings.TREND_MAX_WINDOW}")
+    else:
+        windows = sorted(settings.TREND_WINDOWS)
+
+    try:
+        limit = int(params.get('limit', DEFAULT_SERIES_POINTS))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 0:
+        raise ValueError("limit must not be negative")
+
+    return {"windows": windows, "limit": min(limit, MAX_SERIES_POINTS)}
+
+
+def window_means(metrics, window):
+    """Mean of each metric over the last `window` entries of a list of match metrics"""
+    tail = metrics[-window:]
+    means = {}
+    for metric in TREND_METRICS:
+        values = [entry[metric] for entry in tail if entry[metric] is not None]
+        means[metric] = round(sum(values) / len(values), 2) if values else None
+    return means
+
+
+def trend_summary(trend, windows):
+    """Current rolling means per window and the streaks, from the stored state"""
+    return {
+        "matches": trend.matches,
+        "current": {str(window): window_means(trend.recent, window) for window in windows},
+        "streaks": {
+            "current": {
+                "result": 'win' if trend.current_streak > 0 else 'loss' if trend.current_streak < 0 else None,
+                "length": abs(trend.current_streak),
+            },
+            "longest_win": trend.longest_win_streak,
+            "longest_loss": trend.longest_loss_streak,
+        },
+    }
+
+
+def trend_series(rows, windows, points):
+    """
+    Per-match values with their rolling means, for charting
+
+    Args:
+        rows: Dicts of TREND_FIELDS, oldest first; include max(windows) - 1
+              matches before the first point so its windows are full
+        windows: Window sizes
+        points: Number of (newest) matches to return
+
+    Returns:
+        list: One dict per match, oldest first
+    """
+    rolling = {window: {metric: RollingMean(window) for metric in TREND_METRICS} for window in windows}
+    series = deque(maxlen=points)
+    for row in rows:
+        values = match_metrics(row)
+        for means in rolling.values():
+            for metric, mean in means.items():
+                mean.push(values[metric])
+        series.append({
+            "match_id": row['match_id'],
+            "game_creation": row['game_creation'],
+            "values": {metric: round(value, 2) if value is not None else None for metric, value in values.items()},
+            "rolling": {
+                str(window): {metric: mean.mean for metric, mean in means.items()}
+                for window, means in rolling.items()
+            },
+        })
+    return list(series)
+
+
+def player_trends(player, windows, limit):
+    """
+    Trends response body for a player
+
+    The current means and streaks come from the stored PlayerTrend; the
+    series reads only the last limit + max(windows) - 1 matches. Without a
+    stored state large enough for the windows, one is built from the history
+    for this response only: reads never write, and storing states is left to
+    the ingest path (update_trends).
+    """
+    trend = PlayerTrend.objects.filter(player=player).first()
+    if trend is None or trend.capacity < windows[-1]:
+        trend = build_trend(player.pk, PlayerMatchStats.objects.all())
+
+    series = []
+    if limit:
+        rows = list(
+            PlayerMatchStats.objects.filter(player=player)
+            .order_by('-game_creation', '-match_id')
+            .values(*TREND_FIELDS)[:limit + windows[-1] - 1]
+        )
+        series = trend_series(reversed(rows), windows, limit)
+
+    return {"windows": windows, **trend_summary(trend, windows), "series": series}
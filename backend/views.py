@@ -1,17 +1,21 @@
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.utils import timezone
+from functools import wraps
 import json
 from pathlib import Path
 
-from .models import Player, Match, PlayerMatchStats
+from .models import Player, PlayerAggregate, PlayerMatchStats, SyncJob
 from .serializers import (
     PlayerSerializer,
     PlayerLookupSerializer,
-    PlayerMatchHistorySerializer,
-    PlayerMatchStatsSerializer
+    SyncJobSerializer,
+    match_stats_values,
+    serialize_match_stats_values
 )
 
 # Import existing backend functions
@@ -19,10 +23,51 @@ import sys
 backend_path = Path(__file__).resolve().parent.parent
 sys.path.append(str(backend_path))
 
-from backend.auth.riotAPI import RiotAPIClient
-from get_stats.player_uiid import get_account
-from get_stats.get_matches import get_matches_list
-from get_stats.get_ten_matches_data import get_matches_data
+from backend.auth.riotAPI import AsyncRiotAPIClient
+from backend.riot_cache import cache_stats, get_cached_riot_client
+from get_stats.get_matches import save_match_ids
+from get_stats.get_ten_matches_data import fetch_matches_async, save_matches_data
+from backend.stats_engine import summarize_matches, transform_matches
+from backend.match_stream import load_player_matches
+from backend.match_history import filter_history, has_filters, history_page, parse_history_params, split_page
+from backend.breakdown import player_breakdowns
+from backend.trends import parse_trend_params, player_trends
+from backend.sync import (
+    advance_cursor, mark_synced, missing_match_ids, new_match_ids, store_fetched_matches, store_indexed_matches
+)
+from backend.jobs import enqueue_sync
+from backend.metrics import render_metrics, span
+
+# Most new match IDs the first page pulls from Riot per request
+SYNC_LIMIT = 20
+
+
+def async_api_view(http_method_names):
+    """
+    Async counterpart of DRF's @api_view for the endpoints that wait on Riot
+
+    DRF views always run synchronously, so these are plain Django coroutine
+    views: the decorator checks the HTTP method, exempts the view from CSRF
+    the same way @api_view does, and exposes the parsed JSON body as
+    request.data.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in http_method_names:
+                return HttpResponseNotAllowed(http_method_names)
+            if request.content_type == 'application/json':
+                try:
+                    request.data = json.loads(request.body or b'{}')
+                except json.JSONDecodeError:
+                    return JsonResponse({"error": "Invalid JSON body"}, status=status.HTTP_400_BAD_REQUEST)
+            else:
+                request.data = request.POST
+            return await view_func(request, *args, **kwargs)
+
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
 
 
 @api_view(['POST'])
@@ -44,8 +89,8 @@ def lookup_player(request):
 
     try:
         # Call Riot API to get account info
-        api_client = RiotAPIClient(
-            api_key=settings.RIOT_API_KEY,
+        api_client = get_cached_riot_client(
+            settings.RIOT_API_KEY,
             base_url="https://americas.api.riotgames.com"
         )
 
@@ -63,7 +108,9 @@ def lookup_player(request):
             puuid=response['puuid'],
             defaults={
                 'game_name': response['gameName'],
-                'tag_line': response['tagLine']
+                'tag_line': response['tagLine'],
+                'last_viewed_at': timezone.now(),
+                'is_stub': False
             }
         )
 
@@ -82,167 +129,109 @@ def lookup_player(request):
         )
 
 
-@api_view(['GET'])
-def get_player_matches(request, puuid):
+@async_api_view(['GET'])
+async def get_player_matches(request, puuid):
     """
     Get match history for a player by PUUID
 
-    GET /api/players/{puuid}/matches?limit=10
+    GET /api/players/{puuid}/matches?limit=10&champion=Ahri&game_mode=ARAM&result=win
+        &date_from=2025-01-01&date_to=2025-01-31&cursor=...
 
-    Returns last N matches with detailed stats
+    Returns one page of matches, newest first, matching the optional filters,
+    with a summary of all stored matches. Pass the returned next_cursor as
+    `cursor` to get the following page; it is null on the last page.
     """
     try:
         # Get player from database
         try:
-            player = Player.objects.get(puuid=puuid)
+            player = await Player.objects.aget(puuid=puuid)
         except Player.DoesNotExist:
-            return Response(
+            return JsonResponse(
                 {"error": "Player not found. Please search for the player first."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Get limit from query params (default 10)
-        limit = int(request.GET.get('limit', 10))
-        limit = min(limit, 20)  # Cap at 20 matches
-
-        # Initialize Riot API client
-        api_client = RiotAPIClient(
-            api_key=settings.RIOT_API_KEY,
-            base_url="https://americas.api.riotgames.com"
-        )
-
-        # Fetch match IDs
-        matches_endpoint = f"/lol/match/v5/matches/by-puuid/{puuid}/ids"
-        match_ids = api_client.call_api(matches_endpoint, params={"count": limit})
+        # Validate filters, page size and cursor from the query params
+        try:
+            filters = parse_history_params(request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        errors = {}
+        # Only the first page syncs with Riot; later pages are served from the database
+        if filters['cursor'] is None:
+            # Viewed players are refreshed more often by the scheduler;
+            # viewing a stub makes it a tracked player
+            await Player.objects.filter(pk=player.pk).aupdate(last_viewed_at=timezone.now(), is_stub=False)
+
+            # Initialize Riot API client
+            api_client = AsyncRiotAPIClient(get_cached_riot_client(
+                settings.RIOT_API_KEY,
+                base_url="https://americas.api.riotgames.com"
+            ))
+
+            # List only the match IDs newer than the player's sync cursor, all of
+            # them so the cursor never skips one. A first lookup takes the newest
+            # SYNC_LIMIT; `manage.py sync_matches --backfill` fills in older history.
+            with span('match_ids'):
+                match_ids = await sync_to_async(new_match_ids, thread_sensitive=False)(
+                    api_client.client, player, max_ids=SYNC_LIMIT
+                )
+                if match_ids is not None:
+                    await sync_to_async(mark_synced)(player)
+                match_ids = match_ids or []
+
+            # Fetch the matches not stored yet from the API concurrently, then save them
+            with span('match_fetch'):
+                missing_ids = await sync_to_async(missing_match_ids)(player, match_ids)
+                # Matches already stored for another player are resolved from the database
+                _, missing_ids = await sync_to_async(store_indexed_matches)(player, missing_ids)
+                fetched_results = await fetch_matches_async(api_client, missing_ids)
+                errors = {result['match_id']: result['error'] for result in fetched_results if result['error']}
+            with span('store'):
+                await sync_to_async(store_fetched_matches)(player, fetched_results)
+                await sync_to_async(advance_cursor)(player, match_ids)
+
+        # Serve one page of matching matches from the database in a single query
+        with span('page'):
+            rows = [
+                row
+                async for row in history_page(
+                    match_stats_values(PlayerMatchStats.objects.filter(player=player)),
+                    filters
+                )
+            ]
+            rows, next_cursor = split_page(rows, filters['limit'])
 
-        if not match_ids:
-            return Response(
+        if not rows and filters['cursor'] is None and not has_filters(filters):
+            return JsonResponse(
                 {"error": "No matches found or API error"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Fetch detailed match data
-        match_stats_list = []
-
-        with transaction.atomic():
-            for match_id in match_ids[:limit]:
-                # Check if match already exists in DB
-                existing_stats = PlayerMatchStats.objects.filter(
-                    player=player,
-                    match__match_id=match_id
-                ).first()
-
-                if existing_stats:
-                    match_stats_list.append(existing_stats)
-                    continue
-
-                # Fetch match data from API
-                match_endpoint = f"/lol/match/v5/matches/{match_id}"
-                match_data = api_client.call_api(match_endpoint)
-
-                if not match_data:
-                    continue
-
-                # Create or update Match object
-                match, _ = Match.objects.update_or_create(
-                    match_id=match_id,
-                    defaults={
-                        'game_creation': match_data['info']['gameCreation'],
-                        'game_duration': match_data['info']['gameDuration'],
-                        'game_mode': match_data['info']['gameMode'],
-                        'game_type': match_data['info']['gameType'],
-                        'raw_data': match_data
-                    }
-                )
-
-                # Find player's stats in the match
-                player_data = None
-                for participant in match_data['info']['participants']:
-                    if participant['puuid'] == puuid:
-                        player_data = participant
-                        break
-
-                if not player_data:
-                    continue
-
-                # Extract challenges data
-                challenges = player_data.get('challenges', {})
-
-                # Create PlayerMatchStats
-                stats = PlayerMatchStats.objects.create(
-                    player=player,
-                    match=match,
-                    kills=player_data.get('kills', 0),
-                    deaths=player_data.get('deaths', 0),
-                    assists=player_data.get('assists', 0),
-                    win=player_data.get('win', False),
-                    champion_id=player_data.get('championId', 0),
-                    champion_name=player_data.get('championName', ''),
-                    champ_level=player_data.get('champLevel', 1),
-                    double_kills=player_data.get('doubleKills', 0),
-                    triple_kills=player_data.get('tripleKills', 0),
-                    quadra_kills=player_data.get('quadraKills', 0),
-                    penta_kills=player_data.get('pentaKills', 0),
-                    total_damage_dealt_to_champions=player_data.get('totalDamageDealtToChampions', 0),
-                    gold_earned=player_data.get('goldEarned', 0),
-                    total_minions_killed=player_data.get('totalMinionsKilled', 0),
-                    vision_score=player_data.get('visionScore', 0),
-                    wards_placed=player_data.get('wardsPlaced', 0),
-                    wards_killed=player_data.get('wardsKilled', 0),
-                    kill_participation=challenges.get('killParticipation'),
-                    damage_per_minute=challenges.get('damagePerMinute'),
-                    gold_per_minute=challenges.get('goldPerMinute')
-                )
-                match_stats_list.append(stats)
-
-        # Calculate summary statistics
-        if match_stats_list:
-            total_matches = len(match_stats_list)
-            wins = sum(1 for s in match_stats_list if s.win)
-            total_kills = sum(s.kills for s in match_stats_list)
-            total_deaths = sum(s.deaths for s in match_stats_list)
-            total_assists = sum(s.assists for s in match_stats_list)
-
-            summary = {
-                "total_matches": total_matches,
-                "wins": wins,
-                "losses": total_matches - wins,
-                "win_rate": round((wins / total_matches) * 100, 1) if total_matches > 0 else 0,
-                "avg_kills": round(total_kills / total_matches, 1) if total_matches > 0 else 0,
-                "avg_deaths": round(total_deaths / total_matches, 1) if total_matches > 0 else 0,
-                "avg_assists": round(total_assists / total_matches, 1) if total_matches > 0 else 0,
-                "avg_kda": round(
-                    (total_kills + total_assists) / total_deaths if total_deaths > 0 else (total_kills + total_assists),
-                    2
-                ),
-                "avg_damage": round(
-                    sum(s.total_damage_dealt_to_champions for s in match_stats_list) / total_matches, 0
-                ) if total_matches > 0 else 0,
-                "avg_gold": round(
-                    sum(s.gold_earned for s in match_stats_list) / total_matches, 0
-                ) if total_matches > 0 else 0,
-                "avg_cs": round(
-                    sum(s.total_minions_killed for s in match_stats_list) / total_matches, 1
-                ) if total_matches > 0 else 0,
-                "avg_vision_score": round(
-                    sum(s.vision_score for s in match_stats_list) / total_matches, 1
-                ) if total_matches > 0 else 0,
-            }
-        else:
-            summary = {}
+        # Summary over the player's whole stored history, read from the rollup
+        with span('summary'):
+            aggregate = await PlayerAggregate.objects.filter(
+                player=player,
+                scope=PlayerAggregate.SCOPE_ALL
+            ).afirst()
+            summary = aggregate.summary() if aggregate else {}
 
         # Serialize response
-        response_data = {
-            "player": PlayerSerializer(player).data,
-            "matches": PlayerMatchStatsSerializer(match_stats_list, many=True).data,
-            "total_matches": len(match_stats_list),
-            "summary": summary
-        }
+        with span('serialize'):
+            response_data = {
+                "player": PlayerSerializer(player).data,
+                "matches": serialize_match_stats_values(rows),
+                "total_matches": len(rows),
+                "summary": summary,
+                "next_cursor": next_cursor,
+                "errors": errors
+            }
 
-        return Response(response_data, status=status.HTTP_200_OK)
+            return JsonResponse(response_data, status=status.HTTP_200_OK)
 
     except Exception as e:
-        return Response(
+        return JsonResponse(
             {"error": f"Error fetching matches: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
@@ -269,129 +258,28 @@ def get_cached_matches(request):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Read the cached match data
-        with open(matches_file, 'r') as f:
-            raw_matches = json.load(f)
+        # For now, we'll use a hardcoded PUUID that matches get_stats/get_matches.py
+        player_puuid = "Ppd1Ebvndpxmp4swzT1zpl0ZKlIC4ydqw76oW49b_aAEGqSdnWPPz-tUzRWcDdyAvFXkbXRpGw8B5Q"
 
-        if not raw_matches:
+        # Stream the cached match data, keeping only the player's stats from each
+        # match; the result is reused until the file changes
+        cached = load_player_matches(matches_file, player_puuid)
+
+        if not cached['match_count']:
             return Response(
                 {"error": "Cached data is empty. Please run 'python main.py' to fetch fresh data."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Get the player's PUUID from the first match
-        # The PUUID should be consistent across all matches
-        first_match = raw_matches[0]
-        # For now, we'll use a hardcoded PUUID that matches get_stats/get_matches.py
-        player_puuid = "Ppd1Ebvndpxmp4swzT1zpl0ZKlIC4ydqw76oW49b_aAEGGqSdnWPPz-tUzRWcDdyAvFXkbXRpGw8B5Q"
-
-        # Transform raw Riot API data into frontend format
-        transformed_matches = []
-        for match_data in raw_matches:
-            match_info = match_data.get('info', {})
-
-            # Find the player's participant data
-            player_data = None
-            for participant in match_info.get('participants', []):
-                if participant.get('puuid') == player_puuid:
-                    player_data = participant
-                    break
-
-            if not player_data:
-                continue
-
-            # Extract challenges data
-            challenges = player_data.get('challenges', {})
-
-            # Calculate KDA
-            kills = player_data.get('kills', 0)
-            deaths = player_data.get('deaths', 0)
-            assists = player_data.get('assists', 0)
-            kda = round((kills + assists) / deaths, 2) if deaths > 0 else kills + assists
-
-            # Transform to frontend format
-            match_stats = {
-                "match_id": match_data.get('metadata', {}).get('matchId', ''),
-                "game_datetime": str(match_info.get('gameCreation', 0)),
-                "game_duration": match_info.get('gameDuration', 0),
-                "game_mode": match_info.get('gameMode', ''),
-                "kills": kills,
-                "deaths": deaths,
-                "assists": assists,
-                "win": player_data.get('win', False),
-                "kda": kda,
-                "champion_id": player_data.get('championId', 0),
-                "champion_name": player_data.get('championName', ''),
-                "champ_level": player_data.get('champLevel', 1),
-                "double_kills": player_data.get('doubleKills', 0),
-                "triple_kills": player_data.get('tripleKills', 0),
-                "quadra_kills": player_data.get('quadraKills', 0),
-                "penta_kills": player_data.get('pentaKills', 0),
-                "total_damage_dealt_to_champions": player_data.get('totalDamageDealtToChampions', 0),
-                "damage_per_minute": challenges.get('damagePerMinute'),
-                "gold_earned": player_data.get('goldEarned', 0),
-                "gold_per_minute": challenges.get('goldPerMinute'),
-                "total_minions_killed": player_data.get('totalMinionsKilled', 0),
-                "vision_score": player_data.get('visionScore', 0),
-                "wards_placed": player_data.get('wardsPlaced', 0),
-                "wards_killed": player_data.get('wardsKilled', 0),
-                "kill_participation": challenges.get('killParticipation'),
-                "created_at": "",
-                "updated_at": ""
-            }
-            transformed_matches.append(match_stats)
+        transformed_matches = cached['matches']
 
         # Calculate summary statistics
-        if transformed_matches:
-            total_matches = len(transformed_matches)
-            wins = sum(1 for m in transformed_matches if m['win'])
-            total_kills = sum(m['kills'] for m in transformed_matches)
-            total_deaths = sum(m['deaths'] for m in transformed_matches)
-            total_assists = sum(m['assists'] for m in transformed_matches)
-
-            summary = {
-                "total_matches": total_matches,
-                "wins": wins,
-                "losses": total_matches - wins,
-                "win_rate": round((wins / total_matches) * 100, 1) if total_matches > 0 else 0,
-                "avg_kills": round(total_kills / total_matches, 1) if total_matches > 0 else 0,
-                "avg_deaths": round(total_deaths / total_matches, 1) if total_matches > 0 else 0,
-                "avg_assists": round(total_assists / total_matches, 1) if total_matches > 0 else 0,
-                "avg_kda": round(
-                    (total_kills + total_assists) / total_deaths if total_deaths > 0 else (total_kills + total_assists),
-                    2
-                ),
-                "avg_damage": round(
-                    sum(m['total_damage_dealt_to_champions'] for m in transformed_matches) / total_matches, 0
-                ) if total_matches > 0 else 0,
-                "avg_gold": round(
-                    sum(m['gold_earned'] for m in transformed_matches) / total_matches, 0
-                ) if total_matches > 0 else 0,
-                "avg_cs": round(
-                    sum(m['total_minions_killed'] for m in transformed_matches) / total_matches, 1
-                ) if total_matches > 0 else 0,
-                "avg_vision_score": round(
-                    sum(m['vision_score'] for m in transformed_matches) / total_matches, 1
-                ) if total_matches > 0 else 0,
-            }
-        else:
-            summary = {}
-
-        # Create player object (extracted from first match participant data)
-        player_name = raw_matches[0]['info']['participants'][0].get('riotIdGameName', 'Player')
-        player_tag = raw_matches[0]['info']['participants'][0].get('riotIdTagline', 'NA1')
-
-        # Find the actual player's name from the matched participant
-        for participant in raw_matches[0]['info']['participants']:
-            if participant.get('puuid') == player_puuid:
-                player_name = participant.get('riotIdGameName', 'Player')
-                player_tag = participant.get('riotIdTagline', 'NA1')
-                break
+        summary = summarize_matches(transformed_matches)
 
         player = {
             "puuid": player_puuid,
-            "game_name": player_name,
-            "tag_line": player_tag,
+            "game_name": cached['game_name'],
+            "tag_line": cached['tag_line'],
             "created_at": "",
             "updated_at": ""
         }
@@ -418,24 +306,28 @@ def get_cached_matches(request):
         )
 
 
-@api_view(['POST'])
-def fetch_player_stats(request):
+@async_api_view(['POST'])
+async def fetch_player_stats(request):
     """
-    Fetch player stats using the get_stats functions
+    Queue a sync of a player's latest matches, or fetch them straight from the Riot API
 
     POST /api/players/fetch-stats
-    Body: {"game_name": "PlayerName", "tag_line": "NA1", "limit": 10}
+    Body: {"game_name": "PlayerName", "tag_line": "NA1", "limit": 10, "wait": false}
 
     This endpoint:
-    1. Calls get_account() to get PUUID
-    2. Calls get_matches_list() to get match IDs
-    3. Calls get_matches_data() to get detailed match data
+    1. Looks up the account to get the PUUID
+    2. Queues a sync job for `manage.py run_sync_worker` and returns 202 with
+       the job; poll GET /api/jobs/{id}, then read /api/players/{puuid}/matches
+
+    With "wait": true it instead runs the fetch inline, as before:
+    2. Fetches the player's latest match IDs
+    3. Fetches detailed match data concurrently
     4. Saves data to JSON files
     5. Returns transformed data to frontend
     """
     serializer = PlayerLookupSerializer(data=request.data)
     if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     game_name = serializer.validated_data['game_name']
     tag_line = serializer.validated_data['tag_line']
@@ -443,134 +335,94 @@ def fetch_player_stats(request):
     limit = min(limit, 20)  # Cap at 20 matches
 
     try:
+        api_client = AsyncRiotAPIClient(get_cached_riot_client(
+            settings.RIOT_API_KEY,
+            base_url="https://americas.api.riotgames.com"
+        ))
+
         # Step 1: Get account info (PUUID)
         print(f"Fetching account info for {game_name}#{tag_line}...")
-        account_data = get_account(game_name, tag_line)
+        with span('account'):
+            account_data = await api_client.call_api(f"/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}")
 
         if not account_data:
-            return Response(
+            return JsonResponse(
                 {"error": "Player not found or Riot API error"},
                 status=status.HTTP_404_NOT_FOUND
             )
 
         player_puuid = account_data.get('puuid')
         if not player_puuid:
-            return Response(
+            return JsonResponse(
                 {"error": "Failed to get player PUUID"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        if str(request.data.get('wait', '')).lower() not in ('1', 'true', 'yes'):
+            # Save or update the player and leave the match fetching to the worker
+            with span('enqueue'):
+                fields = {
+                    'game_name': account_data.get('gameName', game_name),
+                    'tag_line': account_data.get('tagLine', tag_line),
+                    'last_viewed_at': timezone.now(),
+                    'is_stub': False
+                }
+                # update_or_create's SELECT ... FOR UPDATE transaction fails with "database
+                # is locked" on SQLite when identical requests arrive together, so only
+                # the changed columns are written, in one UPDATE
+                player, player_created = await Player.objects.aget_or_create(puuid=player_puuid, defaults=fields)
+                if not player_created:
+                    changed = {field: value for field, value in fields.items() if getattr(player, field) != value}
+                    await Player.objects.filter(pk=player.pk).aupdate(**changed)
+                    for field, value in changed.items():
+                        setattr(player, field, value)
+                job, created = await sync_to_async(enqueue_sync)(player, max_ids=limit)
+            return JsonResponse(
+                {
+                    "player": PlayerSerializer(player).data,
+                    "job": SyncJobSerializer(job).data,
+                    "created": created,
+                    "status_url": f"/api/jobs/{job.pk}"
+                },
+                status=status.HTTP_202_ACCEPTED
+            )
+
         # Step 2: Get match IDs
         print(f"Fetching match IDs for PUUID: {player_puuid}...")
-        match_ids = get_matches_list(puuid=player_puuid, limit=limit)
-
-        if not match_ids:
-            return Response(
-                {"error": "No matches found for this player"},
-                status=status.HTTP_404_NOT_FOUND
+        with span('match_ids'):
+            match_ids = await api_client.call_api(
+                f"/lol/match/v5/matches/by-puuid/{player_puuid}/ids",
+                params={"count": limit}
             )
 
+            if not match_ids:
+                return JsonResponse(
+                    {"error": "No matches found for this player"},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            await sync_to_async(save_match_ids, thread_sensitive=False)(match_ids)
+
         # Step 3: Get detailed match data
         print(f"Fetching detailed data for {len(match_ids)} matches...")
-        raw_matches = get_matches_data(match_ids, limit=limit)
-
-        if not raw_matches:
-            return Response(
-                {"error": "Failed to fetch match data"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        with span('match_fetch'):
+            fetched_results = await fetch_matches_async(api_client, match_ids[:limit])
+            raw_matches = [result['data'] for result in fetched_results if result['error'] is None]
+            errors = {result['match_id']: result['error'] for result in fetched_results if result['error']}
+
+            if not raw_matches:
+                return JsonResponse(
+                    {"error": "Failed to fetch match data"},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            await sync_to_async(save_matches_data, thread_sensitive=False)(raw_matches)
 
         # Step 4: Transform the data for frontend
-        transformed_matches = []
-        for match_data in raw_matches:
-            match_info = match_data.get('info', {})
-
-            # Find the player's participant data
-            player_data = None
-            for participant in match_info.get('participants', []):
-                if participant.get('puuid') == player_puuid:
-                    player_data = participant
-                    break
-
-            if not player_data:
-                continue
-
-            # Extract challenges data
-            challenges = player_data.get('challenges', {})
-
-            # Calculate KDA
-            kills = player_data.get('kills', 0)
-            deaths = player_data.get('deaths', 0)
-            assists = player_data.get('assists', 0)
-            kda = round((kills + assists) / deaths, 2) if deaths > 0 else kills + assists
-
-            # Transform to frontend format
-            match_stats = {
-                "match_id": match_data.get('metadata', {}).get('matchId', ''),
-                "game_datetime": str(match_info.get('gameCreation', 0)),
-                "game_duration": match_info.get('gameDuration', 0),
-                "game_mode": match_info.get('gameMode', ''),
-                "kills": kills,
-                "deaths": deaths,
-                "assists": assists,
-                "win": player_data.get('win', False),
-                "kda": kda,
-                "champion_id": player_data.get('championId', 0),
-                "champion_name": player_data.get('championName', ''),
-                "champ_level": player_data.get('champLevel', 1),
-                "double_kills": player_data.get('doubleKills', 0),
-                "triple_kills": player_data.get('tripleKills', 0),
-                "quadra_kills": player_data.get('quadraKills', 0),
-                "penta_kills": player_data.get('pentaKills', 0),
-                "total_damage_dealt_to_champions": player_data.get('totalDamageDealtToChampions', 0),
-                "damage_per_minute": challenges.get('damagePerMinute'),
-                "gold_earned": player_data.get('goldEarned', 0),
-                "gold_per_minute": challenges.get('goldPerMinute'),
-                "total_minions_killed": player_data.get('totalMinionsKilled', 0),
-                "vision_score": player_data.get('visionScore', 0),
-                "wards_placed": player_data.get('wardsPlaced', 0),
-                "wards_killed": player_data.get('wardsKilled', 0),
-                "kill_participation": challenges.get('killParticipation'),
-                "created_at": "",
-                "updated_at": ""
-            }
-            transformed_matches.append(match_stats)
+        with span('transform'):
+            transformed_matches = transform_matches(raw_matches, player_puuid)
 
         # Step 5: Calculate summary statistics
-        if transformed_matches:
-            total_matches = len(transformed_matches)
-            wins = sum(1 for m in transformed_matches if m['win'])
-            total_kills = sum(m['kills'] for m in transformed_matches)
-            total_deaths = sum(m['deaths'] for m in transformed_matches)
-            total_assists = sum(m['assists'] for m in transformed_matches)
-
-            summary = {
-                "total_matches": total_matches,
-                "wins": wins,
-                "losses": total_matches - wins,
-                "win_rate": round((wins / total_matches) * 100, 1) if total_matches > 0 else 0,
-                "avg_kills": round(total_kills / total_matches, 1) if total_matches > 0 else 0,
-                "avg_deaths": round(total_deaths / total_matches, 1) if total_matches > 0 else 0,
-                "avg_assists": round(total_assists / total_matches, 1) if total_matches > 0 else 0,
-                "avg_kda": round(
-                    (total_kills + total_assists) / total_deaths if total_deaths > 0 else (total_kills + total_assists),
-                    2
-                ),
-                "avg_damage": round(
-                    sum(m['total_damage_dealt_to_champions'] for m in transformed_matches) / total_matches, 0
-                ) if total_matches > 0 else 0,
-                "avg_gold": round(
-                    sum(m['gold_earned'] for m in transformed_matches) / total_matches, 0
-                ) if total_matches > 0 else 0,
-                "avg_cs": round(
-                    sum(m['total_minions_killed'] for m in transformed_matches) / total_matches, 1
-                ) if total_matches > 0 else 0,
-                "avg_vision_score": round(
-                    sum(m['vision_score'] for m in transformed_matches) / total_matches, 1
-                ) if total_matches > 0 else 0,
-            }
-        else:
-            summary = {}
+        with span('summary'):
+            summary = summarize_matches(transformed_matches)
 
         # Create player object
         player = {
@@ -586,15 +438,165 @@ def fetch_player_stats(request):
             "player": player,
             "matches": transformed_matches,
             "total_matches": len(transformed_matches),
-            "summary": summary
+            "summary": summary,
+            "errors": errors
         }
 
-        return Response(response_data, status=status.HTTP_200_OK)
+        with span('serialize'):
+            return JsonResponse(response_data, status=status.HTTP_200_OK)
 
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return Response(
+        return JsonResponse(
             {"error": f"Error fetching player stats: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+def get_player_breakdown(request, puuid):
+    """
+    Per-champion and per-position performance over a player's stored matches
+
+    GET /api/players/{puuid}/breakdown?game_mode=CLASSIC&date_from=2025-01-01&date_to=2025-01-31
+
+    Accepts the match history filters. Returns matches, win rate, KDA and
+    damage, gold and CS per minute for each champion and team position,
+    most played first, aggregated in the database.
+    """
+    try:
+        player = Player.objects.get(puuid=puuid)
+    except Player.DoesNotExist:
+        return Response(
+            {"error": "Player not found. Please search for the player first."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        filters = parse_history_params(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    breakdowns = player_breakdowns(filter_history(PlayerMatchStats.objects.filter(player=player), filters))
+
+    return Response(
+        {
+            "player": PlayerSerializer(player).data,
+            "total_matches": sum(row['matches'] for row in breakdowns['champions']),
+            **breakdowns
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(['GET'])
+def get_player_trends(request, puuid):
+    """
+    Rolling-window trends and win/loss streaks of a player's stored matches
+
+    GET /api/players/{puuid}/trends?windows=5,10,20&limit=20
+
+    Returns the current mean KDA, damage and gold per minute, vision score
+    and win rate over each window of recent matches, the current and longest
+    streaks, and the last `limit` matches with their rolling means for charting
+    """
+    try:
+        player = Player.objects.get(puuid=puuid)
+    except Player.DoesNotExist:
+        return Response(
+            {"error": "Player not found. Please search for the player first."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    try:
+        params = parse_trend_params(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            "player": PlayerSerializer(player).data,
+            **player_trends(player, params['windows'], params['limit'])
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(['GET'])
+def get_riot_cache_stats(request):
+    """
+    Riot API response cache counters for this process
+
+    GET /api/cache/stats
+
+    Returns overall and per-method hits, misses and hit rate
+    """
+    return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
+def get_metrics(request):
+    """
+    Request, stage, database and Riot API metrics for this process
+
+    GET /api/metrics
+
+    Returns counters and histograms in the Prometheus text format for scraping
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@api_view(['POST'])
+def queue_player_sync(request, puuid):
+    """
+    Queue a background sync of a stored player's matches
+
+    POST /api/players/{puuid}/sync
+    Body: {"backfill": false, "max_ids": null}
+
+    Returns 202 with the job (the already queued or running one for this
+    player, if any); poll GET /api/jobs/{id} for its status
+    """
+    try:
+        player = Player.objects.get(puuid=puuid)
+    except Player.DoesNotExist:
+        return Response(
+            {"error": "Player not found. Please search for the player first."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    max_ids = request.data.get('max_ids')
+    try:
+        max_ids = int(max_ids) if max_ids not in (None, '') else None
+    except (TypeError, ValueError):
+        return Response({"error": "max_ids must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+    job, created = enqueue_sync(player, backfill=bool(request.data.get('backfill')), max_ids=max_ids)
+    return Response(
+        {
+            "job": SyncJobSerializer(job).data,
+            "created": created,
+            "status_url": f"/api/jobs/{job.pk}"
+        },
+        status=status.HTTP_202_ACCEPTED
+    )
+
+
+@api_view(['GET'])
+def get_sync_job(request, job_id):
+    """
+    Status of a queued sync job
+
+    GET /api/jobs/{id}
+
+    Returns the job's status (queued, running, done or failed), attempts,
+    matches stored so far and the errors of its last attempt
+    """
+    try:
+        job = SyncJob.objects.get(pk=job_id)
+    except SyncJob.DoesNotExist:
+        return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response(SyncJobSerializer(job).data, status=status.HTTP_200_OK)
@@ -0,0 +1 @@
+# Benchmarks for the Riot fetch pipeline (run from the project root)
@@ -0,0 +1,126 @@
+"""
+Time and query plan of the champion / position breakdown.
+
+    python -m benchmarks.bench_breakdown [matches]
+
+Stores `matches` PlayerMatchStats rows (default 10,000) for one player
+among other players' rows in an in-memory SQLite database, then times
+GET /api/players/<puuid>/breakdown's aggregation. Exits non-zero if it
+takes more than BUDGET_MS, if either GROUP BY does not read only a covering
+index, or if its numbers differ from totals summed in Python.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import django
+from django.conf import settings
+
+settings.configure(
+    INSTALLED_APPS=['django.contrib.contenttypes', 'rest_framework', 'backend'],
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+    USE_TZ=True,
+    TIME_ZONE='UTC',
+)
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+
+from backend.breakdown import GROUPINGS, breakdown_queryset, player_breakdowns
+from backend.models import Match, Player, PlayerMatchStats
+
+BUDGET_MS = 50
+OTHER_PLAYERS = 20
+CHAMPIONS = ['Ahri', 'Orianna', 'Syndra', 'Viktor', 'Azir', 'Lux', 'Zed', 'Yasuo', 'Akali', 'Sylas',
+             'Jinx', 'Thresh', 'LeeSin', 'Garen', 'Teemo', 'Ezreal', 'Leona', 'Vi', 'Ornn', 'Kaisa']
+POSITIONS = ['TOP', 'JUNGLE', 'MIDDLE', 'BOTTOM', 'UTILITY', '']
+
+
+def populate(count):
+    rng = random.Random(7)
+    players = [Player(puuid=f'bench-{i}', game_name=f'Bench{i}', tag_line='NA1') for i in range(OTHER_PLAYERS + 1)]
+    Player.objects.bulk_create(players)
+
+    matches = []
+    stats = []
+    for i in range(count):
+        match = Match(
+            match_id=f'NA1_{6000000000 + i}', game_creation=1700000000000 + i * 1800000,
+            game_duration=rng.randint(900, 2400), game_mode='CLASSIC', game_type='MATCHED_GAME'
+        )
+        matches.append(match)
+        # The benchmarked player plus a couple of other tracked players per match
+        for player in [players[0]] + rng.sample(players[1:], 2):
+            stats.append(PlayerMatchStats(
+                player=player, match=match, game_creation=match.game_creation, game_mode=match.game_mode,
+                game_duration=match.game_duration, kills=rng.randint(0, 15), deaths=rng.randint(0, 10),
+                assists=rng.randint(0, 20), win=rng.random() < 0.5, champion_id=1,
+                champion_name=rng.choice(CHAMPIONS), team_position=rng.choice(POSITIONS),
+                total_damage_dealt_to_champions=rng.randint(5000, 60000), gold_earned=rng.randint(6000, 20000),
+                total_minions_killed=rng.randint(20, 300), kda=0
+            ))
+    Match.objects.bulk_create(matches, batch_size=2000)
+    PlayerMatchStats.objects.bulk_create(stats, batch_size=2000)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return players[0]
+
+
+def expected_totals(player, field):
+    """Matches and summed damage / duration per group, computed in Python"""
+    totals = {}
+    for stats in PlayerMatchStats.objects.filter(player=player):
+        group = totals.setdefault(getattr(stats, field), [0, 0, 0])
+        group[0] += 1
+        group[1] += stats.total_damage_dealt_to_champions
+        group[2] += stats.game_duration
+    return {key: (matches, round(damage / (seconds / 60), 1)) for key, (matches, damage, seconds) in totals.items()}
+
+
+def main(count=10_000):
+    call_command('migrate', verbosity=0)
+    player = populate(count)
+    queryset = PlayerMatchStats.objects.filter(player=player)
+    failures = []
+
+    for name, field in GROUPINGS.items():
+        plan = breakdown_queryset(queryset, field).explain()
+        print(f"{name} plan: {' | '.join(line.strip() for line in plan.splitlines())}")
+        if 'COVERING INDEX' not in plan:
+            failures.append(f"{name} breakdown does not read only a covering index")
+
+    # Best of several runs of the whole aggregation (both GROUP BYs)
+    best = float('inf')
+    for _ in range(20):
+        start = time.perf_counter()
+        result = player_breakdowns(queryset)
+        best = min(best, time.perf_counter() - start)
+    print(f"{count} matches: champion + position breakdown in {best * 1000:.2f} ms (budget {BUDGET_MS} ms)")
+    if best * 1000 > BUDGET_MS:
+        failures.append(f"breakdown took {best * 1000:.2f} ms")
+
+    for name, field in GROUPINGS.items():
+        expected = expected_totals(player, field)
+        got = {row[field]: (row['matches'], row['damage_per_minute']) for row in result[name]}
+        if got != expected:
+            failures.append(f"{name} breakdown differs from Python totals")
+
+    for failure in failures:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('matches', nargs='?', type=int, default=10_000,
+                        help='Matches stored for the player (default: 10,000)')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    main(parse_args().matches)
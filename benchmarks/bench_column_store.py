@@ -0,0 +1,105 @@
+"""
+Per-column scan of the column store vs re-parsing raw match payloads.
+
+    python -m benchmarks.bench_column_store [rows]
+
+Builds a column store of `rows` participant rows (default 1,000,000) from
+copies of dataTenMatches.json in a temporary directory, then times "mean
+challenges.damagePerMinute by champion" over it. The baseline answers the
+same question the way it has to be answered without the store, by parsing
+each match payload and walking its participants; it is timed on a sample of
+BASELINE_MATCHES payloads and scaled to the full row count. Exits non-zero
+if the two disagree.
+"""
+import argparse
+import json
+import math
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.column_store import ColumnStore
+
+BASELINE_MATCHES = 2000
+COLUMN = 'challenges.damagePerMinute'
+
+
+def synthetic_matches(templates, count):
+    """`count` copies of the template payloads, each under a new match ID"""
+    for i in range(count):
+        match_data = templates[i % len(templates)]
+        yield {'metadata': {**match_data['metadata'], 'matchId': f'BENCH_{i}'}, 'info': match_data['info']}
+
+
+def baseline(payloads):
+    """Mean damagePerMinute by champion from raw JSON payloads"""
+    sums = defaultdict(float)
+    counts = defaultdict(int)
+    for payload in payloads:
+        for participant in json.loads(payload)['info']['participants']:
+            value = participant.get('challenges', {}).get('damagePerMinute')
+            if value is not None:
+                sums[participant['championName']] += value
+                counts[participant['championName']] += 1
+    return {champion: sums[champion] / counts[champion] for champion in sums}
+
+
+def main(rows=1_000_000):
+    templates = json.loads((Path(__file__).resolve().parent.parent / 'dataTenMatches.json').read_text())
+    per_match = len(templates[0]['info']['participants'])
+    matches = max(1, rows // per_match)
+    root = Path(tempfile.mkdtemp(prefix='bench_column_store_'))
+
+    try:
+        store = ColumnStore(root)
+        start = time.perf_counter()
+        added, written = store.append(synthetic_matches(templates, matches))
+        build = time.perf_counter() - start
+        size = sum(path.stat().st_size for path in root.rglob('*') if path.is_file())
+        columns = len(store.columns())
+
+        start = time.perf_counter()
+        groups = store.group_stats(COLUMN, by='champion_name')
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.group_stats(COLUMN)
+        ungrouped = time.perf_counter() - start
+
+        sample = [json.dumps(match_data) for match_data in synthetic_matches(templates, min(matches, BASELINE_MATCHES))]
+        start = time.perf_counter()
+        expected = baseline(sample)
+        parse = (time.perf_counter() - start) * matches / len(sample)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    mismatched = [
+        champion for champion, mean in expected.items()
+        if champion not in groups or not math.isclose(groups[champion]['mean'], mean, rel_tol=1e-9)
+    ]
+
+    print(f"{written} rows ({added} matches, {columns} numeric columns), "
+          f"{size / 2 ** 20:.0f} MiB on disk, built in {build:.1f}s ({written / build:,.0f} rows/s)")
+    print(f"mean {COLUMN} by champion       {scan * 1000:9.1f} ms  ({written / scan / 1e6:.1f}M rows/s)")
+    print(f"mean {COLUMN}                   {ungrouped * 1000:9.1f} ms")
+    print(f"re-parsing payloads (scaled from {len(sample)})  {parse * 1000:9.1f} ms  ({parse / scan:.0f}x slower)")
+    if mismatched:
+        print(f"MISMATCH for {', '.join(sorted(mismatched))}")
+        return 1
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument("rows", nargs='?', type=int, default=1_000_000,
+                        help="Participant rows in the column store (default: 1,000,000)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args().rows))
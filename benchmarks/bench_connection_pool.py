@@ -0,0 +1,65 @@
+"""
+Per-request latency of a fresh connection per call vs the pooled client session.
+
+    python -m benchmarks.bench_connection_pool [requests]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.auth.rateLimiter import RateLimiter
+from backend.auth.riotAPI import RiotAPIClient
+from benchmarks.stub_server import start_stub_server
+
+
+def time_calls(call, count):
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<22} mean {statistics.mean(timings):7.3f} ms   p50 {statistics.median(timings):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main(count=500):
+    server = start_stub_server({"matchId": "NA1_0"})
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    endpoint = "/lol/match/v5/matches/NA1_0"
+
+    try:
+        # Baseline: module-level requests.request opens a new connection every call
+        unpooled = time_calls(lambda: requests.request("GET", f"{base_url}{endpoint}").json(), count)
+
+        # Pooled: one shared session, limiter opened wide so only transport is measured
+        client = RiotAPIClient(api_key="bench", base_url=base_url, rate_limiter=RateLimiter({1: 10 ** 9}))
+        pooled = time_calls(lambda: client.call_api(endpoint), count)
+    finally:
+        server.shutdown()
+
+    print(f"{count} requests against local stub {base_url}")
+    report("new connection/call", unpooled)
+    report("pooled session", pooled)
+    print(f"speedup (mean)         {statistics.mean(unpooled) / statistics.mean(pooled):.2f}x")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument("requests", nargs='?', type=int, default=500,
+                        help="Requests sent per connection mode (default: 500)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args().requests)
@@ -0,0 +1,309 @@
+"""
+End-to-end latency and Riot traffic of the API endpoints against a local Riot stub.
+
+    python -m benchmarks.bench_endpoints [--concurrency 1,4,16] [--requests 50]
+        [--latency 0.05] [--rate-429 0.0] [--app-limits 20000:1,1200000:120]
+        [--scenarios fetch-stats,player-matches,cached,pipeline] [--no-riot-cache]
+        [--output results.json] [--compare previous.json]
+
+Replays dataTenMatches.json / matchIDs.json from benchmarks.stub_server
+(RIOT_API_BASE_URL points every Riot client at it) and drives, at each
+concurrency level:
+
+    fetch-stats     POST /api/players/fetch-stats with "wait": true (inline fetch)
+    fetch-queued    POST /api/players/fetch-stats (queues a sync job, 202)
+    player-matches  GET /api/players/<puuid>/matches (first page, syncs with Riot)
+    cached          GET /api/matches/cached
+    pipeline        main.py's get_account -> get_matches_list -> get_matches_data
+
+Requests go through Django's test client from a pool of threads, one per
+concurrent client, so each request runs its ORM work on its own thread the
+way a threaded server would. The database is a temporary SQLite file and the
+match store, dataTenMatches.json and matchIDs.json live in a temporary
+directory, so tracked files are never touched. Every level starts from an
+empty database and Riot cache.
+
+Reports p50/p95/p99 latency, throughput and Riot calls per request per
+scenario and level, and writes them as JSON so runs can be compared.
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+SCENARIOS = ('fetch-stats', 'fetch-queued', 'player-matches', 'cached', 'pipeline')
+DEFAULT_SCENARIOS = ('fetch-stats', 'player-matches', 'cached', 'pipeline')
+GAME_NAME = 'Bench'
+TAG_LINE = 'NA1'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated concurrent clients per level')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per scenario and level')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds the stub adds to every response')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Share of stub responses turned into 429s')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with a 429')
+    parser.add_argument('--app-limits', default='20000:1,1200000:120',
+                        help='X-App-Rate-Limit the stub advertises and enforces')
+    parser.add_argument('--scenarios', default=','.join(DEFAULT_SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument('--limit', type=int, default=10, help='Matches requested per fetch')
+    parser.add_argument('--no-riot-cache', action='store_true', help='Disable the Riot response cache')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Earlier --output file to compare against')
+    parser.add_argument('--verbose', action='store_true', help="Keep the app's print output")
+    args = parser.parse_args(argv)
+
+    args.concurrency = [int(level) for level in args.concurrency.split(',')]
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+def setup_django(workdir, args):
+    """Configure the app against the temporary directory and the stub, then migrate"""
+    # Read by the settings and client modules at import time
+    os.environ['MATCH_STORE_DIR'] = str(workdir / 'match_store')
+    os.environ['RIOT_RATE_LIMITS'] = args.app_limits
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.django.settings')
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(workdir / 'db.sqlite3')
+    settings.DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = 30
+    settings.BASE_DIR = workdir
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    if args.no_riot_cache:
+        settings.RIOT_CACHE_TTLS = {}
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    call_command('migrate', verbosity=0)
+
+
+def reset_state():
+    """Empty the database and the Riot response cache"""
+    from django.core.cache import caches
+    from django.core.management import call_command
+
+    call_command('flush', interactive=False, verbosity=0)
+    caches['default'].clear()
+
+
+def percentile(timings, pct):
+    ordered = sorted(timings)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_requests(stub, args):
+    """One callable per scenario that makes a single request and returns whether it succeeded"""
+    from get_stats.get_matches import get_matches_list
+    from get_stats.get_ten_matches_data import get_matches_data
+    from get_stats.player_uiid import get_account
+
+    def fetch_stats(client):
+        response = client.post(
+            '/api/players/fetch-stats',
+            {'game_name': GAME_NAME, 'tag_line': TAG_LINE, 'limit': args.limit, 'wait': True},
+            content_type='application/json'
+        )
+        return response.status_code == 200
+
+    def fetch_queued(client):
+        response = client.post(
+            '/api/players/fetch-stats',
+            {'game_name': GAME_NAME, 'tag_line': TAG_LINE, 'limit': args.limit},
+            content_type='application/json'
+        )
+        return response.status_code == 202
+
+    def player_matches(client):
+        response = client.get(f'/api/players/{stub.puuid}/matches', {'limit': args.limit})
+        return response.status_code == 200
+
+    def cached(client):
+        return client.get('/api/matches/cached').status_code == 200
+
+    def pipeline(client):
+        account = get_account(GAME_NAME, TAG_LINE)
+        if not account:
+            return False
+        match_ids = get_matches_list(account['puuid'], limit=args.limit)
+        return bool(match_ids and get_matches_data(match_ids, limit=args.limit))
+
+    return {
+        'fetch-stats': fetch_stats,
+        'fetch-queued': fetch_queued,
+        'player-matches': player_matches,
+        'cached': cached,
+        'pipeline': pipeline,
+    }
+
+
+def prepare(scenario, stub):
+    """Seed what a scenario needs before it is timed"""
+    from backend.models import Player
+
+    if scenario == 'player-matches':
+        Player.objects.get_or_create(puuid=stub.puuid, defaults={'game_name': GAME_NAME, 'tag_line': TAG_LINE})
+
+
+def run_level(stub, scenario, request, concurrency, count):
+    """Make `count` requests from `concurrency` threads and measure them"""
+    from django.conf import settings
+    from django.test import Client
+
+    from backend.riot_cache import get_cached_riot_client
+
+    riot_client = get_cached_riot_client(settings.RIOT_API_KEY).client
+    calls_before = stub.total_calls()
+    throttled_before = stub.throttled
+    coalesced_before = riot_client.coalesced
+
+    def timed(client):
+        start = time.perf_counter()
+        try:
+            ok = request(client)
+        except Exception as e:
+            print(f"{scenario}: {e}", file=sys.__stderr__)
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    clients = [Client() for _ in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(lambda i: timed(clients[i % concurrency]), range(count)))
+    wall = time.perf_counter() - started
+
+    timings = [elapsed for elapsed, _ in outcomes]
+    riot_calls = stub.total_calls() - calls_before
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": count,
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "mean_ms": round(statistics.mean(timings), 2),
+        "throughput_rps": round(count / wall, 2),
+        "riot_calls": riot_calls,
+        "riot_calls_per_request": round(riot_calls / count, 3),
+        "riot_429s": stub.throttled - throttled_before,
+        "coalesced": riot_client.coalesced - coalesced_before,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, previous=None):
+    baseline = {(row['scenario'], row['concurrency']): row for row in (previous or [])}
+    print(f"{'scenario':<15}{'conc':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'req/s':>9}{'riot/req':>10}{'429s':>6}{'errors':>8}")
+    for row in results:
+        line = (f"{row['scenario']:<15}{row['concurrency']:>5}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+                f"{row['p99_ms']:>10.1f}{row['throughput_rps']:>9.1f}{row['riot_calls_per_request']:>10.2f}"
+                f"{row['riot_429s']:>6}{row['errors']:>8}")
+        before = baseline.get((row['scenario'], row['concurrency']))
+        if before:
+            line += (f"   p95 {row['p95_ms'] / before['p95_ms']:.2f}x"
+                     f"  req/s {row['throughput_rps'] / before['throughput_rps']:.2f}x"
+                     f"  riot/req {before['riot_calls_per_request']:.2f}->{row['riot_calls_per_request']:.2f}")
+        print(line)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = Path(args.output).resolve() if args.output else None
+    previous = json.loads(Path(args.compare).read_text())['results'] if args.compare else None
+
+    matches = json.loads((REPO_ROOT / 'dataTenMatches.json').read_text())
+    match_ids = json.loads((REPO_ROOT / 'matchIDs.json').read_text())
+
+    from benchmarks.stub_server import start_riot_stub
+
+    stub = start_riot_stub(matches, match_ids=match_ids, latency=args.latency, rate_429=args.rate_429,
+                           retry_after=args.retry_after, app_limits=args.app_limits)
+    os.environ['RIOT_API_BASE_URL'] = f"http://127.0.0.1:{stub.server_address[1]}"
+
+    workdir = Path(tempfile.mkdtemp(prefix='bench_endpoints_'))
+    cwd = os.getcwd()
+    results = []
+    try:
+        # get_matches_list / get_matches_data write their JSON files to the working directory
+        os.chdir(workdir)
+        shutil.copy(REPO_ROOT / 'dataTenMatches.json', workdir / 'dataTenMatches.json')
+        setup_django(workdir, args)
+        requests = build_requests(stub, args)
+
+        if not args.verbose:
+            # Failed requests are counted in the results instead of logged
+            logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        for scenario in args.scenarios:
+            for concurrency in args.concurrency:
+                reset_state()
+                prepare(scenario, stub)
+                with contextlib.ExitStack() as quiet:
+                    if not args.verbose:
+                        quiet.enter_context(contextlib.redirect_stdout(io.StringIO()))
+                        quiet.enter_context(contextlib.redirect_stderr(io.StringIO()))
+                    row = run_level(stub, scenario, requests[scenario], concurrency, args.requests)
+                results.append(row)
+                print(f"{scenario} x{concurrency}: p95 {row['p95_ms']:.1f} ms, {row['throughput_rps']:.1f} req/s",
+                      file=sys.stderr)
+    finally:
+        os.chdir(cwd)
+        stub.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{args.requests} requests per level, stub latency {args.latency * 1000:.0f} ms, "
+          f"429 rate {args.rate_429:.0%}, Riot cache {'off' if args.no_riot_cache else 'on'}")
+    print_results(results, previous)
+
+    if output:
+        output.write_text(json.dumps({
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "args": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+            },
+            "results": results,
+        }, indent=2))
+        print(f"\nResults written to {output}")
+
+    return 1 if any(row['errors'] for row in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
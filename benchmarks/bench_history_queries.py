@@ -0,0 +1,112 @@
+"""
+Queries and serialization time per match history page.
+
+    python -m benchmarks.bench_history_queries
+
+Compares the plain ModelSerializer listing (one Match query per row), the
+select_related listing and the .values() fast path used by
+GET /api/players/<puuid>/matches, on an in-memory SQLite database. Exits
+non-zero if either optimized path runs more than one query per page or if
+the fast path's output differs from PlayerMatchStatsSerializer's.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import django
+from django.conf import settings
+
+settings.configure(
+    INSTALLED_APPS=['django.contrib.contenttypes', 'rest_framework', 'backend'],
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+    USE_TZ=True,
+    TIME_ZONE='UTC',
+)
+django.setup()
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.ingest import calculate_kda
+from backend.models import Match, Player, PlayerMatchStats
+from backend.serializers import PlayerMatchStatsSerializer, match_stats_values, serialize_match_stats_values
+
+PAGE_SIZES = (10, 50)
+STORED_MATCHES = 500
+
+
+def populate():
+    player = Player.objects.create(puuid='bench-puuid', game_name='Bench', tag_line='NA1')
+    matches = []
+    stats = []
+    for i in range(STORED_MATCHES):
+        game_creation = 1700000000000 + i * 1800000
+        match = Match(
+            match_id=f'NA1_{5000000000 + i}', game_creation=game_creation, game_duration=1500 + i % 600,
+            game_mode='CLASSIC', game_type='MATCHED_GAME', raw_data_key=f'NA1/{i % 100:02d}/NA1_{i}.json.gz'
+        )
+        row = PlayerMatchStats(
+            player=player, match=match, game_creation=game_creation, game_duration=match.game_duration,
+            game_mode='CLASSIC', kills=i % 12, deaths=i % 7, assists=i % 15, win=i % 2 == 0,
+            champion_id=103, champion_name='Ahri', champ_level=16,
+            total_damage_dealt_to_champions=20000 + i, gold_earned=11000 + i,
+            total_minions_killed=180, vision_score=25, wards_placed=10, wards_killed=3,
+            damage_per_minute=700.5, gold_per_minute=420.25, kill_participation=0.55 if i % 3 else None,
+            kda=calculate_kda(i % 12, i % 7, i % 15)
+        )
+        matches.append(match)
+        stats.append(row)
+    Match.objects.bulk_create(matches)
+    PlayerMatchStats.objects.bulk_create(stats)
+    return player
+
+
+def measure(func, repeat=20):
+    """Best time in ms and the query count of one call"""
+    with CaptureQueriesContext(connection) as queries:
+        result = func()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return result, len(queries), best * 1000
+
+
+def main():
+    call_command('migrate', verbosity=0)
+    player = populate()
+    history = PlayerMatchStats.objects.filter(player=player).order_by('-game_creation', '-match_id')
+    failures = []
+
+    print(f"{'page':>5} {'path':<16} {'queries':>8} {'ms':>8}")
+    for limit in PAGE_SIZES:
+        paths = {
+            'lazy FK': lambda: PlayerMatchStatsSerializer(history[:limit], many=True).data,
+            'select_related': lambda: PlayerMatchStatsSerializer(
+                history.select_related('match')[:limit], many=True
+            ).data,
+            'values()': lambda: serialize_match_stats_values(match_stats_values(history)[:limit]),
+        }
+        results = {}
+        for name, func in paths.items():
+            results[name], query_count, ms = measure(func)
+            print(f"{limit:>5} {name:<16} {query_count:>8} {ms:>8.2f}")
+            if name != 'lazy FK' and query_count != 1:
+                failures.append(f"{name} ran {query_count} queries for a page of {limit}")
+
+        expected = [dict(row) for row in results['lazy FK']]
+        for name in ('select_related', 'values()'):
+            if [dict(row) for row in results[name]] != expected:
+                failures.append(f"{name} output differs from PlayerMatchStatsSerializer for a page of {limit}")
+
+    for failure in failures:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Size and write time of the indent=4 dataTenMatches.json dump vs the match store.
+
+    python -m benchmarks.bench_match_store
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.match_store import MatchStore
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def timed(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    with open(ROOT / 'dataTenMatches.json') as f:
+        matches = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        legacy_path = tmp / 'dataTenMatches.json'
+
+        def legacy_write():
+            with open(legacy_path, 'w') as f:
+                json.dump(matches, f, indent=4)
+
+        legacy_ms = timed(legacy_write)
+        legacy_size = legacy_path.stat().st_size
+        compact_size = len(json.dumps(matches, separators=(',', ':')).encode())
+
+        def first_write():
+            store = MatchStore(tmp / f'store_{time.perf_counter_ns()}')
+            for match in matches:
+                store.put(match['metadata']['matchId'], match)
+
+        first_ms = timed(first_write)
+
+        store = MatchStore(tmp / 'store')
+        keys = [store.put(match['metadata']['matchId'], match) for match in matches]
+        store_size = sum(store.path_for(key).stat().st_size for key in keys)
+
+        repeat_ms = timed(lambda: [store.put(match['metadata']['matchId'], match) for match in matches])
+        read_ms = timed(lambda: [store.get(key) for key in keys])
+
+    print(f"{len(matches)} matches")
+    print(f"indent=4 JSON dump      {legacy_size / 1024:8.1f} KiB  write {legacy_ms:7.2f} ms (every fetch)")
+    print(f"compact JSON (raw_data) {compact_size / 1024:8.1f} KiB")
+    print(f"gzip match store        {store_size / 1024:8.1f} KiB  first write {first_ms:7.2f} ms, "
+          f"re-save {repeat_ms:6.3f} ms, read all {read_ms:6.2f} ms")
+    print(f"size vs indent=4 dump   {legacy_size / store_size:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Transform + summary cost of the old per-view loops vs backend.stats_engine.
+
+    python -m benchmarks.bench_stats_engine
+
+Synthetic match lists are built by repeating the bundled dataTenMatches.json.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.stats_engine import summarize_matches, transform_matches
+
+ROOT = Path(__file__).resolve().parent.parent
+PUUID = "Ppd1Ebvndpxmp4swzT1zpl0ZKlIC4ydqw76oW49b_aAEGqSdnWPPz-tUzRWcDdyAvFXkbXRpGw8B5Q"
+
+
+def legacy_summary(transformed_matches):
+    """The summary block as it was copy-pasted across the three views"""
+    total_matches = len(transformed_matches)
+    wins = sum(1 for m in transformed_matches if m['win'])
+    total_kills = sum(m['kills'] for m in transformed_matches)
+    total_deaths = sum(m['deaths'] for m in transformed_matches)
+    total_assists = sum(m['assists'] for m in transformed_matches)
+    return {
+        "total_matches": total_matches,
+        "wins": wins,
+        "losses": total_matches - wins,
+        "win_rate": round((wins / total_matches) * 100, 1) if total_matches > 0 else 0,
+        "avg_kills": round(total_kills / total_matches, 1) if total_matches > 0 else 0,
+        "avg_deaths": round(total_deaths / total_matches, 1) if total_matches > 0 else 0,
+        "avg_assists": round(total_assists / total_matches, 1) if total_matches > 0 else 0,
+        "avg_kda": round(
+            (total_kills + total_assists) / total_deaths if total_deaths > 0 else (total_kills + total_assists),
+            2
+        ),
+        "avg_damage": round(
+            sum(m['total_damage_dealt_to_champions'] for m in transformed_matches) / total_matches, 0
+        ) if total_matches > 0 else 0,
+        "avg_gold": round(
+            sum(m['gold_earned'] for m in transformed_matches) / total_matches, 0
+        ) if total_matches > 0 else 0,
+        "avg_cs": round(
+            sum(m['total_minions_killed'] for m in transformed_matches) / total_matches, 1
+        ) if total_matches > 0 else 0,
+        "avg_vision_score": round(
+            sum(m['vision_score'] for m in transformed_matches) / total_matches, 1
+        ) if total_matches > 0 else 0,
+    }
+
+
+def best_of(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    with open(ROOT / 'dataTenMatches.json') as f:
+        sample = json.load(f)
+
+    for size in (1_000, 100_000):
+        raw_matches = (sample * (size // len(sample) + 1))[:size]
+
+        transform_ms, transformed = best_of(lambda: transform_matches(raw_matches, PUUID), repeat=3)
+        legacy_ms, expected = best_of(lambda: legacy_summary(transformed))
+        engine_ms, summary = best_of(lambda: summarize_matches(transformed))
+        assert summary == expected, (summary, expected)
+
+        print(f"{size:>7} matches: transform {transform_ms:8.2f} ms | "
+              f"summary legacy {legacy_ms:8.2f} ms, engine {engine_ms:8.2f} ms "
+              f"({legacy_ms / engine_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
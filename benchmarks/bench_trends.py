@@ -0,0 +1,188 @@
+"""
+Cost of rolling-window trends as a player's history grows.
+
+    python -m benchmarks.bench_trends [matches]
+
+Stores `matches` PlayerMatchStats rows (default 10,000) for one player in an
+in-memory SQLite database, then times a full trend rebuild, the rolling
+series over the whole history and the incremental update_trends() that runs
+when one new match is ingested. Exits non-zero if the rolling means or
+streaks differ from a brute-force recomputation, or if the incremental
+state differs from a rebuild.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import django
+from django.conf import settings
+
+settings.configure(
+    INSTALLED_APPS=['django.contrib.contenttypes', 'rest_framework', 'backend'],
+    DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+    USE_TZ=True,
+    TIME_ZONE='UTC',
+    TREND_WINDOWS=[5, 10, 20],
+    TREND_MAX_WINDOW=50,
+)
+django.setup()
+
+from django.core.management import call_command
+from django.db import transaction
+
+from backend.ingest import calculate_kda
+from backend.models import Match, Player, PlayerMatchStats, PlayerTrend
+from backend.trends import (
+    TREND_FIELDS, build_trend, match_metrics, player_trends, rebuild_trend, trend_series, update_player_trends,
+    update_trends,
+)
+
+WINDOWS = [5, 10, 20]
+
+
+def make_stats(rng, player, index):
+    match = Match(
+        match_id=f'NA1_{6000000000 + index}', game_creation=1700000000000 + index * 1800000,
+        game_duration=rng.randint(900, 2400), game_mode='CLASSIC', game_type='MATCHED_GAME'
+    )
+    kills, deaths, assists = rng.randint(0, 15), rng.randint(0, 10), rng.randint(0, 20)
+    stats = PlayerMatchStats(
+        player=player, match=match, game_creation=match.game_creation, game_mode=match.game_mode,
+        game_duration=match.game_duration, kills=kills, deaths=deaths, assists=assists,
+        win=rng.random() < 0.5, champion_id=1, champion_name='Ahri',
+        total_damage_dealt_to_champions=rng.randint(5000, 60000), gold_earned=rng.randint(6000, 20000),
+        vision_score=rng.randint(5, 60), damage_per_minute=rng.uniform(300, 1500) if rng.random() < 0.9 else None,
+        kda=calculate_kda(kills, deaths, assists),
+    )
+    return match, stats
+
+
+def populate(rng, player, count):
+    pairs = [make_stats(rng, player, i) for i in range(count)]
+    Match.objects.bulk_create([match for match, _ in pairs], batch_size=2000)
+    PlayerMatchStats.objects.bulk_create([stats for _, stats in pairs], batch_size=2000)
+
+
+def brute_force(rows, window, metric):
+    """Mean of `metric` over the last `window` rows, recomputed from scratch"""
+    values = [match_metrics(row)[metric] for row in rows[-window:]]
+    values = [value for value in values if value is not None]
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def brute_force_streaks(rows):
+    longest = {True: 0, False: 0}
+    run = 0
+    for i, row in enumerate(rows):
+        run = run + 1 if i and rows[i - 1]['win'] == row['win'] else 1
+        longest[row['win']] = max(longest[row['win']], run)
+    return (run if rows[-1]['win'] else -run), longest[True], longest[False]
+
+
+def check_empty_state(rng, index):
+    """
+    Reads and ingest around a player with no matches yet
+
+    GET /trends (player_trends) must not store a state. One stored with no
+    matches (rebuild_aggregates or migration 0010 before the player's first
+    sync) must then still take the player's matches, from their own sync
+    (update_trends) and from other players' syncs (update_player_trends).
+    """
+    failures = []
+    for puuid, update in (
+        ('bench-empty', lambda player, stats: update_trends(player, stats)),
+        ('bench-empty-co', lambda player, stats: update_player_trends({player.pk: stats})),
+    ):
+        player = Player.objects.create(puuid=puuid, game_name=puuid, tag_line='NA1')
+        player_trends(player, WINDOWS, 0)
+        if PlayerTrend.objects.filter(player=player).exists():
+            failures.append(f"{puuid}: player_trends stored a trend state")
+        rebuild_trend(player)
+        pairs = [make_stats(rng, player, index + i) for i in range(3)]
+        index += len(pairs)
+        try:
+            with transaction.atomic():
+                for match, stats in pairs:
+                    match.save()
+                    stats.save()
+                update(player, [stats for _, stats in pairs])
+        except TypeError as e:
+            failures.append(f"{puuid}: ingest after an empty trend state failed: {e}")
+            continue
+        trend = PlayerTrend.objects.get(player=player)
+        rebuilt = build_trend(player.pk, PlayerMatchStats.objects.all())
+        if (trend.matches, trend.recent) != (rebuilt.matches, rebuilt.recent):
+            failures.append(f"{puuid}: state after an empty trend state differs from a rebuild")
+    return failures
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(count=10_000):
+    call_command('migrate', verbosity=0)
+    rng = random.Random(7)
+    player = Player.objects.create(puuid='bench-0', game_name='Bench0', tag_line='NA1')
+    populate(rng, player, count)
+    failures = []
+
+    _, rebuild = timed(lambda: rebuild_trend(player))
+    rows = list(PlayerMatchStats.objects.filter(player=player).order_by('game_creation', 'match_id').values(*TREND_FIELDS))
+    series, full_series = timed(lambda: trend_series(rows, WINDOWS, len(rows)))
+
+    # One more match, folded in the way ingest does it
+    match, stats = make_stats(rng, player, count)
+
+    def ingest():
+        with transaction.atomic():
+            match.save()
+            stats.save()
+            update_trends(player, [stats])
+    _, incremental = timed(ingest)
+
+    print(f"{count} matches, windows {WINDOWS}")
+    print(f"full rebuild                 {rebuild * 1000:9.2f} ms")
+    print(f"rolling series over history  {full_series * 1000:9.2f} ms  ({full_series / count * 1e6:.1f} us/match)")
+    print(f"incremental update (1 match) {incremental * 1000:9.2f} ms")
+
+    for point, end in ((series[-1], len(rows)), (series[len(rows) // 2], len(rows) // 2 + 1)):
+        for window in WINDOWS:
+            for metric, mean in point['rolling'][str(window)].items():
+                expected = brute_force(rows[:end], window, metric)
+                if mean is None or expected is None:
+                    if mean != expected:
+                        failures.append(f"{metric} over {window} at match {end}: {mean} != {expected}")
+                elif abs(mean - expected) > 0.011:
+                    failures.append(f"{metric} over {window} at match {end}: {mean} != {expected}")
+
+    trend = PlayerTrend.objects.get(player=player)
+    rows.append(next(iter(PlayerMatchStats.objects.filter(pk=stats.pk).values(*TREND_FIELDS))))
+    if (trend.current_streak, trend.longest_win_streak, trend.longest_loss_streak) != brute_force_streaks(rows):
+        failures.append("streaks differ from a brute-force count")
+    rebuilt = build_trend(player.pk, PlayerMatchStats.objects.all())
+    if (trend.matches, trend.recent, trend.last_match_id) != (rebuilt.matches, rebuilt.recent, rebuilt.last_match_id):
+        failures.append("incremental trend state differs from a rebuild")
+
+    failures.extend(check_empty_state(rng, count + 1))
+
+    for failure in failures:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('matches', nargs='?', type=int, default=10_000,
+                        help='Matches stored for the player (default: 10,000)')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    main(parse_args().matches)
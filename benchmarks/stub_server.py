@@ -0,0 +1,186 @@
+"""
+Local stand-ins for the Riot API used by the benchmarks.
+
+start_stub_server serves a fixed JSON body for every GET. start_riot_stub
+replays real payloads (dataTenMatches.json / matchIDs.json) on the Riot
+routes the app calls, with configurable latency, injected 429s and
+X-App-Rate-Limit headers, and counts every request it receives. Both speak
+HTTP/1.1 so clients can keep connections alive between requests.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = self.server.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(payload=None, host="127.0.0.1", port=0):
+    """
+    Start the stub server in a background thread
+
+    Args:
+        payload: JSON-serializable body returned for every request
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Returns:
+        ThreadingHTTPServer: Running server; call shutdown() when done
+    """
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.body = json.dumps(payload if payload is not None else {"ok": True}).encode()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+ACCOUNT_ROUTE = re.compile(r'^/riot/account/v1/accounts/by-riot-id/([^/]+)/([^/]+)$')
+MATCH_IDS_ROUTE = re.compile(r'^/lol/match/v5/matches/by-puuid/([^/]+)/ids$')
+MATCH_ROUTE = re.compile(r'^/lol/match/v5/matches/([^/]+)$')
+
+
+class RiotStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        status, body = server.route(url.path, {k: v[0] for k, v in parse_qs(url.query).items()})
+
+        if server.latency:
+            time.sleep(server.latency)
+        headers = server.record(url.path, status)
+        if headers.get('Retry-After'):
+            status, body = 429, {"status": {"message": "Rate limit exceeded", "status_code": 429}}
+
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RiotStubServer(ThreadingHTTPServer):
+    """Replays stored payloads on the account, match-ID and match routes"""
+    daemon_threads = True
+
+    def __init__(self, address, matches, match_ids=None, latency=0.0, rate_429=0.0,
+                 retry_after=1, app_limits="20000:1,1200000:120"):
+        super().__init__(address, RiotStubHandler)
+        self.matches = {match['metadata']['matchId']: match for match in matches}
+        # Newest first, like Riot
+        ordered = list(match_ids or [])
+        ordered += sorted(
+            (match_id for match_id in self.matches if match_id not in ordered),
+            key=lambda match_id: -self.matches[match_id]['info']['gameCreation']
+        )
+        self.match_ids = [match_id for match_id in ordered if match_id in self.matches]
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.app_limits = app_limits
+        self.windows = [(int(window), int(count)) for count, window in
+                        (pair.split(':') for pair in app_limits.split(','))]
+
+        # The player in every match is who account lookups resolve to
+        puuids = Counter(p['puuid'] for match in matches for p in match['info']['participants'])
+        self.puuid = puuids.most_common(1)[0][0] if puuids else 'stub-puuid'
+
+        self.lock = threading.Lock()
+        self.sent = deque()
+        self.calls = Counter()
+        self.throttled = 0
+
+    def route(self, path, query):
+        """Status and body for a request"""
+        match = ACCOUNT_ROUTE.match(path)
+        if match:
+            return 200, {"puuid": self.puuid, "gameName": match.group(1), "tagLine": match.group(2)}
+
+        match = MATCH_IDS_ROUTE.match(path)
+        if match:
+            ids = self.match_ids
+            if 'startTime' in query:
+                start_ms = int(query['startTime']) * 1000
+                ids = [i for i in ids if self.matches[i]['info']['gameCreation'] >= start_ms]
+            start = int(query.get('start', 0))
+            return 200, ids[start:start + int(query.get('count', 20))]
+
+        match = MATCH_ROUTE.match(path)
+        if match and match.group(1) in self.matches:
+            return 200, self.matches[match.group(1)]
+
+        return 404, {"status": {"message": "Data not found", "status_code": 404}}
+
+    def record(self, path, status):
+        """Count the request and build its rate-limit headers (with Retry-After when throttled)"""
+        now = time.monotonic()
+        with self.lock:
+            self.calls[path] += 1
+            self.sent.append(now)
+            longest = max(window for window, _ in self.windows)
+            while self.sent and self.sent[0] <= now - longest:
+                self.sent.popleft()
+            counts = [(sum(1 for t in self.sent if t > now - window), window) for window, _ in self.windows]
+            headers = {
+                "X-App-Rate-Limit": self.app_limits,
+                "X-App-Rate-Limit-Count": ','.join(f"{count}:{window}" for count, window in counts),
+            }
+            over_limit = any(count > limit for (count, _), (_, limit) in zip(counts, self.windows))
+            if over_limit or (self.rate_429 and random.random() < self.rate_429):
+                self.throttled += 1
+                headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+    def total_calls(self):
+        with self.lock:
+            return sum(self.calls.values())
+
+
+def start_riot_stub(matches, match_ids=None, latency=0.0, rate_429=0.0, retry_after=1,
+                    app_limits="20000:1,1200000:120", host="127.0.0.1", port=0):
+    """
+    Start a replaying Riot API stub in a background thread
+
+    Args:
+        matches: Raw match payloads to serve (e.g. dataTenMatches.json)
+        match_ids: Match ID order for the by-puuid listing (e.g. matchIDs.json)
+        latency: Seconds added to every response
+        rate_429: Probability of answering any request with a 429
+        retry_after: Retry-After seconds sent with a 429
+        app_limits: X-App-Rate-Limit advertised and enforced, "count:seconds,..."
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+
+    Returns:
+        RiotStubServer: Running server (see .calls and .throttled); call shutdown() when done
+    """
+    server = RiotStubServer((host, port), matches, match_ids=match_ids, latency=latency, rate_429=rate_429,
+                            retry_after=retry_after, app_limits=app_limits)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -74,7 +74,7 @@ export default function Home() {
             <Box textAlign="center" py={8}>
               <Spinner size="xl" color="blue.500" thickness="4px" mb={4} />
               <Text color="gray.600">
-                Fetching player data from Riot API...
+                Syncing matches from Riot API...
               </Text>
             </Box>
           )}
@@ -0,0 +1,113 @@
+/**
+ * API integration layer for the GameTrack backend
+ */
+
+import {
+  MatchHistoryQuery,
+  PlayerLookupResponse,
+  PlayerMatchHistoryResponse,
+  SyncJob,
+  SyncJobQueuedResponse,
+} from '@/types/api';
+
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+
+// How often and for how long a queued sync job is polled
+const JOB_POLL_INTERVAL_MS = 1000;
+const JOB_POLL_TIMEOUT_MS = 120000;
+
+export class APIError extends Error {
+  status: number;
+
+  constructor(message: string, status: number) {
+    super(message);
+    this.name = 'APIError';
+    this.status = status;
+  }
+}
+
+async function request<T>(path: string, init?: RequestInit): Promise<T> {
+  const response = await fetch(`${API_BASE_URL}${path}`, {
+    ...init,
+    headers: { 'Content-Type': 'application/json', ...init?.headers },
+  });
+  const body = await response.json().catch(() => ({}));
+  if (!response.ok) {
+    throw new APIError(body.error || `Request failed with status ${response.status}`, response.status);
+  }
+  return body as T;
+}
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+export const api = {
+  lookupPlayer(gameName: string, tagLine: string): Promise<PlayerLookupResponse> {
+    return request('/api/players/search', {
+      method: 'POST',
+      body: JSON.stringify({ game_name: gameName, tag_line: tagLine }),
+    });
+  },
+
+  /**
+   * Queue a sync of the player's recent matches (202 with the job)
+   */
+  queuePlayerSync(gameName: string, tagLine: string, limit = 10): Promise<SyncJobQueuedResponse> {
+    return request('/api/players/fetch-stats', {
+      method: 'POST',
+      body: JSON.stringify({ game_name: gameName, tag_line: tagLine, limit }),
+    });
+  },
+
+  getSyncJob(statusUrl: string): Promise<SyncJob> {
+    return request(statusUrl);
+  },
+
+  /**
+   * Poll a sync job until a worker has finished it
+   *
+   * Throws an APIError if the job failed for good or is still pending
+   * after JOB_POLL_TIMEOUT_MS.
+   */
+  async waitForSyncJob(statusUrl: string): Promise<SyncJob> {
+    const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+    for (;;) {
+      const job = await api.getSyncJob(statusUrl);
+      if (job.status === 'done') {
+        return job;
+      }
+      if (job.status === 'failed') {
+        throw new APIError(job.last_error || 'Syncing matches from the Riot API failed', 502);
+      }
+      if (Date.now() >= deadline) {
+        // Jobs only run while `manage.py run_sync_worker` is up
+        throw new APIError('Syncing matches is taking longer than expected. Is a sync worker running?', 504);
+      }
+      await sleep(JOB_POLL_INTERVAL_MS);
+    }
+  },
+
+  getPlayerMatches(puuid: string, query: MatchHistoryQuery = {}): Promise<PlayerMatchHistoryResponse> {
+    const params = new URLSearchParams();
+    Object.entries(query).forEach(([key, value]) => {
+      if (value !== undefined && value !== null) {
+        params.set(key, String(value));
+      }
+    });
+    const search = params.toString();
+    return request(`/api/players/${encodeURIComponent(puuid)}/matches${search ? `?${search}` : ''}`);
+  },
+
+  /**
+   * Sync a player's recent matches and read them back
+   *
+   * Queues the sync, waits for the job, then reads the stored history
+   * from /matches.
+   */
+  async fetchPlayerStats(gameName: string, tagLine: string, limit = 10): Promise<PlayerMatchHistoryResponse> {
+    const queued = await api.queuePlayerSync(gameName, tagLine, limit);
+    const job = await api.waitForSyncJob(queued.status_url);
+    return api.getPlayerMatches(queued.player?.puuid ?? job.puuid, { limit });
+  },
+};
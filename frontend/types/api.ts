@@ -73,6 +73,97 @@ export interface PlayerMatchHistoryResponse {
   matches: PlayerMatchStats[];
   total_matches: number;
   summary: Summary;
+  next_cursor?: string | null;
+  errors?: Record<string, string>;
+}
+
+// Query parameters of GET /api/players/{puuid}/matches
+export interface MatchHistoryQuery {
+  limit?: number;
+  champion?: string;
+  game_mode?: string;
+  result?: 'win' | 'loss';
+  date_from?: string;
+  date_to?: string;
+  cursor?: string;
+}
+
+// Background sync job (POST /api/players/fetch-stats, GET /api/jobs/{id})
+export interface SyncJob {
+  id: number;
+  puuid: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  backfill: boolean;
+  max_ids: number | null;
+  attempts: number;
+  max_attempts: number;
+  run_after: string;
+  started_at: string | null;
+  finished_at: string | null;
+  matches_stored: number;
+  errors: Record<string, string>;
+  last_error: string;
+  created_at: string;
+  updated_at: string;
+}
+
+export interface SyncJobQueuedResponse {
+  player?: Player;
+  job: SyncJob;
+  created: boolean;
+  status_url: string;
+}
+
+// One champion or team position of GET /api/players/{puuid}/breakdown
+export interface BreakdownRow {
+  champion_name?: string;
+  team_position?: string;
+  matches: number;
+  wins: number;
+  losses: number;
+  win_rate: number;
+  kda: number;
+  avg_kills: number;
+  avg_deaths: number;
+  avg_assists: number;
+  damage_per_minute: number | null;
+  gold_per_minute: number | null;
+  cs_per_minute: number | null;
+}
+
+export interface PlayerBreakdownResponse {
+  player: Player;
+  total_matches: number;
+  champions: BreakdownRow[];
+  positions: BreakdownRow[];
+}
+
+export interface TrendMetrics {
+  kda: number | null;
+  damage_per_minute: number | null;
+  gold_per_minute: number | null;
+  vision_score: number | null;
+  win_rate: number | null;
+}
+
+export interface TrendPoint {
+  match_id: string;
+  game_creation: number;
+  values: TrendMetrics;
+  rolling: Record<string, TrendMetrics>;  // keyed by window size
+}
+
+export interface PlayerTrendsResponse {
+  player: Player;
+  windows: number[];
+  matches: number;
+  current: Record<string, TrendMetrics>;  // keyed by window size
+  streaks: {
+    current: { result: 'win' | 'loss' | null; length: number };
+    longest_win: number;
+    longest_loss: number;
+  };
+  series: TrendPoint[];
 }
 
 export interface PlayerLookupRequest {
@@ -1,16 +1,56 @@
 import requests
 import time
 from keys import RIOT_API_KEY
-from backend.auth.riotAPI import RiotAPIClient
+from backend.auth.riotAPI import get_riot_client
 import json
 
-def get_matches_list(puuid=None, limit=10):
+def list_match_ids(api, puuid, start_time=None, max_ids=None, page_size=100, partial=True):
+    """
+    Page through a player's match IDs, newest first
+
+    Args:
+        api: RiotAPIClient used for the requests
+        puuid: Player's PUUID
+        start_time: Only return matches started at or after this epoch time (seconds)
+        max_ids: Stop after this many IDs (default: walk every page)
+        page_size: IDs per request (Riot allows at most 100)
+        partial: Return the IDs listed so far when a later request fails
+                 (False: return None, as when the first one fails)
+
+    Returns:
+        list: Match IDs, or None if the first request failed
+    """
+    match_ids = []
+    start = 0
+    while max_ids is None or len(match_ids) < max_ids:
+        count = page_size if max_ids is None else min(page_size, max_ids - len(match_ids))
+        params = {"start": start, "count": count}
+        if start_time is not None:
+            params["startTime"] = start_time
+
+        page = api.call_api(f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params=params)
+        if page is None:
+            if not match_ids or not partial:
+                return None
+            break
+
+        match_ids.extend(page)
+        # A short page means there is nothing older left to walk
+        if len(page) < count:
+            break
+        start += count
+
+    return match_ids
+
+
+def get_matches_list(puuid=None, limit=10, start_time=None):
     """
     Get list of match IDs for a player
 
     Args:
         puuid: Player's PUUID
         limit: Number of matches to fetch (default: 10)
+        start_time: Only list matches started at or after this epoch time (seconds)
 
     Returns:
         list: List of match IDs
@@ -20,11 +60,16 @@ def get_matches_list(puuid=None, limit=10):
         puuid = "Ppd1Ebvndpxmp4swzT1zpl0ZKlIC4ydqw76oW49b_aAEGqSdnWPPz-tUzRWcDdyAvFXkbXRpGw8B5Q"
 
     print(f"Pulling last {limit} game data...")
-    api = RiotAPIClient(api_key=RIOT_API_KEY, base_url="https://americas.api.riotgames.com")
-    response = api.call_api(f"/lol/match/v5/matches/by-puuid/{puuid}/ids", params={"count": limit})
-    data = response
+    api = get_riot_client(RIOT_API_KEY, base_url="https://americas.api.riotgames.com")
+    data = list_match_ids(api, puuid, start_time=start_time, max_ids=limit)
+    save_match_ids(data)
+
+    return data
+
+
+def save_match_ids(data):
+    """Write the list of match IDs to matchIDs.json"""
     print("Saving matches...")
     with open('matchIDs.json', 'w') as f:
         json.dump(data, f, indent=4)
 
-    return data
@@ -1,31 +1,118 @@
+import asyncio
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
+from decouple import config
 from keys import RIOT_API_KEY
-from backend.auth.riotAPI import RiotAPIClient
+from backend.auth.riotAPI import get_riot_client
+from backend.match_store import match_store
 import json
 
-def get_matches_data(matchIDs, limit=10):
+# Maximum number of match-detail requests in flight at once
+MATCH_FETCH_WORKERS = config('RIOT_MATCH_FETCH_WORKERS', default=5, cast=int)
+
+
+def fetch_matches_concurrently(api, matchIDs, max_workers=None):
+    """
+    Fetch match details for several match IDs using a bounded thread pool
+
+    Args:
+        api: RiotAPIClient used for the requests
+        matchIDs: List of match IDs to fetch
+        max_workers: Maximum concurrent requests (default: MATCH_FETCH_WORKERS)
+
+    Returns:
+        list: One dict per match ID, in the original order, with keys
+              'match_id', 'data' (match payload or None) and 'error'
+              (None on success, otherwise a description of the failure)
+    """
+    if not matchIDs:
+        return []
+
+    workers = max(1, min(max_workers or MATCH_FETCH_WORKERS, len(matchIDs)))
+
+    def fetch_one(matchId):
+        try:
+            response = api.call_api(f"/lol/match/v5/matches/{matchId}")
+        except requests.RequestException as e:
+            return {"match_id": matchId, "data": None, "error": str(e)}
+        if not response:
+            return {"match_id": matchId, "data": None, "error": "Riot API returned no data for this match"}
+        return {"match_id": matchId, "data": response, "error": None}
+
+    # executor.map yields results in input order regardless of completion order
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(fetch_one, matchIDs))
+
+
+async def fetch_matches_async(api, matchIDs, max_workers=None):
+    """
+    Async counterpart of fetch_matches_concurrently for an AsyncRiotAPIClient
+
+    Args:
+        api: AsyncRiotAPIClient used for the requests
+        matchIDs: List of match IDs to fetch
+        max_workers: Maximum concurrent requests (default: MATCH_FETCH_WORKERS)
+
+    Returns:
+        list: Same per-ID result dicts as fetch_matches_concurrently, in the original order
+    """
+    semaphore = asyncio.Semaphore(max(1, max_workers or MATCH_FETCH_WORKERS))
+
+    async def fetch_one(matchId):
+        async with semaphore:
+            try:
+                response = await api.call_api(f"/lol/match/v5/matches/{matchId}")
+            except requests.RequestException as e:
+                return {"match_id": matchId, "data": None, "error": str(e)}
+        if not response:
+            return {"match_id": matchId, "data": None, "error": "Riot API returned no data for this match"}
+        return {"match_id": matchId, "data": response, "error": None}
+
+    return list(await asyncio.gather(*(fetch_one(matchId) for matchId in matchIDs)))
+
+
+def get_matches_data(matchIDs, limit=10, max_workers=None, with_errors=False):
     """
     Get detailed match data for a list of match IDs
 
     Args:
         matchIDs: List of match IDs to fetch
         limit: Maximum number of matches to fetch (default: 10)
+        max_workers: Maximum concurrent requests (default: MATCH_FETCH_WORKERS)
+        with_errors: Also return a dict of failed match IDs to error messages
 
     Returns:
-        list: List of detailed match data
+        list: List of detailed match data, or (list, dict) when with_errors is True
     """
-    matches_data = []
-    api = RiotAPIClient(api_key=RIOT_API_KEY, base_url="https://americas.api.riotgames.com")
+    api = get_riot_client(RIOT_API_KEY, base_url="https://americas.api.riotgames.com")
 
-    for matchId in matchIDs[:limit]:
-        response = api.call_api(f"/lol/match/v5/matches/{matchId}")
-        if response:
-            matches_data.append(response)
+    results = fetch_matches_concurrently(api, matchIDs[:limit], max_workers=max_workers)
+    matches_data = [result['data'] for result in results if result['error'] is None]
+    errors = {result['match_id']: result['error'] for result in results if result['error'] is not None}
 
-    print(f"Data from your last {len(matches_data)} games have been saved!")
+    for matchId, error in errors.items():
+        print(f"Failed to fetch match {matchId}: {error}")
+
+    save_matches_data(matches_data)
+
+    if with_errors:
+        return matches_data, errors
+    return matches_data
+
+
+def save_matches_data(matches_data):
+    """
+    Save detailed match data
+
+    Each payload goes into the match store once (matches never change after
+    they end), and dataTenMatches.json is rewritten compactly as the list of
+    the latest matches for the cached endpoint.
+    """
+    for match_data in matches_data:
+        match_store.put(match_data['metadata']['matchId'], match_data)
 
     with open('dataTenMatches.json', 'w') as f:
-        json.dump(matches_data, f, indent=4)
+        json.dump(matches_data, f, separators=(',', ':'))
 
-    return matches_data
\ No newline at end of file
+    print(f"Data from your last {len(matches_data)} games have been saved!")
@@ -1,7 +1,7 @@
 import requests
 import time
 from keys import RIOT_API_KEY
-from backend.auth.riotAPI import RiotAPIClient
+from backend.auth.riotAPI import get_riot_client
 
 def get_account(game_name=None, tag_line=None):
     """
@@ -36,7 +36,7 @@ def get_account(game_name=None, tag_line=None):
         tag_line = tag_line.strip()
         print(f"Authenticating {gameName}#{tag_line}...")
 
-    api = RiotAPIClient(api_key=RIOT_API_KEY, base_url="https://americas.api.riotgames.com")
+    api = get_riot_client(RIOT_API_KEY, base_url="https://americas.api.riotgames.com")
 
     # Use tag_line if provided, otherwise default to "NA1"
     tag = tag_line if tag_line else "NA1"
@@ -0,0 +1,2 @@
+RIOT_API_KEY = "test-key"
+APEX_API_KEY = "test-key"